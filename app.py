@@ -4,6 +4,35 @@ import json
 import datetime
 import subprocess
 import time
+import socket
+import threading
+import heapq
+import itertools
+import re
+import random
+import statistics
+import bisect
+import hashlib
+import hmac
+import io
+import cProfile
+import pstats
+import queue
+import csv
+import sqlite3
+import logging
+import logging.handlers
+import linecache
+import traceback
+import signal
+import argparse
+import multiprocessing
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from functools import partial
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 import requests
 import yt_dlp
 from PyQt6.QtWidgets import (
@@ -11,11 +40,993 @@ from PyQt6.QtWidgets import (
     QLineEdit, QPushButton, QLabel, QProgressBar, QFileDialog,
     QMessageBox, QDialog, QFormLayout, QComboBox, QCheckBox,
     QSpinBox, QMenu, QMenuBar, QTextEdit, QTableWidget, QTableWidgetItem,
-    QHeaderView, QStackedWidget
+    QTableWidgetSelectionRange, QHeaderView, QStackedWidget
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, pyqtSignal, Qt, QTimer
 from PyQt6.QtGui import QIcon # For application icon
 
+def get_data_path(filename):
+    """Location of a data file next to the app (or the bundle when frozen)"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+        # Use getattr to avoid linter warnings
+        _MEIPASS = getattr(sys, '_MEIPASS', None)
+        if _MEIPASS:
+            base_path = _MEIPASS
+        return os.path.join(base_path, filename)
+    return filename
+
+# --- Logging ---
+log = logging.getLogger('mediadl')
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any context fields"""
+
+    _STANDARD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in self._STANDARD_FIELDS and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class JobLogger(logging.LoggerAdapter):
+    """Adds a job's context (job_id, url, ...) to every record; call-site extra fields are kept"""
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = {**self.extra, **(kwargs.get('extra') or {})}
+        return msg, kwargs
+
+
+def job_logger(**context):
+    return JobLogger(logging.getLogger('mediadl.job'), context)
+
+
+class LogPipeline:
+    """Structured logging for the whole app, written off the calling thread.
+
+    Records from any thread go into a queue; a QueueListener thread formats them
+    as JSON lines into a size-rotated file (and plain text to the console), so
+    download workers never wait on disk.
+    """
+
+    LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._handler = logging.handlers.QueueHandler(self._queue)
+        self._listener = None
+        self.path = None
+        self.max_bytes = None
+        self.backups = None
+        self.console = True
+
+    @classmethod
+    def instance(cls):
+        """Get the shared pipeline, creating it on first use"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def start(self, path, level='INFO', max_bytes=5 * 1024 * 1024, backups=5, console=True):
+        self.stop()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.console = console
+        handlers = []
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                                encoding='utf-8', delay=True)
+            file_handler.setFormatter(JsonLineFormatter())
+            handlers.append(file_handler)
+        except OSError as e:
+            print(f"Could not open log file {path}: {e}", file=sys.stderr)
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+            handlers.append(console_handler)
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        log.addHandler(self._handler)
+        log.propagate = False
+        self.set_level(level)
+
+    def set_level(self, level):
+        """Change the level at runtime, e.g. to DEBUG while chasing a failing batch"""
+        level = str(level).upper()
+        log.setLevel(level if level in self.LEVELS else 'INFO')
+
+    def stop(self):
+        """Flush queued records and close the files"""
+        if self._listener is None:
+            return
+        log.removeHandler(self._handler)
+        log.propagate = True
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+
+# --- Metrics ---
+class MetricsRegistry:
+    """Process-wide counters, gauges and histograms, keyed by name and labels.
+
+    Every metric the app records is declared in METRICS so the exporter can
+    describe it even before its first sample. Labels are free-form keyword
+    arguments; each distinct combination is its own series.
+    """
+
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+    METRICS = {
+        'mediadl_bytes_downloaded_total': ('counter', 'Bytes received from media servers'),
+        'mediadl_extraction_seconds': ('histogram', 'Time to extract media info, by extractor'),
+        'mediadl_job_phase_seconds': ('histogram', 'Time jobs spend in each phase'),
+        'mediadl_jobs_total': ('counter', 'Jobs that left a download slot, by outcome'),
+        'mediadl_queue_depth': ('gauge', 'Jobs waiting for a download slot'),
+        'mediadl_active_workers': ('gauge', 'Jobs holding a download slot'),
+        'mediadl_max_concurrent': ('gauge', 'Current limit on parallel downloads'),
+        'mediadl_retries_total': ('counter', 'Retries made by the media engine, by kind'),
+        'mediadl_errors_total': ('counter', 'Failed jobs by error category'),
+        'mediadl_circuit_trips_total': ('counter', 'Times a host\'s circuit breaker opened, by host'),
+        'mediadl_memory_bytes': ('gauge', 'Resident memory of the app and its ffmpeg children'),
+        'mediadl_memory_budget_bytes': ('gauge', 'Memory limit jobs are admitted under'),
+        'mediadl_admissions_deferred_total': ('counter', 'Times a job was held back for lack of memory'),
+        'mediadl_gui_lag_seconds': ('histogram', 'How late the GUI event loop ran its heartbeat timer'),
+        'mediadl_gui_stalls_total': ('counter', 'GUI event-loop stalls over the threshold, by handler'),
+        'mediadl_dead_letters': ('gauge', 'Failed downloads kept for a later retry'),
+        'mediadl_prefetch_total': ('counter', 'Look-ahead extractions taken up by downloads, by outcome'),
+        'mediadl_api_requests_total': ('counter', 'Job API requests, by method and response status'),
+        'mediadl_ingested_total': ('counter', 'Lines read from URL lists, by outcome (queued, duplicate, invalid)'),
+        'mediadl_shared_jobs_total': ('counter', 'Shared queue jobs this node leased, finished, failed or lost, by event'),
+        'mediadl_subscription_syncs_total': ('counter', 'Subscription syncs, by outcome (new, unchanged, failed)'),
+        'mediadl_subscription_entries_total': ('counter', 'Subscription entries read and queued by syncs, by outcome'),
+        'mediadl_subscription_sync_seconds': ('histogram', 'Time to sync one subscription'),
+        'mediadl_schedule_window': ('gauge', 'Schedule window in force (1) or not (0), by window'),
+        'mediadl_bandwidth_limit_bytes': ('gauge', 'Bandwidth cap the running jobs share, 0 for none'),
+    }
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {name: {} for name in self.METRICS}  # name -> label tuple -> value
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Get the shared registry, creating it on first use"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _key(self, labels):
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._series[name][self._key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            histogram['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def drain(self):
+        """Take every series recorded so far and start over, for a worker process to hand to the app"""
+        with self._lock:
+            series, self._series = self._series, {name: {} for name in self.METRICS}
+        return {name: values for name, values in series.items() if values}
+
+    def merge(self, series):
+        """Add series drained from another registry: counters and histograms add up, gauges are replaced"""
+        with self._lock:
+            for name, values in series.items():
+                kind = self.METRICS[name][0]
+                target = self._series[name]
+                for key, value in values.items():
+                    if kind == 'gauge':
+                        target[key] = value
+                    elif kind == 'counter':
+                        target[key] = target.get(key, 0) + value
+                    elif key not in target:
+                        target[key] = {'counts': list(value['counts']), 'sum': value['sum'], 'count': value['count']}
+                    else:
+                        histogram = target[key]
+                        histogram['counts'] = [a + b for a, b in zip(histogram['counts'], value['counts'])]
+                        histogram['sum'] += value['sum']
+                        histogram['count'] += value['count']
+
+    def _cumulative(self, counts):
+        return list(itertools.accumulate(counts))
+
+    def snapshot(self):
+        """All series as plain dicts, for the JSON endpoint"""
+        result = {}
+        with self._lock:
+            for name, (kind, help_text) in self.METRICS.items():
+                samples = []
+                for key, value in self._series[name].items():
+                    sample = {'labels': dict(key)}
+                    if kind == 'histogram':
+                        cumulative = self._cumulative(value['counts'])
+                        sample['buckets'] = dict(zip([str(b) for b in self.buckets] + ['+Inf'], cumulative))
+                        sample['sum'] = value['sum']
+                        sample['count'] = value['count']
+                    else:
+                        sample['value'] = value
+                    samples.append(sample)
+                result[name] = {'type': kind, 'help': help_text, 'samples': samples}
+        return result
+
+    @staticmethod
+    def _format_labels(pairs):
+        parts = []
+        for name, value in pairs:
+            value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            parts.append(f'{name}="{value}"')
+        return '{' + ','.join(parts) + '}' if parts else ''
+
+    def render_prometheus(self):
+        """All series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self.METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for key, value in self._series[name].items():
+                    if kind == 'histogram':
+                        cumulative = self._cumulative(value['counts'])
+                        for bound, count in zip([str(b) for b in self.buckets] + ['+Inf'], cumulative):
+                            lines.append(f'{name}_bucket{self._format_labels(key + (("le", bound),))} {count}')
+                        lines.append(f'{name}_sum{self._format_labels(key)} {value["sum"]}')
+                        lines.append(f'{name}_count{self._format_labels(key)} {value["count"]}')
+                    else:
+                        lines.append(f'{name}{self._format_labels(key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """Serves the registry on localhost: /metrics (Prometheus text) and /metrics.json"""
+
+    def __init__(self, registry=None, host='127.0.0.1', port=9464):
+        self.registry = registry or MetricsRegistry.instance()
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if self._server is not None:
+            return
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path in ('/', '/metrics'):
+                    body = registry.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/metrics.json':
+                    body = json.dumps(registry.snapshot(), indent=2).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes every few seconds would flood the console
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+# --- Shared Connection Pool ---
+class DNSCache:
+    """TTL-bounded cache in front of socket.getaddrinfo.
+
+    Every new TCP connection in the process (requests, urllib3 and yt-dlp's own
+    handlers) resolves its host through socket.getaddrinfo first, so the number of
+    calls per host is also the number of connections that host has opened.
+    """
+
+    def __init__(self, ttl=300, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._original_getaddrinfo = None
+
+    def install(self):
+        """Route socket.getaddrinfo through the cache"""
+        if self._original_getaddrinfo is None:
+            self._original_getaddrinfo = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        """Restore the original socket.getaddrinfo"""
+        if self._original_getaddrinfo is not None:
+            socket.getaddrinfo = self._original_getaddrinfo
+            self._original_getaddrinfo = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        resolver = self._original_getaddrinfo or socket.getaddrinfo
+        if not host or self.ttl <= 0:
+            return resolver(host, port, family, type, proto, flags)
+
+        host_key = host.decode('idna') if isinstance(host, bytes) else str(host)
+        key = (host_key, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._host_stats(host_key)
+            stats['connects'] += 1
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                stats['dns_hits'] += 1
+                return list(entry[1])
+
+        start = time.monotonic()
+        result = resolver(host, port, family, type, proto, flags)
+        elapsed = time.monotonic() - start
+
+        with self._lock:
+            stats['dns_lookups'] += 1
+            stats['dns_seconds'] += elapsed
+            self._entries[key] = (now + self.ttl, tuple(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def _host_stats(self, host):
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = {'connects': 0, 'dns_lookups': 0, 'dns_hits': 0, 'dns_seconds': 0.0}
+        return stats
+
+    def stats(self):
+        with self._lock:
+            return {host: dict(values) for host, values in self._stats.items()}
+
+
+class _YoutubeDLLease:
+    """A pooled YoutubeDL plus the hooks and logger of the job currently holding it.
+
+    The lease is the instance's yt-dlp logger: it counts retries and forwards
+    each message to the holding job's logger, so records carry that job's context.
+    """
+
+    _default_logger = logging.getLogger('mediadl.yt_dlp')
+
+    def __init__(self):
+        self.ydl = None
+        self.progress_hooks = []
+        self.postprocessor_hooks = []
+        self.logger = None
+
+    def dispatch_progress(self, d):
+        for hook in self.progress_hooks:
+            hook(d)
+
+    def dispatch_postprocessor(self, d):
+        for hook in self.postprocessor_hooks:
+            hook(d)
+
+    def _count_retry(self, message):
+        # yt-dlp reports each retry as "<error>. Retrying [fragment N] (count/retries)..."
+        if 'Retrying' in message:
+            kind = 'fragment' if 'Retrying fragment' in message else 'http' if '[download]' in message else 'extractor'
+            MetricsRegistry.instance().inc('mediadl_retries_total', kind=kind)
+
+    def _log(self, level, message):
+        (self.logger or self._default_logger).log(level, message, extra={'source': 'yt-dlp'})
+
+    def debug(self, message):
+        # yt-dlp sends both its screen output and verbose output here
+        self._count_retry(message)
+        self._log(logging.DEBUG if message.startswith('[debug] ') else logging.INFO, message)
+
+    def info(self, message):
+        self._log(logging.INFO, message)
+
+    def warning(self, message):
+        self._count_retry(message)
+        self._log(logging.WARNING, message)
+
+    def error(self, message):
+        self._log(logging.ERROR, message)
+
+
+class ConnectionPool:
+    """Process-wide keep-alive pool shared by extraction, downloads and update checks.
+
+    Update checks go through one requests.Session. YoutubeDL instances are pooled
+    per option profile so the next job with the same options reuses the previous
+    job's open connections instead of doing DNS, TCP and TLS from scratch.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, dns_ttl=300, pool_maxsize=10, max_idle_per_profile=3, max_profiles=8):
+        self.dns_cache = DNSCache(ttl=dns_ttl)
+        self.dns_cache.install()
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.hooks['response'].append(self._record_response)
+
+        self.max_idle_per_profile = max_idle_per_profile
+        self.max_profiles = max_profiles
+        self._idle = OrderedDict()  # option profile -> idle leases
+        self._request_stats = {}
+        self._ydl_stats = {'created': 0, 'reused': 0}
+        self._lock = threading.Lock()
+        self.ydl_class = yt_dlp.YoutubeDL  # Swapped for FixtureYoutubeDL to record or replay
+
+    @classmethod
+    def instance(cls):
+        """Get the shared pool, creating it on first use"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def get(self, url, **kwargs):
+        """requests.get over the shared keep-alive session"""
+        return self.session.get(url, **kwargs)
+
+    @contextmanager
+    def youtube_dl(self, ydl_opts):
+        """Lease a YoutubeDL built from ydl_opts.
+
+        The instance is returned to the pool afterwards so its connections stay
+        alive for the next job with identical options. progress_hooks,
+        postprocessor_hooks and logger are not part of the profile; they are
+        swapped in for the duration of the lease.
+        """
+        opts = dict(ydl_opts)
+        progress_hooks = list(opts.pop('progress_hooks', None) or [])
+        postprocessor_hooks = list(opts.pop('postprocessor_hooks', None) or [])
+        logger = opts.pop('logger', None)
+        key = self._profile_key(opts)
+
+        lease = self._checkout(key)
+        if lease is None:
+            lease = _YoutubeDLLease()
+            opts['progress_hooks'] = [lease.dispatch_progress]
+            opts['postprocessor_hooks'] = [lease.dispatch_postprocessor]
+            opts['logger'] = lease
+            lease.ydl = self.ydl_class(opts)
+            with self._lock:
+                self._ydl_stats['created'] += 1
+
+        lease.progress_hooks = progress_hooks
+        lease.postprocessor_hooks = postprocessor_hooks
+        lease.logger = logger
+        try:
+            yield lease.ydl
+        except BaseException:
+            # Don't hand a half-torn-down instance to the next job
+            lease.progress_hooks = []
+            lease.postprocessor_hooks = []
+            lease.logger = None
+            self._close_lease(lease)
+            raise
+        lease.progress_hooks = []
+        lease.postprocessor_hooks = []
+        lease.logger = None
+        self._checkin(key, lease)
+
+    def _profile_key(self, opts):
+        return json.dumps(opts, sort_keys=True, default=repr)
+
+    def _checkout(self, key):
+        with self._lock:
+            leases = self._idle.get(key)
+            if leases:
+                self._idle.move_to_end(key)
+                self._ydl_stats['reused'] += 1
+                return leases.pop()
+        return None
+
+    def _checkin(self, key, lease):
+        evicted = []
+        with self._lock:
+            leases = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(leases) < self.max_idle_per_profile:
+                leases.append(lease)
+            else:
+                evicted.append(lease)
+            while len(self._idle) > self.max_profiles:
+                _, old = self._idle.popitem(last=False)
+                evicted.extend(old)
+        for old_lease in evicted:
+            self._close_lease(old_lease)
+
+    def _close_lease(self, lease):
+        try:
+            lease.ydl.close()
+        except Exception:
+            log.debug("Closing a pooled YoutubeDL failed", exc_info=True)
+
+    def _record_response(self, response, *args, **kwargs):
+        host = urlparse(response.url).hostname or ''
+        with self._lock:
+            stats = self._request_stats.setdefault(host, {'requests': 0, 'request_seconds': 0.0})
+            stats['requests'] += 1
+            stats['request_seconds'] += response.elapsed.total_seconds()
+
+    def host_stats(self):
+        """Per-host connection, DNS and request counters"""
+        stats = self.dns_cache.stats()
+        with self._lock:
+            for host, values in self._request_stats.items():
+                stats.setdefault(host, {}).update(values)
+        return stats
+
+    def youtube_dl_stats(self):
+        with self._lock:
+            return dict(self._ydl_stats, idle=sum(len(leases) for leases in self._idle.values()))
+
+    def close(self):
+        """Close pooled YoutubeDL instances and the shared session"""
+        with self._lock:
+            leases = [lease for idle in self._idle.values() for lease in idle]
+            self._idle.clear()
+        for lease in leases:
+            self._close_lease(lease)
+        self.session.close()
+
+# --- Record and Replay Fixtures ---
+class _PacedReader(io.RawIOBase):
+    """Reads a recorded body no faster than it originally arrived"""
+
+    def __init__(self, fp, size, duration):
+        self._fp = fp
+        self._size = size
+        self._duration = duration
+        self._sent = 0
+        self._started = time.monotonic()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self._fp.readinto(buffer)
+        self._sent += count
+        if self._duration and self._size:
+            ahead = self._sent / self._size * self._duration - (time.monotonic() - self._started)
+            if ahead > 0:
+                time.sleep(ahead)
+        return count
+
+    def close(self):
+        self._fp.close()
+        super().close()
+
+
+class FixtureBundle:
+    """HTTP exchanges and info dicts from a real run, replayable without the network.
+
+    A bundle is a directory holding exchanges.jsonl (one request and its response
+    per line, with timings), bodies/ (response bodies named by content hash) and
+    info.jsonl (what each top-level extraction returned). Replay answers every
+    request from the bundle, in recorded order for repeated requests, and waits
+    out the recorded time to first byte and transfer time divided by speed
+    (0 replays as fast as possible).
+
+    Set MEDIADL_FIXTURE_MODE=record|replay, MEDIADL_FIXTURE_DIR and optionally
+    MEDIADL_FIXTURE_SPEED to use one from the app.
+    """
+
+    MODES = ('record', 'replay')
+
+    def __init__(self, path, mode, speed=1.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown fixture mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._exchanges = {}  # request key -> recorded exchanges, in order
+        self._served = {}  # request key -> how many of them replay has used
+        self._info = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, 'bodies'), exist_ok=True)
+        if mode == 'replay':
+            self._load()
+
+    @classmethod
+    def from_env(cls):
+        """The bundle configured by environment variables, or None"""
+        mode = os.environ.get('MEDIADL_FIXTURE_MODE', '').lower()
+        if mode not in cls.MODES:
+            return None
+        return cls(os.environ.get('MEDIADL_FIXTURE_DIR') or 'fixtures', mode,
+                   float(os.environ.get('MEDIADL_FIXTURE_SPEED', 1.0)))
+
+    def install(self, pool=None):
+        """Make every pooled YoutubeDL record into or replay from this bundle"""
+        FixtureYoutubeDL.bundle = self
+        (pool or ConnectionPool.instance()).ydl_class = FixtureYoutubeDL
+
+    def _load(self):
+        exchanges_path = os.path.join(self.path, 'exchanges.jsonl')
+        if os.path.exists(exchanges_path):
+            with open(exchanges_path) as f:
+                for line in f:
+                    exchange = json.loads(line)
+                    self._exchanges.setdefault(exchange['key'], []).append(exchange)
+        info_path = os.path.join(self.path, 'info.jsonl')
+        if os.path.exists(info_path):
+            with open(info_path) as f:
+                self._info = [json.loads(line) for line in f]
+
+    def rewind(self):
+        """Start replaying repeated requests from their first recording again"""
+        with self._lock:
+            self._served.clear()
+
+    def urls(self):
+        """URLs whose extraction was recorded, in order"""
+        return [entry['url'] for entry in self._info]
+
+    def info(self, url):
+        for entry in self._info:
+            if entry['url'] == url:
+                return entry['info']
+        return None
+
+    @staticmethod
+    def request_key(request):
+        body = request.data if isinstance(request.data, bytes) else b''
+        return '\n'.join([request.method, request.url, request.headers.get('Range', ''),
+                          hashlib.sha1(body).hexdigest()])
+
+    def _append(self, filename, record):
+        with self._lock:
+            with open(os.path.join(self.path, filename), 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def record_info(self, url, info):
+        self._append('info.jsonl', {'url': url, 'info': info})
+
+    def record(self, request, send):
+        """Send the request for real and save the exchange; returns a response over the saved body"""
+        key = self.request_key(request)
+        started = time.monotonic()
+        error = None
+        try:
+            response = send(request)
+        except yt_dlp.networking.exceptions.HTTPError as e:
+            error, response = e, e.response
+        except yt_dlp.networking.exceptions.RequestError as e:
+            self._append('exchanges.jsonl', {'key': key, 'url': request.url, 'error': str(e)})
+            raise
+        first_byte = time.monotonic() - started
+
+        # Stream the body to disk while hashing, so large media isn't held in memory
+        digest = hashlib.sha1()
+        partial_path = os.path.join(self.path, 'bodies', f'partial-{threading.get_ident()}-{id(response)}')
+        size = 0
+        with open(partial_path, 'wb') as f:
+            while True:
+                chunk = response.read(256 * 1024)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        response.close()
+        body_path = os.path.join(self.path, 'bodies', digest.hexdigest())
+        os.replace(partial_path, body_path)
+
+        exchange = {
+            'key': key,
+            'url': response.url,
+            'status': response.status,
+            'reason': response.reason,
+            'headers': list(response.headers.items()),
+            'body': digest.hexdigest(),
+            'size': size,
+            'first_byte': first_byte,
+            'duration': time.monotonic() - started - first_byte,
+        }
+        self._append('exchanges.jsonl', exchange)
+        replayed = self._response(exchange, paced=False)
+        if error is not None:
+            raise yt_dlp.networking.exceptions.HTTPError(replayed)
+        return replayed
+
+    def replay(self, request):
+        """The recorded response for request, after its recorded delay"""
+        key = self.request_key(request)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                raise yt_dlp.networking.exceptions.TransportError(f"No recorded response for {request.url}")
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        exchange = exchanges[min(index, len(exchanges) - 1)]  # Extra repeats get the last answer
+        if self.speed and exchange.get('first_byte'):
+            time.sleep(exchange['first_byte'] / self.speed)
+        if 'error' in exchange:
+            raise yt_dlp.networking.exceptions.TransportError(exchange['error'])
+        response = self._response(exchange, paced=True)
+        if response.status >= 400:
+            raise yt_dlp.networking.exceptions.HTTPError(response)
+        return response
+
+    def _response(self, exchange, paced):
+        fp = open(os.path.join(self.path, 'bodies', exchange['body']), 'rb')
+        if paced and self.speed:
+            fp = io.BufferedReader(_PacedReader(fp, exchange['size'], exchange['duration'] / self.speed))
+        response = yt_dlp.networking.Response(fp, exchange['url'], {}, status=exchange['status'],
+                                              reason=exchange.get('reason'))
+        for name, value in exchange['headers']:
+            response.headers.add_header(name, value)
+        return response
+
+
+class FixtureYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL whose HTTP traffic goes through FixtureBundle.bundle"""
+
+    bundle = None
+
+    def __init__(self, params=None, auto_init=True):
+        self._fixture_depth = 0
+        super().__init__(params, auto_init)
+
+    def urlopen(self, req):
+        if isinstance(req, str):
+            req = yt_dlp.networking.Request(req)
+        if self.bundle.mode == 'replay':
+            return self.bundle.replay(req)
+        return self.bundle.record(req, super().urlopen)
+
+    def process_ie_result(self, ie_result, download=True, extra_info=None):
+        # Playlists recurse through here; only the outermost result is worth keeping
+        self._fixture_depth += 1
+        try:
+            result = super().process_ie_result(ie_result, download, extra_info)
+        finally:
+            self._fixture_depth -= 1
+        if self.bundle.mode == 'record' and not self._fixture_depth and isinstance(result, dict):
+            self.bundle.record_info(result.get('original_url') or result.get('webpage_url'),
+                                    self.sanitize_info(result))
+        return result
+
+# --- Proxy Pool ---
+class ProxyPool:
+    """Spreads jobs across several proxies and ejects the ones that misbehave.
+
+    Proxies are picked round-robin or by fewest active jobs. A background thread
+    probes every proxy; a proxy that fails its probe, answers slower than
+    max_latency or fails max_failures jobs in a row is ejected for eject_seconds
+    and only comes back once a probe succeeds again.
+    """
+
+    STRATEGIES = ('round_robin', 'least_loaded')
+    DEFAULT_PROBE_URL = 'https://www.gstatic.com/generate_204'
+
+    def __init__(self, proxies=None, strategy='round_robin', probe_url=None,
+                 probe_interval=60, max_latency=5.0, max_failures=3, eject_seconds=300):
+        self.strategy = strategy if strategy in self.STRATEGIES else 'round_robin'
+        self.probe_url = probe_url or self.DEFAULT_PROBE_URL
+        self.probe_interval = probe_interval
+        self.max_latency = max_latency
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self._proxies = OrderedDict()
+        self._next_index = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._health_thread = None
+        self.set_proxies(proxies or [])
+
+    def set_proxies(self, proxies):
+        """Replace the proxy list, keeping state for proxies that stay"""
+        with self._lock:
+            previous = self._proxies
+            self._proxies = OrderedDict()
+            for proxy in proxies:
+                proxy = proxy.strip()
+                if proxy and proxy not in self._proxies:
+                    self._proxies[proxy] = previous.get(proxy) or self._new_state()
+            self._next_index = 0
+
+    def _new_state(self):
+        return {
+            'active': 0,
+            'jobs': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'bytes': 0,
+            'seconds': 0.0,
+            'latency': None,
+            'ejected': False,
+            'ejected_until': 0.0,
+            'last_probe': None,
+        }
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def _eject(self, state, now):
+        state['ejected'] = True
+        state['ejected_until'] = max(state['ejected_until'], now + self.eject_seconds)
+
+    def acquire(self):
+        """Pick a proxy for a new job, or None if the pool is empty"""
+        with self._lock:
+            if not self._proxies:
+                return None
+            urls = list(self._proxies)
+            candidates = [url for url in urls if not self._proxies[url]['ejected']]
+            if not candidates:
+                # Everything is ejected - use the proxy that comes back soonest
+                # rather than silently falling back to a direct connection
+                candidates = [min(urls, key=lambda url: self._proxies[url]['ejected_until'])]
+
+            if self.strategy == 'least_loaded':
+                proxy = min(candidates, key=lambda url: (self._proxies[url]['active'], self._proxies[url]['jobs']))
+            else:
+                proxy = None
+                for offset in range(len(urls)):
+                    url = urls[(self._next_index + offset) % len(urls)]
+                    if url in candidates:
+                        proxy = url
+                        self._next_index = (urls.index(url) + 1) % len(urls)
+                        break
+
+            state = self._proxies[proxy]
+            state['active'] += 1
+            state['jobs'] += 1
+            return proxy
+
+    def release(self, proxy, bytes_downloaded=0, elapsed=0.0, failed=False):
+        """Return a proxy after a job, recording its throughput and outcome"""
+        with self._lock:
+            state = self._proxies.get(proxy)
+            if state is None:
+                return  # Removed from the list while the job ran
+            state['active'] = max(0, state['active'] - 1)
+            state['bytes'] += bytes_downloaded
+            state['seconds'] += elapsed
+            if failed:
+                state['failures'] += 1
+                state['consecutive_failures'] += 1
+                if state['consecutive_failures'] >= self.max_failures:
+                    self._eject(state, time.monotonic())
+            else:
+                state['consecutive_failures'] = 0
+
+    def probe(self, proxy):
+        """Probe one proxy and eject or readmit it"""
+        started = time.monotonic()
+        try:
+            response = ConnectionPool.instance().session.get(
+                self.probe_url, proxies={'http': proxy, 'https': proxy},
+                timeout=self.max_latency * 2, stream=True)
+            response.close()
+            healthy = response.status_code < 500
+        except requests.exceptions.RequestException:
+            healthy = False
+        latency = time.monotonic() - started
+
+        with self._lock:
+            state = self._proxies.get(proxy)
+            if state is None:
+                return False
+            now = time.monotonic()
+            state['last_probe'] = now
+            if healthy:
+                state['latency'] = latency if state['latency'] is None else 0.7 * state['latency'] + 0.3 * latency
+                healthy = state['latency'] <= self.max_latency
+            if not healthy:
+                self._eject(state, now)
+            elif state['ejected'] and state['ejected_until'] <= now:
+                # Readmit only after the ejection period and a passing probe
+                state['ejected'] = False
+                state['consecutive_failures'] = 0
+        return healthy
+
+    def probe_all(self, stop_event=None):
+        for proxy in list(self._proxies):
+            if stop_event is not None and stop_event.is_set():
+                break
+            self.probe(proxy)
+
+    def start_health_checks(self):
+        """Start the background probe thread (no-op if already running)"""
+        if self._health_thread and self._health_thread.is_alive() and not self._stop_event.is_set():
+            return
+        # Each probe thread gets its own stop event so a restart never revives a stopping thread
+        self._stop_event = threading.Event()
+        self._health_thread = threading.Thread(target=self._health_loop, args=(self._stop_event,),
+                                               name='proxy-health', daemon=True)
+        self._health_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _health_loop(self, stop_event):
+        while not stop_event.is_set():
+            if self._proxies:
+                self.probe_all(stop_event)
+            stop_event.wait(self.probe_interval)
+
+    def stats(self):
+        """Per-proxy load, health and throughput"""
+        with self._lock:
+            result = {}
+            for proxy, state in self._proxies.items():
+                result[proxy] = {
+                    'active': state['active'],
+                    'jobs': state['jobs'],
+                    'failures': state['failures'],
+                    'bytes': state['bytes'],
+                    'throughput': state['bytes'] / state['seconds'] if state['seconds'] else 0.0,
+                    'latency': state['latency'],
+                    'healthy': not state['ejected'],
+                }
+            return result
+
 # --- Update Checker Utility ---
 class UpdateChecker:
     YT_DLP_VERSION_URL = "https://api.github.com/repos/yt-dlp/yt-dlp/releases/latest"
@@ -31,8 +1042,8 @@ class UpdateChecker:
             version = getattr(yt_dlp, '__version__', None)
             if version:
                 return version
-        except:
-            pass
+        except ImportError:
+            log.debug("yt_dlp module has no version; asking the command line")
         
         # Fallback to command line
         try:
@@ -40,8 +1051,8 @@ class UpdateChecker:
                                   capture_output=True, text=True, timeout=10)
             if result.returncode == 0 and result.stdout.strip():
                 return result.stdout.strip()
-        except:
-            pass
+        except (OSError, subprocess.SubprocessError) as e:
+            log.warning("Could not run yt-dlp to get its version: %s", e)
             
         # If all methods fail, return a more user-friendly message
         return 'unknown'
@@ -66,7 +1077,7 @@ class UpdateChecker:
                 }
             
             # Fetch latest version info from GitHub
-            response = requests.get(UpdateChecker.YT_DLP_VERSION_URL, timeout=10)
+            response = ConnectionPool.instance().get(UpdateChecker.YT_DLP_VERSION_URL, timeout=10)
             response.raise_for_status()
             latest_release = response.json()
             latest_version = latest_release['tag_name'].lstrip('v')  # Remove 'v' prefix
@@ -87,6 +1098,7 @@ class UpdateChecker:
                     'latest_version': latest_version
                 }
         except requests.exceptions.RequestException as e:
+            log.warning("Media engine update check failed: %s", e)
             return {
                 'status': 'error', 
                 'message': 'We couldn\'t check for updates due to a network issue:\n\n'
@@ -98,6 +1110,7 @@ class UpdateChecker:
                           '4. Try again in a few minutes'
             }
         except Exception as e:
+            log.exception("Unexpected error checking for media engine updates")
             return {
                 'status': 'error', 
                 'message': 'We encountered an unexpected issue while checking for updates:\n\n'
@@ -125,6 +1138,7 @@ class UpdateChecker:
                               '2. Your downloads will now benefit from the latest improvements and bug fixes'
                 }
             else:
+                log.warning("pip could not update yt-dlp (exit code %s): %s", result.returncode, result.stderr.strip())
                 return {
                     'status': 'error', 
                     'message': 'We couldn\'t update the media engine automatically. This might be because:\n\n'
@@ -138,6 +1152,7 @@ class UpdateChecker:
                               f'4. Error details: {result.stderr}'
                 }
         except Exception as e:
+            log.exception("Media engine update failed")
             return {
                 'status': 'error', 
                 'message': 'We encountered an unexpected issue while trying to update the media engine:\n\n'
@@ -153,7 +1168,7 @@ class UpdateChecker:
         """Check if there's a newer version of the application available"""
         try:
             # Fetch latest version info from GitHub (replace with actual URL)
-            response = requests.get(UpdateChecker.APP_VERSION_URL, timeout=10)
+            response = ConnectionPool.instance().get(UpdateChecker.APP_VERSION_URL, timeout=10)
             if response.status_code == 404:
                 # Repository not found, assume up to date
                 return {
@@ -182,6 +1197,7 @@ class UpdateChecker:
                     'latest_version': latest_version
                 }
         except Exception as e:
+            log.warning("App update check failed: %s", e)
             return {'status': 'error', 'message': f'Failed to check for app updates: {str(e)}'}
     
     @staticmethod
@@ -199,8 +1215,8 @@ class UpdateChecker:
                     return False
             # If all parts compared equal, check if new version has more parts
             return len(new_parts) > len(current_parts)
-        except:
-            # Fallback to string comparison
+        except (ValueError, AttributeError):
+            # Fallback to string comparison (e.g. date-style or pre-release versions)
             return new_version > current_version
 
 # --- Update Dialog ---
@@ -253,74 +1269,259 @@ class UpdateDialog(QDialog):
 
 # --- Error Handling Utility ---
 class ErrorClassifier:
-    @staticmethod
-    def classify_error(error_message):
-        """Classify errors into categories with user-friendly messages"""
-        error_message = str(error_message).lower()
-        
-        # File system errors (check first to avoid conflicts)
-        if any(keyword in error_message for keyword in ['permission', 'access denied', 'disk', 'space', 'read-only', 'no space', 'cannot create', 'directory not found']):
-            return {
-                'category': 'File System Access Issue',
-                'message': 'We couldn\'t save the file to your selected location.',
-                'suggestion': 'Check if you have write permissions to the download folder and ensure there\'s enough disk space. Try selecting a different download directory in Settings.'
-            }
-        
-        # Invalid URL errors - More specific patterns for invalid URLs
-        # Check for extractor-related errors first (before format errors)
-        if any(keyword in error_message for keyword in ['no suitable extractor', 'unable to extract', 'this video is unavailable', 'infoextractor']):
-            return {
-                'category': 'Invalid or Unsupported Link',
-                'message': 'The link you provided doesn\'t seem to be valid or isn\'t supported by our downloader.',
-                'suggestion': 'Please double-check the URL and make sure it\'s from a supported platform. Sometimes links expire, get removed, or are mistyped.'
-            }
-        
-        # Format/codec errors (but not extractor-related)
-        if any(keyword in error_message for keyword in ['ffmpeg', 'codec', 'format', 'unsupported format']) and 'extractor' not in error_message:
-            return {
-                'category': 'Media Processing Issue',
-                'message': 'We had trouble processing this media format.',
-                'suggestion': 'Try changing the download format in Settings. Some formats may not be compatible with your system.'
-            }
-        
-        # Invalid URL errors - Basic patterns
-        if any(keyword in error_message for keyword in ['invalid url', 'unsupported url', 'not found', '404', 'not a valid url']):
-            return {
-                'category': 'Invalid or Unsupported Link',
-                'message': 'The link you provided doesn\'t seem to be valid or isn\'t supported by our downloader.',
-                'suggestion': 'Please double-check the URL and make sure it\'s from a supported platform. Sometimes links expire, get removed, or are mistyped.'
-            }
-        
-        # Authentication errors
-        if any(keyword in error_message for keyword in ['login', 'authentication', 'signin', 'forbidden', '403', 'private', 'age-restricted']):
-            return {
-                'category': 'Access Restricted Content',
-                'message': 'This content requires special permissions or login credentials.',
-                'suggestion': 'The video might be private, age-restricted, or region-blocked. Try logging into the platform directly first, or check if you have the necessary permissions.'
-            }
-        
-        # Network errors
-        if any(keyword in error_message for keyword in ['timeout', 'network', 'connection', 'unreachable', 'dns', 'resolve', 'internet', 'getaddrinfo failed']):
-            return {
-                'category': 'Network Connection Issue',
-                'message': 'We couldn\'t establish a stable connection to the server.',
-                'suggestion': 'Please check your internet connection and try again. If you\'re using a proxy or firewall, make sure it\'s properly configured in Settings.'
-            }
-        
-        # Server errors
-        if any(keyword in error_message for keyword in ['server', '500', '502', '503', '504', 'unavailable', 'service unavailable']):
-            return {
-                'category': 'Server Temporarily Unavailable',
-                'message': 'The platform\'s servers are currently experiencing issues.',
-                'suggestion': 'Please try again in a few minutes. This is usually a temporary problem on the platform\'s side, not with our application.'
-            }
-        
-        # Generic fallback
-        return {
-            'category': 'Unexpected Issue',
+    """Sorts download errors into categories with user-friendly text.
+
+    An exception is matched on its type and HTTP status first, looking through
+    the causes yt-dlp wraps it in. Otherwise its message goes through a single
+    precompiled pattern holding every rule's keywords; when several rules match,
+    the earliest in RULES wins, and a rule's 'unless' keywords veto it. Extra
+    rules from the error_rules setting (see configure) run before the built-in
+    ones. Results are memoized on the exception and per message, and are shared:
+    don't modify them.
+
+    'transient' says whether trying again later can help; the download manager
+    retries those and fails the rest at once.
+    """
+
+    CATEGORIES = {
+        'File System Access Issue': {
+            'message': 'We couldn\'t save the file to your selected location.',
+            'suggestion': 'Check if you have write permissions to the download folder and ensure there\'s enough disk space. Try selecting a different download directory in Settings.',
+            'transient': False,
+        },
+        'Invalid or Unsupported Link': {
+            'message': 'The link you provided doesn\'t seem to be valid or isn\'t supported by our downloader.',
+            'suggestion': 'Please double-check the URL and make sure it\'s from a supported platform. Sometimes links expire, get removed, or are mistyped.',
+            'transient': False,
+        },
+        'Media Processing Issue': {
+            'message': 'We had trouble processing this media format.',
+            'suggestion': 'Try changing the download format in Settings. Some formats may not be compatible with your system.',
+            'transient': False,
+        },
+        'Access Restricted Content': {
+            'message': 'This content requires special permissions or login credentials.',
+            'suggestion': 'The video might be private, age-restricted, or region-blocked. Try logging into the platform directly first, or check if you have the necessary permissions.',
+            'transient': False,
+        },
+        'Network Connection Issue': {
+            'message': 'We couldn\'t establish a stable connection to the server.',
+            'suggestion': 'Please check your internet connection and try again. If you\'re using a proxy or firewall, make sure it\'s properly configured in Settings.',
+            'transient': True,
+        },
+        'Server Temporarily Unavailable': {
+            'message': 'The platform\'s servers are currently experiencing issues.',
+            'suggestion': 'Please try again in a few minutes. This is usually a temporary problem on the platform\'s side, not with our application.',
+            'transient': True,
+        },
+        'Unexpected Issue': {
             'message': 'Something unexpected happened during the download process.',
-            'suggestion': 'Please try again with a different URL or download type. If the problem continues, consider updating the media engine through the Check Updates button.'
-        }
+            'suggestion': 'Please try again with a different URL or download type. If the problem continues, consider updating the media engine through the Check Updates button.',
+            'transient': True,
+        },
+    }
+    FALLBACK = 'Unexpected Issue'
+
+    # Exception types, checked innermost cause first; HTTP errors go by status instead
+    EXCEPTION_RULES = (
+        (yt_dlp.utils.UnsupportedError, 'Invalid or Unsupported Link'),
+        (yt_dlp.utils.GeoRestrictedError, 'Access Restricted Content'),
+        (yt_dlp.utils.PostProcessingError, 'Media Processing Issue'),
+        (PermissionError, 'File System Access Issue'),
+        (yt_dlp.networking.exceptions.TransportError, 'Network Connection Issue'),
+        (TimeoutError, 'Network Connection Issue'),
+        (ConnectionError, 'Network Connection Issue'),
+    )
+    DISK_ERRNOS = {28, 30, 122}  # ENOSPC, EROFS, EDQUOT
+
+    STATUS_RULES = {401: 'Access Restricted Content', 403: 'Access Restricted Content',
+                    404: 'Invalid or Unsupported Link', 410: 'Invalid or Unsupported Link',
+                    408: 'Network Connection Issue', 429: 'Server Temporarily Unavailable'}
+
+    # (category, keywords, unless) in priority order
+    RULES = (
+        ('File System Access Issue',
+         ('permission', 'access denied', 'disk', 'space', 'read-only', 'no space', 'cannot create', 'directory not found'), ()),
+        ('Invalid or Unsupported Link',
+         ('no suitable extractor', 'unable to extract', 'this video is unavailable', 'infoextractor'), ()),
+        ('Media Processing Issue', ('ffmpeg', 'codec', 'format', 'unsupported format'), ('extractor',)),
+        ('Invalid or Unsupported Link', ('invalid url', 'unsupported url', 'not found', '404', 'not a valid url'), ()),
+        ('Access Restricted Content',
+         ('login', 'authentication', 'signin', 'forbidden', '403', 'private', 'age-restricted'), ()),
+        ('Network Connection Issue',
+         ('timeout', 'network', 'connection', 'unreachable', 'dns', 'resolve', 'internet', 'getaddrinfo failed'), ()),
+        ('Server Temporarily Unavailable',
+         ('server', '500', '502', '503', '504', 'unavailable', 'service unavailable'), ()),
+    )
+
+    STATUS_PREFIX = 'http error '  # yt-dlp's "HTTP Error 404: Not Found"
+    CACHE_SIZE = 1024
+    _results = {}  # category -> shared result dict
+    _matcher = None  # (compiled pattern, keyword -> rule indexes, keyword -> vetoed rule indexes, categories)
+    _cache = OrderedDict()  # message -> result, least recently used first
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, extra_rules=None):
+        """Compile the rules, with extra_rules (from the error_rules setting) ahead of the built-in ones.
+
+        Each extra rule is a dict with 'category' and 'keywords', and optionally
+        'unless', 'status' (HTTP codes), and for a new category 'message',
+        'suggestion' and 'transient'.
+        """
+        categories = {name: dict(info) for name, info in cls.CATEGORIES.items()}
+        status_rules = dict(cls.STATUS_RULES)
+        rules = []
+        for rule in extra_rules or []:
+            name = rule.get('category')
+            if not name or not (rule.get('keywords') or rule.get('status')):
+                log.warning("Ignoring error rule without a category and keywords or status: %r", rule)
+                continue
+            if name not in categories:
+                categories[name] = {
+                    'message': rule.get('message', cls.CATEGORIES[cls.FALLBACK]['message']),
+                    'suggestion': rule.get('suggestion', cls.CATEGORIES[cls.FALLBACK]['suggestion']),
+                    'transient': bool(rule.get('transient', False)),
+                }
+            for status in rule.get('status') or []:
+                status_rules[int(status)] = name
+            if rule.get('keywords'):
+                rules.append((name, tuple(rule['keywords']), tuple(rule.get('unless') or ())))
+        rules.extend(cls.RULES)
+
+        hits = {}
+        vetoes = {}
+        for index, (name, keywords, unless) in enumerate(rules):
+            for keyword in keywords:
+                hits.setdefault(keyword.lower(), []).append(index)
+            for keyword in unless:
+                vetoes.setdefault(keyword.lower(), []).append(index)
+        pattern = re.compile(cls._keyword_pattern(set(hits) | set(vetoes) | {cls.STATUS_PREFIX}))
+        results = {name: dict(info, category=name) for name, info in categories.items()}
+        with cls._lock:
+            cls._results = results
+            cls._status_rules = status_rules
+            cls._matcher = (pattern, hits, vetoes, [name for name, _, _ in rules])
+            cls._cache.clear()
+
+    @staticmethod
+    def _keyword_pattern(keywords):
+        """Regex for the keywords as a prefix tree, so each position costs one branch, not one per keyword.
+
+        Quantifiers are greedy, so a phrase wins over a keyword that starts it.
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword.lower():
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node):
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return f'(?:{body})?' if '' in node else body
+        return build(trie)
+
+    @classmethod
+    def classify_error(cls, error):
+        """Classify an exception or error message; the result is memoized on the exception"""
+        if cls._matcher is None:
+            cls.configure()
+        if isinstance(error, BaseException):
+            cached = getattr(error, '_mediadl_classification', None)
+            if cached is not None:
+                return cached
+            result = cls._classify_exception(error) or cls._classify_message(str(error))
+            try:
+                error._mediadl_classification = result
+            except AttributeError:
+                pass
+            return result
+        return cls._classify_message(str(error))
+
+    @staticmethod
+    def _causes(error):
+        """The error and the exceptions it wraps, outermost first"""
+        chain = []
+        while error is not None and error not in chain and len(chain) < 8:
+            chain.append(error)
+            exc_info = getattr(error, 'exc_info', None)
+            if isinstance(exc_info, tuple) and len(exc_info) > 1 and isinstance(exc_info[1], BaseException):
+                error = exc_info[1]  # DownloadError wraps the original exception
+            elif isinstance(getattr(error, 'cause', None), BaseException):
+                error = error.cause  # ExtractorError
+            else:
+                error = error.__cause__ or error.__context__
+        return chain
+
+    @classmethod
+    def http_status(cls, error):
+        """HTTP status of the innermost cause of error that has one, or None"""
+        for cause in reversed(cls._causes(error)):
+            status = getattr(cause, 'status', None) or getattr(cause, 'code', None)
+            if isinstance(status, int) and 100 <= status < 600:
+                return status
+        return None
+
+    @classmethod
+    def _classify_exception(cls, error):
+        for cause in reversed(cls._causes(error)):
+            status = getattr(cause, 'status', None) or getattr(cause, 'code', None)
+            if isinstance(status, int) and 400 <= status < 600:
+                category = cls._status_rules.get(status)
+                if category is None and status >= 500:
+                    category = 'Server Temporarily Unavailable'
+                if category is not None:
+                    return cls._results[category]
+            if isinstance(cause, OSError) and cause.errno in cls.DISK_ERRNOS:
+                return cls._results['File System Access Issue']
+            for exception_type, category in cls.EXCEPTION_RULES:
+                if isinstance(cause, exception_type):
+                    return cls._results[category]
+        return None
+
+    @classmethod
+    def _classify_message(cls, message):
+        with cls._lock:
+            result = cls._cache.get(message)
+            if result is not None:
+                cls._cache.move_to_end(message)
+                return result
+        result = cls.match(message)
+        with cls._lock:
+            cls._cache[message] = result
+            if len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return result
+
+    @classmethod
+    def match(cls, message):
+        """One scan of the message for every rule's keywords, without the cache"""
+        if cls._matcher is None:
+            cls.configure()
+        pattern, hits, vetoes, categories = cls._matcher
+        text = message.lower()
+        matched = set()
+        vetoed = set()
+        status = None
+        for match in pattern.finditer(text):
+            keyword = match.group()
+            if keyword == cls.STATUS_PREFIX:
+                code = text[match.end():match.end() + 3]
+                if status is None and code.isdigit():
+                    status = int(code)
+                continue
+            matched.update(hits.get(keyword, ()))
+            vetoed.update(vetoes.get(keyword, ()))
+        if status is not None:
+            category = cls._status_rules.get(status) or ('Server Temporarily Unavailable' if status >= 500 else None)
+            if category is not None:
+                return cls._results[category]
+        candidates = matched - vetoed
+        return cls._results[categories[min(candidates)] if candidates else cls.FALLBACK]
     
     @staticmethod
     def format_error_message(original_error, classified_error):
@@ -334,7 +1535,7 @@ class SettingsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Settings")
         self.setModal(True)
-        self.resize(400, 200)
+        self.resize(400, 300)
         
         layout = QFormLayout()
         
@@ -352,8 +1553,27 @@ class SettingsDialog(QDialog):
         self.retries_spinbox = QSpinBox()
         self.retries_spinbox.setRange(0, 10)
         self.retries_spinbox.setValue(5)
+        self.retries_spinbox.setToolTip("How many times a download that failed for a temporary reason goes back to "
+                                        "the queue, and how often a failed fragment is fetched again")
         layout.addRow("Max Retries:", self.retries_spinbox)
         
+        # Parallel downloads (0 = tune automatically)
+        self.concurrency_spinbox = QSpinBox()
+        self.concurrency_spinbox.setRange(0, 16)
+        self.concurrency_spinbox.setSpecialValueText("Auto")
+        layout.addRow("Parallel Downloads:", self.concurrency_spinbox)
+        
+        # Batch queue order
+        self.policy_combo = QComboBox()
+        self.policy_combo.addItems(["Smallest First", "In Order", "Fair Share"])
+        layout.addRow("Queue Order:", self.policy_combo)
+        
+        # Detail written to the log file
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(["Debug", "Info", "Warning", "Error"])
+        self.log_level_combo.setCurrentIndex(1)
+        layout.addRow("Log Level:", self.log_level_combo)
+        
         # Use Proxy
         self.proxy_checkbox = QCheckBox("Use Proxy")
         layout.addRow(self.proxy_checkbox)
@@ -363,8 +1583,22 @@ class SettingsDialog(QDialog):
         self.proxy_input.setEnabled(False)
         layout.addRow("Proxy URL:", self.proxy_input)
         
+        # Extra proxies - jobs are spread across all of them
+        self.proxy_list_input = QTextEdit()
+        self.proxy_list_input.setPlaceholderText("Additional proxies, one per line")
+        self.proxy_list_input.setMaximumHeight(70)
+        self.proxy_list_input.setEnabled(False)
+        layout.addRow("More Proxies:", self.proxy_list_input)
+        
+        self.proxy_strategy_combo = QComboBox()
+        self.proxy_strategy_combo.addItems(["Round Robin", "Least Loaded"])
+        self.proxy_strategy_combo.setEnabled(False)
+        layout.addRow("Proxy Selection:", self.proxy_strategy_combo)
+        
         # Connect checkbox to enable/disable proxy input
         self.proxy_checkbox.toggled.connect(self.proxy_input.setEnabled)
+        self.proxy_checkbox.toggled.connect(self.proxy_list_input.setEnabled)
+        self.proxy_checkbox.toggled.connect(self.proxy_strategy_combo.setEnabled)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -437,12 +1671,15 @@ class DownloadHistoryDialog(QDialog):
         # Buttons
         button_layout = QHBoxLayout()
         clear_button = QPushButton("Clear History")
+        export_button = QPushButton("Export Trace")
         close_button = QPushButton("Close")
         
         clear_button.clicked.connect(self.clear_history)
+        export_button.clicked.connect(self.export_trace)
         close_button.clicked.connect(self.accept)
         
         button_layout.addWidget(clear_button)
+        button_layout.addWidget(export_button)
         button_layout.addStretch()
         button_layout.addWidget(close_button)
         
@@ -450,12 +1687,44 @@ class DownloadHistoryDialog(QDialog):
         self.setLayout(layout)
     
     def populate_history(self):
+        # Sorting would move rows while they are filled in
+        self.history_table.setSortingEnabled(False)
         self.history_table.setRowCount(len(self.filtered_history))
         for row, entry in enumerate(self.filtered_history):
-            self.history_table.setItem(row, 0, QTableWidgetItem(entry.get("title", "Unknown")))
+            title_item = QTableWidgetItem(entry.get("title", "Unknown"))
+            title_item.setData(Qt.ItemDataRole.UserRole, row)  # Survives sorting
+            if entry.get("trace"):
+                title_item.setToolTip(JobTrace.summary(entry["trace"]))
+            self.history_table.setItem(row, 0, title_item)
             self.history_table.setItem(row, 1, QTableWidgetItem(entry.get("url", "")))
             self.history_table.setItem(row, 2, QTableWidgetItem(entry.get("date", "")))
             self.history_table.setItem(row, 3, QTableWidgetItem(entry.get("status", "")))
+        self.history_table.setSortingEnabled(True)
+    
+    def export_trace(self):
+        """Save the selected downloads (or every shown one) as Chrome trace-event JSON"""
+        rows = {index.row() for index in self.history_table.selectedIndexes()}
+        if rows:
+            entries = [self.filtered_history[self.history_table.item(row, 0).data(Qt.ItemDataRole.UserRole)]
+                       for row in sorted(rows)]
+        else:
+            entries = self.filtered_history
+        if not any(entry.get("trace") for entry in entries):
+            QMessageBox.information(self, "No Timing Data", "These downloads have no recorded timings.")
+            return
+        
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "download_trace.json", "Trace files (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, "w") as f:
+                json.dump(JobTrace.chrome_trace(entries), f)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", f"Could not write the trace file:\n{e}")
+            return
+        QMessageBox.information(self, "Trace Exported",
+                                f"Saved timings for {sum(1 for entry in entries if entry.get('trace'))} download(s).\n\n"
+                                "Open the file in chrome://tracing or ui.perfetto.dev to view it.")
     
     def refresh_history(self):
         # Reload history from parent
@@ -473,7 +1742,7 @@ class DownloadHistoryDialog(QDialog):
             self.filtered_history = self.original_history
         elif filter_text == "Successful Only":
             self.filtered_history = [entry for entry in self.original_history 
-                                   if not entry.get("status", "").startswith("Error")]
+                                   if entry.get("status", "") == "Success"]
         elif filter_text == "Errors Only":
             self.filtered_history = [entry for entry in self.original_history 
                                    if entry.get("status", "").startswith("Error")]
@@ -650,24 +1919,561 @@ class PlaylistSelectionDialog(QDialog):
         super().accept()
 
 
-# --- Downloader Core Logic ---
-class Downloader:
-    def __init__(self, output_path="downloads"):
-        self.output_path = output_path
-        self._progress_hook_callback = None # To set a UI callback for progress
-        self._paused = False  # Track pause state
-        self._cancelled = False  # Track cancel state
-
-    def set_progress_hook(self, callback):
-        self._progress_hook_callback = callback
-
-    def _yt_dlp_progress_hook(self, d):
-        # Check for pause or cancel requests
-        if self._paused:
-            d['status'] = 'paused'
+# --- Queue Dialog ---
+class QueueDialog(QDialog):
+    def __init__(self, download_manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Download Queue")
+        self.setModal(True)
+        self.resize(600, 400)
+        
+        self.download_manager = download_manager
+        
+        layout = QVBoxLayout()
+        
+        instruction_label = QLabel("Queued downloads start from the top. Change a download's priority to move it.")
+        instruction_label.setWordWrap(True)
+        layout.addWidget(instruction_label)
+        
+        # Queue table
+        self.queue_table = QTableWidget()
+        self.queue_table.setColumnCount(4)
+        self.queue_table.setHorizontalHeaderLabels(["Priority", "URL", "Estimated Size", "Progress"])
+        self.queue_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        header = self.queue_table.horizontalHeader()
+        if header:
+            header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.queue_table)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        urgent_button = QPushButton("Make Urgent")
+        raise_button = QPushButton("Raise Priority")
+        lower_button = QPushButton("Lower Priority")
+        close_button = QPushButton("Close")
+        
+        urgent_button.clicked.connect(lambda: self.change_priority(DownloadManager.PRIORITY_URGENT, preempt=True))
+        raise_button.clicked.connect(lambda: self.change_priority(DownloadManager.PRIORITY_HIGH))
+        lower_button.clicked.connect(lambda: self.change_priority(DownloadManager.PRIORITY_LOW))
+        close_button.clicked.connect(self.accept)
+        
+        button_layout.addWidget(urgent_button)
+        button_layout.addWidget(raise_button)
+        button_layout.addWidget(lower_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        
+        self.populate_queue()
+        
+        # Keep the progress column current while the dialog is open
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.populate_queue)
+        self.refresh_timer.start(1000)
+    
+    def populate_queue(self):
+        # Running downloads first, then the queue in the order it will start
+        registry = self.download_manager.registry
+        selected = self.selected_job_ids()  # Rows move as jobs start and finish, so selection follows the job
+        self.jobs = registry.jobs('active') + self.download_manager.download_queue
+        self.queue_table.clearSelection()
+        self.queue_table.setRowCount(len(self.jobs))
+        for row, job in enumerate(self.jobs):
+            size = registry.expected_bytes(job)
+            size_str = f"{size / (1024 * 1024):.1f} MB" if size else "Unknown"
+            if job['status'] == 'active':
+                percent = job['downloaded'] / size * 100 if size else 0.0
+                speed_str = f"{format_bytes(job['speed'])}/s" if job['speed'] else 'N/A'
+                progress_str = f"{percent:.1f}% ({speed_str})"
+            elif job['not_before'] > time.monotonic():
+                progress_str = f"Retry in {format_eta(job['not_before'] - time.monotonic())} ({job.get('last_error')})"
+            elif not self.download_manager.circuit_breakers.allow(job['host']):
+                progress_str = "Waiting - site is failing"
+            elif self.download_manager.is_held(job):
+                progress_str = "Held - outside its schedule window"
+            else:
+                progress_str = "Queued"
+            priority_item = QTableWidgetItem(str(job['priority']))
+            priority_item.setData(Qt.ItemDataRole.UserRole, job['job_id'])
+            self.queue_table.setItem(row, 0, priority_item)
+            self.queue_table.setItem(row, 1, QTableWidgetItem(job['url']))
+            self.queue_table.setItem(row, 2, QTableWidgetItem(size_str))
+            self.queue_table.setItem(row, 3, QTableWidgetItem(progress_str))
+            if job['job_id'] in selected:
+                self.queue_table.setRangeSelected(
+                    QTableWidgetSelectionRange(row, 0, row, self.queue_table.columnCount() - 1), True)
+
+    def selected_job_ids(self):
+        rows = {index.row() for index in self.queue_table.selectedIndexes()}
+        items = [self.queue_table.item(row, 0) for row in sorted(rows)]
+        return [item.data(Qt.ItemDataRole.UserRole) for item in items if item is not None]
+    
+    def change_priority(self, priority, preempt=False):
+        job_ids = self.selected_job_ids()
+        if not job_ids:
+            QMessageBox.warning(self, "No Selection", "Please select at least one queued download.")
+            return
+        for job_id in job_ids:
+            job = self.download_manager.get_job(job_id)
+            if job is not None and job['status'] == 'queued':
+                self.download_manager.set_priority(job_id, priority, preempt=preempt)
+        if preempt:
+            self.download_manager.pump()
+        self.populate_queue()
+
+
+# --- Failed Downloads Dialog ---
+class DeadLetterDialog(QDialog):
+    ALL_CATEGORIES = "All Categories"
+
+    def __init__(self, dead_letters, retry_callback, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Failed Downloads")
+        self.setModal(True)
+        self.resize(700, 400)
+        self.setWindowFlags(Qt.WindowType.Window)  # Enable standard window controls
+        
+        self.dead_letters = dead_letters
+        self.retry_callback = retry_callback  # Called with the entries to queue again
+        self.shown = []
+        
+        layout = QVBoxLayout()
+        
+        instruction_label = QLabel("Downloads that failed stay here until they succeed. "
+                                   "Retried downloads are spaced out per site.")
+        instruction_label.setWordWrap(True)
+        layout.addWidget(instruction_label)
+        
+        # Filter controls
+        filter_layout = QHBoxLayout()
+        self.filter_combo = QComboBox()
+        self.filter_combo.currentIndexChanged.connect(self.populate)
+        filter_layout.addWidget(QLabel("Category:"))
+        filter_layout.addWidget(self.filter_combo)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
+        # Failed downloads table
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(["URL", "Category", "Attempts", "Last Failed", "Status"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        header = self.table.horizontalHeader()
+        if header:
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        retry_all_button = QPushButton("Retry All Shown")
+        retry_selected_button = QPushButton("Retry Selected")
+        remove_button = QPushButton("Remove Selected")
+        close_button = QPushButton("Close")
+        
+        retry_all_button.clicked.connect(lambda: self.retry(self.shown))
+        retry_selected_button.clicked.connect(lambda: self.retry(self.selected()))
+        remove_button.clicked.connect(self.remove_selected)
+        close_button.clicked.connect(self.accept)
+        
+        button_layout.addWidget(retry_all_button)
+        button_layout.addWidget(retry_selected_button)
+        button_layout.addWidget(remove_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        
+        self.populate_filter()
+        self.populate()
+    
+    def populate_filter(self):
+        current = self.filter_combo.currentData()
+        self.filter_combo.blockSignals(True)
+        self.filter_combo.clear()
+        self.filter_combo.addItem(f"{self.ALL_CATEGORIES} ({len(self.dead_letters)})", None)
+        for category, count in sorted(self.dead_letters.categories().items()):
+            self.filter_combo.addItem(f"{category} ({count})", category)
+        index = self.filter_combo.findData(current)
+        self.filter_combo.setCurrentIndex(max(0, index))
+        self.filter_combo.blockSignals(False)
+    
+    def populate(self):
+        # Newest failures first
+        category = self.filter_combo.currentData()
+        self.shown = [entry for entry in reversed(self.dead_letters.entries)
+                      if category is None or entry['category'] == category]
+        self.table.setRowCount(len(self.shown))
+        for row, entry in enumerate(self.shown):
+            url_item = QTableWidgetItem(entry['url'])
+            url_item.setToolTip(entry['error'])
+            self.table.setItem(row, 0, url_item)
+            self.table.setItem(row, 1, QTableWidgetItem(entry['category']))
+            self.table.setItem(row, 2, QTableWidgetItem(str(entry['attempts'])))
+            self.table.setItem(row, 3, QTableWidgetItem(entry['failed_at']))
+            self.table.setItem(row, 4, QTableWidgetItem("Retrying" if entry['status'] == 'retrying' else "Failed"))
+    
+    def selected(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()})
+        return [self.shown[row] for row in rows]
+    
+    def retry(self, entries):
+        entries = [entry for entry in entries if entry['status'] != 'retrying']
+        if not entries:
+            QMessageBox.warning(self, "Nothing to Retry", "Please select failed downloads that aren't already retrying.")
+            return
+        self.retry_callback(entries)
+        self.populate()
+    
+    def remove_selected(self):
+        entries = self.selected()
+        if not entries:
+            QMessageBox.warning(self, "No Selection", "Please select at least one failed download.")
+            return
+        self.dead_letters.remove(entries)
+        self.populate_filter()
+        self.populate()
+
+
+# --- Subscriptions Dialog ---
+class SubscriptionsDialog(QDialog):
+    def __init__(self, subscriptions, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Subscriptions")
+        self.setModal(True)
+        self.resize(800, 400)
+        self.setWindowFlags(Qt.WindowType.Window)  # Enable standard window controls
+
+        self.subscriptions = subscriptions
+        self.shown = []
+
+        layout = QVBoxLayout()
+
+        instruction_label = QLabel("New uploads on these channels and playlists are downloaded automatically. "
+                                   "Each is checked about once a day; only what it hasn't seen before is read.")
+        instruction_label.setWordWrap(True)
+        layout.addWidget(instruction_label)
+
+        # Subscribe controls
+        add_layout = QHBoxLayout()
+        self.url_edit = QLineEdit()
+        self.url_edit.setPlaceholderText("Channel or playlist URL, e.g. https://www.youtube.com/@name/videos")
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("Video", "video")
+        self.type_combo.addItem("Audio", "audio")
+        subscribe_button = QPushButton("Subscribe")
+        subscribe_button.clicked.connect(self.subscribe)
+        add_layout.addWidget(self.url_edit)
+        add_layout.addWidget(self.type_combo)
+        add_layout.addWidget(subscribe_button)
+        layout.addLayout(add_layout)
+
+        # Subscriptions table
+        self.table = QTableWidget()
+        self.table.setColumnCount(6)
+        self.table.setHorizontalHeaderLabels(["Name", "Type", "Last Sync", "Next Sync", "New", "Status"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        header = self.table.horizontalHeader()
+        if header:
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        sync_all_button = QPushButton("Sync All Now")
+        sync_selected_button = QPushButton("Sync Selected")
+        remove_button = QPushButton("Remove Selected")
+        close_button = QPushButton("Close")
+
+        sync_all_button.clicked.connect(lambda: self.sync(None))
+        sync_selected_button.clicked.connect(lambda: self.sync([entry['id'] for entry in self.selected()]))
+        remove_button.clicked.connect(self.remove_selected)
+        close_button.clicked.connect(self.accept)
+
+        button_layout.addWidget(sync_all_button)
+        button_layout.addWidget(sync_selected_button)
+        button_layout.addWidget(remove_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        subscriptions.sync_finished.connect(self.populate)
+        self.populate()
+
+    def done(self, result):
+        self.subscriptions.sync_finished.disconnect(self.populate)
+        super().done(result)
+
+    def populate(self, *args):
+        self.shown = list(self.subscriptions.entries)
+        self.table.setRowCount(len(self.shown))
+        for row, entry in enumerate(self.shown):
+            name_item = QTableWidgetItem(entry['title'])
+            name_item.setToolTip(entry['url'])
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(entry['download_type'].capitalize()))
+            self.table.setItem(row, 2, QTableWidgetItem(entry['last_sync'] or "Never"))
+            next_sync = datetime.datetime.fromtimestamp(entry['next_sync']).strftime("%Y-%m-%d %H:%M")
+            self.table.setItem(row, 3, QTableWidgetItem(next_sync if entry['synced'] or entry['error'] else "Soon"))
+            self.table.setItem(row, 4, QTableWidgetItem(f"{entry['last_new']} ({entry['new_total']} in all)"))
+            if self.subscriptions.is_syncing(entry['id']):
+                status = "Syncing"
+            else:
+                status = "Failed" if entry['error'] else "OK" if entry['synced'] else "Waiting"
+            status_item = QTableWidgetItem(status)
+            if entry['error']:
+                status_item.setToolTip(entry['error'])
+            self.table.setItem(row, 5, status_item)
+
+    def selected(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()})
+        return [self.shown[row] for row in rows]
+
+    def subscribe(self):
+        url = self.url_edit.text().strip()
+        if '://' not in url:
+            QMessageBox.warning(self, "Invalid URL", "Please enter the URL of a channel or playlist.")
+            return
+        self.subscriptions.add(url, self.type_combo.currentData())
+        self.url_edit.clear()
+        self.populate()
+
+    def sync(self, subscription_ids):
+        if subscription_ids == []:
+            QMessageBox.warning(self, "No Selection", "Please select at least one subscription.")
+            return
+        self.subscriptions.sync_now(subscription_ids)
+        self.populate()
+
+    def remove_selected(self):
+        entries = self.selected()
+        if not entries:
+            QMessageBox.warning(self, "No Selection", "Please select at least one subscription.")
+            return
+        self.subscriptions.remove([entry['id'] for entry in entries])
+        self.populate()
+
+
+# --- Progress Events ---
+class ProgressEvent(namedtuple('ProgressEvent', ['job_id', 'downloaded', 'total', 'speed', 'eta', 'phase', 'filename'])):
+    """Small fixed progress record sent from a worker instead of yt-dlp's whole hook dict.
+
+    total, speed and eta are 0 / None when yt-dlp doesn't know them yet.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_hook(cls, job_id, d):
+        filename = d.get('filename') or ''
+        if isinstance(filename, list): # sometimes filename can be a list of paths
+            filename = filename[0]
+        return cls(
+            job_id,
+            int(d.get('downloaded_bytes') or 0),
+            int(d.get('total_bytes') or d.get('total_bytes_estimate') or 0),
+            float(d.get('speed') or 0.0),
+            d.get('eta'),
+            d.get('status') or 'downloading',
+            filename,
+        )
+
+    @property
+    def percent(self):
+        return self.downloaded * 100.0 / self.total if self.total else None
+
+
+def format_bytes(num_bytes):
+    """Human-readable size, e.g. 12.3MiB"""
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(num_bytes) < 1024 or unit == 'GiB':
+            return f"{num_bytes:.1f}{unit}" if unit != 'B' else f"{int(num_bytes)}B"
+        num_bytes /= 1024.0
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return 'N/A'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+# --- Job Tracing ---
+class JobTrace:
+    """Where one job's time went, as a list of phase spans on the monotonic clock.
+
+    Phases: queued, extracting, downloading, merging, postprocessing, finalizing.
+    A span may carry a detail, e.g. the postprocessor that ran. Entering a phase
+    closes the open span and feeds its duration to the phase histogram. A job
+    that is preempted simply gets another queued span.
+    """
+
+    # yt-dlp postprocessor -> phase; anything else is plain postprocessing
+    POSTPROCESSOR_PHASES = {'Merger': 'merging', 'MoveFiles': 'finalizing'}
+
+    def __init__(self):
+        self.created_wall = time.time()
+        self.created = time.monotonic()
+        self.spans = []  # [phase, start, end, detail]
+        self.bytes = 0
+        self.format_ids = []
+
+    @property
+    def phase(self):
+        if self.spans and self.spans[-1][2] is None:
+            return self.spans[-1][0]
+        return None
+
+    def enter(self, phase, detail=None):
+        """Close the open span and start phase (None just closes); returns the closed span's duration"""
+        if phase is not None and phase == self.phase and (detail is None or detail == self.spans[-1][3]):
+            return 0.0
+        now = time.monotonic()
+        elapsed = 0.0
+        if self.phase is not None:
+            span = self.spans[-1]
+            span[2] = now
+            elapsed = now - span[1]
+            MetricsRegistry.instance().observe('mediadl_job_phase_seconds', elapsed, phase=span[0])
+        if phase is not None:
+            self.spans.append([phase, now, None, detail])
+        return elapsed
+
+    def postprocessor_hook(self, d):
+        """yt-dlp postprocessor_hooks entry: one span per postprocessor run"""
+        if d.get('status') == 'started':
+            name = d.get('postprocessor') or 'Unknown'
+            self.enter(self.POSTPROCESSOR_PHASES.get(name, 'postprocessing'), detail=name)
+        elif d.get('status') == 'finished':
+            self.enter('postprocessing')
+
+    def record_formats(self, info):
+        """Remember the format ids yt-dlp chose, including every playlist entry's"""
+        for entry in [info] + [e for e in (info.get('entries') or []) if isinstance(e, dict)]:
+            for format_id in str(entry.get('format_id') or '').split('+'):
+                if format_id and format_id not in self.format_ids:
+                    self.format_ids.append(format_id)
+
+    def duration(self, phase):
+        now = time.monotonic()
+        return sum((end or now) - start for name, start, end, _ in self.spans if name == phase)
+
+    def to_dict(self):
+        """JSON-friendly form stored with the history entry; times are seconds from job creation"""
+        download_seconds = self.duration('downloading')
+        now = time.monotonic()
+        return {
+            'started': self.created_wall,
+            'phases': [
+                {'phase': phase, 'start': round(start - self.created, 4),
+                 'end': round((end if end is not None else now) - self.created, 4),
+                 **({'detail': detail} if detail else {})}
+                for phase, start, end, detail in self.spans
+            ],
+            'bytes': self.bytes,
+            'avg_speed': self.bytes / download_seconds if download_seconds else None,
+            'format_ids': list(self.format_ids),
+        }
+
+    @staticmethod
+    def summary(trace):
+        """One-line breakdown of a stored trace, e.g. 'queued 1.2s, downloading 30.5s'"""
+        totals = OrderedDict()
+        for span in trace.get('phases', []):
+            totals[span['phase']] = totals.get(span['phase'], 0.0) + span['end'] - span['start']
+        parts = [f"{phase} {seconds:.1f}s" for phase, seconds in totals.items()]
+        if trace.get('avg_speed'):
+            parts.append(f"{format_bytes(trace['bytes'])} at {format_bytes(trace['avg_speed'])}/s")
+        if trace.get('format_ids'):
+            parts.append("formats " + "+".join(trace['format_ids']))
+        return ", ".join(parts)
+
+    @staticmethod
+    def chrome_trace(entries):
+        """History entries as Chrome trace-event JSON (chrome://tracing, Perfetto).
+
+        One row per job, one complete event per phase, on a shared wall clock.
+        """
+        traced = [entry for entry in entries if entry.get('trace')]
+        origin = min((entry['trace']['started'] for entry in traced), default=0)
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': 'Media Downloader'}}]
+        for tid, entry in enumerate(traced, start=1):
+            trace = entry['trace']
+            offset = trace['started'] - origin
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                           'args': {'name': entry.get('title') or entry.get('url', '')}})
+            for span in trace['phases']:
+                events.append({
+                    'name': span.get('detail') or span['phase'],
+                    'cat': span['phase'],
+                    'ph': 'X',
+                    'pid': 1,
+                    'tid': tid,
+                    'ts': int((offset + span['start']) * 1e6),
+                    'dur': int((span['end'] - span['start']) * 1e6),
+                    'args': {'url': entry.get('url', ''), 'status': entry.get('status', '')},
+                })
+            events.append({'name': 'job', 'ph': 'i', 's': 't', 'pid': 1, 'tid': tid,
+                           'ts': int((offset + (trace['phases'][-1]['end'] if trace['phases'] else 0)) * 1e6),
+                           'args': {'bytes': trace.get('bytes'), 'avg_speed': trace.get('avg_speed'),
+                                    'format_ids': trace.get('format_ids')}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+# --- Downloader Core Logic ---
+class Downloader:
+    def __init__(self, output_path="downloads"):
+        self.output_path = output_path
+        self._progress_hook_callback = None # To set a UI callback for progress
+        self._paused = False  # Track pause state
+        self._cancelled = False  # Track cancel state
+        self._file_bytes = {}  # Bytes downloaded per file in the current job
+        self.trace = JobTrace()  # Phase timings; the download manager hands in the job's own
+        self.proxy_pool = None  # Optional ProxyPool shared with the app
+        self.log = job_logger()  # The download manager hands in one carrying the job's id and URL
+        self.last_error = None  # Classification of the last failure, for the retry policy
+        self.prefetched = None  # Future of a look-ahead extraction the download manager hands in
+        self.rate_limit = None  # Bytes per second for this job: its share of the schedule's bandwidth cap
+        self.keep_controls = False  # Set when pause/cancel may arrive before download_media starts (worker processes)
+        self._throttle_start = None  # Start of the current throttle window
+        self._throttle_bytes = 0
+
+    # Look-ahead info older than this is extracted again; so is info whose stream URLs expire within the margin
+    PREFETCH_MAX_AGE = 600
+    PREFETCH_EXPIRY_MARGIN = 60
+    THROTTLED_BLOCK_SIZE = 64 * 1024  # Read size while a rate limit applies
+
+    def spawn(self):
+        """A fresh Downloader with the same output folder and proxy pool, for one job"""
+        downloader = Downloader(self.output_path)
+        downloader.proxy_pool = self.proxy_pool
+        downloader.log = self.log
+        return downloader
+
+    def set_progress_hook(self, callback):
+        self._progress_hook_callback = callback
+
+    def _yt_dlp_progress_hook(self, d):
+        # Check for pause or cancel requests
+        if self._paused:
+            d['status'] = 'paused'
         elif self._cancelled:
             d['status'] = 'cancelled'
             raise Exception("Download cancelled by user")
+
+        received = self.account_progress(d)
+        if received > 0:
+            MetricsRegistry.instance().inc('mediadl_bytes_downloaded_total', received)
+            self._throttle(received)
+        if d.get('status') == 'downloading':
+            self.trace.enter('downloading')
+        elif d.get('status') == 'finished':
+            self.trace.enter('postprocessing')  # Until the next file or postprocessor starts
             
         if self._progress_hook_callback:
             self._progress_hook_callback(d)
@@ -688,10 +2494,52 @@ class Downloader:
         """Check if download is paused"""
         return self._paused
 
+    def is_cancelled(self):
+        return self._cancelled
+
+    def set_rate_limit(self, rate):
+        """Hold this job to rate bytes per second (None lifts the limit), from the next chunk on"""
+        if rate != self.rate_limit:
+            self.rate_limit = rate
+            self._throttle_start = None
+
+    def _throttle(self, received):
+        # Sleeping in the hook stalls yt-dlp's reads, so the server is slowed down by TCP flow control
+        if not self.rate_limit:
+            return
+        now = time.monotonic()
+        if self._throttle_start is None:
+            self._throttle_start, self._throttle_bytes = now, 0
+            return
+        self._throttle_bytes += received
+        ahead = self._throttle_bytes / self.rate_limit - (now - self._throttle_start)
+        if ahead < -1.0:
+            self._throttle_start, self._throttle_bytes = now, 0  # Slower than the limit; don't bank a burst
+            return
+        start = self._throttle_start
+        deadline = now + ahead
+        while not self._cancelled and self._throttle_start is start and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(0.1, deadline - time.monotonic())))  # Short naps so cancel and a new limit apply quickly
+
     def reset_state(self):
         """Reset pause and cancel states"""
-        self._paused = False
-        self._cancelled = False
+        if not self.keep_controls:
+            self._paused = False
+            self._cancelled = False
+        self._file_bytes = {}
+        self.last_error = None
+
+    def downloaded_bytes(self):
+        """Bytes downloaded so far in the current job"""
+        return sum(self._file_bytes.values())
+
+    def account_progress(self, d):
+        """Track bytes per file from a progress hook dict; returns the bytes received since the last one"""
+        if not d.get('filename') or d.get('downloaded_bytes') is None:
+            return 0
+        received = d['downloaded_bytes'] - self._file_bytes.get(d['filename'], 0)
+        self._file_bytes[d['filename']] = d['downloaded_bytes']
+        return received
 
     def extract_playlist_info(self, url):
         """Extract playlist information without downloading"""
@@ -700,13 +2548,91 @@ class Downloader:
             'force_generic_extractor': False,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with ConnectionPool.instance().youtube_dl(ydl_opts) as ydl:
             try:
                 info = ydl.extract_info(url, download=False)
-                return info
+                return trim_info(info)  # The selection dialog only shows titles and durations
             except Exception as e:
                 raise Exception(f"Failed to extract playlist info: {e}")
 
+    SYNC_PAGE_SIZE = 50  # Entries requested at a time from sources that are fetched in pages
+
+    def extract_new_entries(self, url, known_ids, since=None, stop_after=3, limit=None):
+        """Flat-extract a channel or playlist up to the entries already known.
+
+        Entries are read in the source's order (newest first for channels) and
+        reading stops after stop_after known ones in a row, or ones uploaded
+        before since (YYYYMMDD), so a source fetched a page at a time only
+        loads its first page or two. stop_after None reads everything. Sub-pages handled by the same extractor,
+        like a channel's Videos and Shorts tabs, are read in turn. Returns
+        (info, new entries in source order, entries read).
+        """
+        known = set(known_ids)
+        new = []
+        scanned = 0
+        ydl_opts = {'extract_flat': 'in_playlist', 'lazy_playlist': True, 'socket_timeout': 10, 'logger': self.log}
+        with ConnectionPool.instance().youtube_dl(ydl_opts) as ydl:
+
+            def scan(playlist, nested):
+                nonlocal scanned
+                run = 0
+                for entry in self._iter_entries(playlist.get('entries')):
+                    if self._cancelled or (limit and scanned >= limit):
+                        return
+                    if not entry:
+                        continue
+                    if nested and (entry.get('_type') == 'playlist' or
+                                   (entry.get('ie_key') and entry.get('ie_key') == playlist.get('extractor_key'))):
+                        scan(entry if entry.get('_type') == 'playlist' else
+                             self._extract_flat(ydl, entry.get('url'), entry.get('ie_key')), False)
+                        continue
+                    scanned += 1
+                    entry_id = str(entry.get('id') or entry.get('url') or '')
+                    upload_date = entry.get('upload_date')
+                    if not upload_date and entry.get('timestamp'):
+                        upload_date = datetime.datetime.fromtimestamp(
+                            entry['timestamp'], datetime.timezone.utc).strftime('%Y%m%d')
+                    if entry_id in known or (since and upload_date and upload_date < since):
+                        run += 1
+                        if stop_after and run >= stop_after:
+                            return
+                        continue
+                    run = 0
+                    entry_url = next((value for value in (entry.get('url'), entry.get('webpage_url'))
+                                      if isinstance(value, str) and '://' in value), None)
+                    if entry_url is None:
+                        continue
+                    known.add(entry_id)  # Some sources list an entry twice, e.g. on two tabs
+                    new.append({'id': entry_id, 'url': entry_url, 'title': entry.get('title') or entry_id,
+                                'upload_date': upload_date})
+
+            info = self._extract_flat(ydl, url)
+            if info.get('entries') is None:
+                raise ValueError(f"{url} is not a channel or playlist")
+            scan(info, True)
+        return {key: value for key, value in info.items() if key != 'entries'}, new, scanned
+
+    def _extract_flat(self, ydl, url, ie_key=None):
+        info = ydl.extract_info(url, download=False, ie_key=ie_key, process=False)
+        for _ in range(3):  # Follow redirects, e.g. from a channel's home page to its videos
+            if info.get('_type') not in ('url', 'url_transparent'):
+                break
+            info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+        return info
+
+    def _iter_entries(self, entries):
+        """Iterate playlist entries, fetching paged ones a page at a time so an early stop saves the rest"""
+        if isinstance(entries, yt_dlp.utils.PagedList):
+            start = 0
+            while True:
+                page = entries.getslice(start, start + self.SYNC_PAGE_SIZE)
+                yield from page
+                if len(page) < self.SYNC_PAGE_SIZE:
+                    return
+                start += self.SYNC_PAGE_SIZE
+        else:
+            yield from entries or ()
+
     def download_media(self, url, download_type, settings=None, selected_videos=None):
         os.makedirs(self.output_path, exist_ok=True) # Ensure output directory exists
 
@@ -716,23 +2642,22 @@ class Downloader:
         ydl_opts = {
             'outtmpl': os.path.join(self.output_path, '%(title)s.%(ext)s'),
             'progress_hooks': [self._yt_dlp_progress_hook],
+            'postprocessor_hooks': [self.trace.postprocessor_hook],
             'ffmpeg_location': self._get_ffmpeg_path(), # Use bundled ffmpeg
             'windowsfilenames': True, # Sanitize filenames for Windows
-            'retries': 5, # Retry failed HTTP requests up to 5 times
-            'fragment_retries': 5, # Retry fragment downloads
+            'retries': 1, # Failed jobs are requeued with backoff by the download manager instead
+            'fragment_retries': 5, # Retry fragment downloads in place so finished fragments aren't lost
             'socket_timeout': 10, # Set a timeout for socket operations
+            'noprogress': True, # Progress goes to the hooks, not the console log
+            'logger': self.log, # yt-dlp messages carry the job's context
         }
 
         # Apply settings if provided
         if settings:
-            # Set max retries
+            # Max retries counts requeues by the download manager; yt-dlp only retries fragments in place
             if 'max_retries' in settings:
-                ydl_opts['retries'] = settings['max_retries']
+                ydl_opts['retries'] = 1 if settings['max_retries'] else 0
                 ydl_opts['fragment_retries'] = settings['max_retries']
-            
-            # Set proxy if enabled
-            if settings.get('use_proxy') and settings.get('proxy_url'):
-                ydl_opts['proxy'] = settings['proxy_url']
 
         if download_type == "video":
             # UPDATED: More robust format selection for video
@@ -804,23 +2729,97 @@ class Downloader:
         else:
             raise ValueError("Invalid download type specified.")
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                ydl.download([url])
-                return "Download complete!"
-            except yt_dlp.utils.DownloadError as e:
-                # Classify and format the error
-                classified_error = ErrorClassifier.classify_error(str(e))
-                formatted_error = ErrorClassifier.format_error_message(str(e), classified_error)
-                return f"Download failed: {formatted_error}"
-            except Exception as e:
-                # Check if it's a cancellation
-                if "cancelled" in str(e).lower():
-                    return "Download cancelled by user"
-                # Classify and format the error
-                classified_error = ErrorClassifier.classify_error(str(e))
-                formatted_error = ErrorClassifier.format_error_message(str(e), classified_error)
-                return f"Download failed: {formatted_error}"
+        if self.rate_limit:
+            # yt-dlp grows its read size to seconds' worth of data, which a throttled job then takes in one burst
+            ydl_opts['buffersize'] = self.THROTTLED_BLOCK_SIZE
+            ydl_opts['noresizebuffer'] = True
+
+        # Spread jobs over the proxy pool, or fall back to the single proxy setting
+        proxy = self.proxy_pool.acquire() if self.proxy_pool is not None else None
+        if proxy:
+            ydl_opts['proxy'] = proxy
+        elif settings and settings.get('use_proxy') and settings.get('proxy_url'):
+            ydl_opts['proxy'] = settings['proxy_url']
+
+        prefetched, self.prefetched = self.prefetched, None
+        started = time.monotonic()
+        classified_error = None
+        error_text = None
+        try:
+            with ConnectionPool.instance().youtube_dl(ydl_opts) as ydl:
+                try:
+                    info = self._take_prefetched(prefetched)
+                    try:
+                        result = self._extract_and_download(ydl, url, info)
+                    except yt_dlp.utils.DownloadError as e:
+                        # Streams resolved ahead of time can expire or be tied to a session; resolve them once more
+                        if info is None or self._cancelled or ErrorClassifier.http_status(e) not in (403, 404, 410):
+                            raise
+                        self.log.info("Look-ahead stream refused, extracting again: %s", e)
+                        MetricsRegistry.instance().inc('mediadl_prefetch_total', outcome='refreshed')
+                        result = self._extract_and_download(ydl, url, None)
+                    self.trace.enter('finalizing')
+                    if isinstance(result, dict):
+                        self.trace.record_formats(result)
+                    return "Download complete!"
+                except yt_dlp.utils.DownloadError as e:
+                    # yt-dlp wraps exceptions raised from our progress hook
+                    if self._cancelled:
+                        return "Download cancelled by user"
+                    # Classify and format the error
+                    error_text = str(e)
+                    classified_error = ErrorClassifier.classify_error(e)
+                    formatted_error = ErrorClassifier.format_error_message(error_text, classified_error)
+                    return f"Download failed: {formatted_error}"
+                except Exception as e:
+                    # Check if it's a cancellation
+                    if "cancelled" in str(e).lower():
+                        return "Download cancelled by user"
+                    # Classify and format the error
+                    error_text = str(e)
+                    classified_error = ErrorClassifier.classify_error(e)
+                    formatted_error = ErrorClassifier.format_error_message(error_text, classified_error)
+                    return f"Download failed: {formatted_error}"
+        finally:
+            self.trace.bytes = self.downloaded_bytes()
+            self.trace.enter(None)
+            if classified_error:
+                self.last_error = dict(classified_error, detail=error_text)
+                MetricsRegistry.instance().inc('mediadl_errors_total', category=classified_error['category'])
+                self.log.warning("Download failed: %s", error_text, extra={
+                    'category': classified_error['category'], 'phases': JobTrace.summary(self.trace.to_dict())})
+            if proxy:
+                # Only connection problems count against the proxy's health
+                proxy_failed = bool(classified_error) and classified_error['category'] == 'Network Connection Issue'
+                self.proxy_pool.release(proxy, self.downloaded_bytes(), time.monotonic() - started, failed=proxy_failed)
+
+    def _extract_and_download(self, ydl, url, info=None):
+        """Download url, extracting it first unless its unprocessed info is given"""
+        if info is None:
+            # Extract and download separately so extraction can be timed per site
+            self.trace.enter('extracting')
+            info = ydl.extract_info(url, download=False, process=False)
+            MetricsRegistry.instance().observe('mediadl_extraction_seconds', self.trace.enter('downloading'),
+                                               extractor=info.get('extractor_key') or 'Generic')
+        else:
+            self.trace.enter('downloading')
+        return ydl.process_ie_result(info, download=True)
+
+    def _take_prefetched(self, future):
+        """Info from the look-ahead extraction, or None when the job has to extract now"""
+        if future is None:
+            return None
+        if future.cancel():
+            outcome, result = 'miss', None  # Not started yet; extracting here is quicker than waiting
+        else:
+            self.trace.enter('extracting', 'look-ahead')
+            result = future.result()
+            outcome = 'hit' if result else 'failed'
+        if result and (time.monotonic() - result['fetched_at'] > self.PREFETCH_MAX_AGE or
+                       (result['expires'] and result['expires'] - time.time() < self.PREFETCH_EXPIRY_MARGIN)):
+            outcome = 'stale'
+        MetricsRegistry.instance().inc('mediadl_prefetch_total', outcome=outcome)
+        return result['info'] if outcome == 'hit' else None
     
     def _get_ffmpeg_path(self):
         # Determine the base path for locating ffmpeg.exe
@@ -837,142 +2836,4069 @@ class Downloader:
         
         ffmpeg_exe_path = os.path.join(base_path, 'ffmpeg.exe')
         
-        # DEBUG PRINTS - uncomment these if you need to debug ffmpeg discovery
-        # print(f"DEBUG: Application base path: {base_path}")
-        # print(f"DEBUG: Checking for ffmpeg at: {ffmpeg_exe_path}")
+        log.debug("Checking for ffmpeg at %s", ffmpeg_exe_path)
 
         if os.path.exists(ffmpeg_exe_path):
-            # print(f"DEBUG: FFmpeg found at: {base_path}")
+            log.debug("FFmpeg found at %s", base_path)
             return base_path # yt-dlp expects the directory containing ffmpeg.exe
         
-        # print("DEBUG: FFmpeg not found in bundle/script dir, falling back to system PATH.")
+        log.debug("FFmpeg not found in bundle/script dir, falling back to system PATH")
         return None # yt-dlp will try to find it in the system's PATH
 
-# --- Download Manager for Parallel Downloads ---
-class DownloadManager:
-    def __init__(self, max_concurrent=3):
-        self.max_concurrent = max_concurrent
-        self.active_downloads = []
-        self.download_queue = []
-        self.completed_downloads = []
-        
-    def add_download(self, downloader, url, download_type, settings=None):
-        self.download_queue.append({
-            'downloader': downloader,
-            'url': url,
-            'download_type': download_type,
-            'settings': settings
-        })
-        
-    def start_next_download(self):
-        if len(self.active_downloads) < self.max_concurrent and self.download_queue:
-            download_info = self.download_queue.pop(0)
-            
-            # Create and start download thread
-            thread = DownloadThread(
-                download_info['downloader'],
-                download_info['url'],
-                download_info['download_type'],
-                download_info['settings']
-            )
-            
-            self.active_downloads.append({
-                'thread': thread,
-                'info': download_info
-            })
-            
-            # Start the thread
-            thread.start()
-            
-            return thread
-        return None
-        
-    def remove_completed_download(self, thread):
-        self.active_downloads = [d for d in self.active_downloads if d['thread'] != thread]
-        self.completed_downloads.append(thread)
+# --- Job Size Estimation ---
+class SizeEstimator:
+    """Cheap pre-extraction pass that estimates how many bytes a job will download.
+
+    Runs extraction without format processing on a small thread pool and writes
+    the result into the job's 'estimated_size' so the scheduler can order jobs.
+
+    prefetch() does the same extraction for a job about to start, on its own
+    pool so it doesn't wait behind a batch of estimates, and keeps the info:
+    the download then only selects formats and fetches. The future's result
+    records when the info was fetched and when its stream URLs expire.
+    """
+
+    DEFAULT_VIDEO_BYTES_PER_SEC = 2500 * 125  # ~2.5 Mbit/s when only the duration is known
+    DEFAULT_AUDIO_BYTES_PER_SEC = 160 * 125  # ~160 kbit/s
+    EXPIRY_PARAMS = ('expire', 'expires', 'Expires', 'exp')  # Query parameters signed CDN URLs carry
+
+    def __init__(self, max_workers=2, prefetch_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='size-estimate')
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix='prefetch')
+        self._futures = set()  # Pending work, cancelled on shutdown
+
+    def _submit(self, executor, function, job):
+        future = executor.submit(function, job)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def submit(self, job):
+        self._submit(self._executor, self._estimate_job, job)
+
+    def prefetch(self, job):
+        """Extract a job ahead of its download; returns the future to hand to its Downloader"""
+        return self._submit(self._prefetch_executor, self._prefetch_job, job)
+
+    def shutdown(self):
+        for future in list(self._futures):
+            future.cancel()  # shutdown(cancel_futures=True) needs Python 3.9
+        self._executor.shutdown(wait=False)
+        self._prefetch_executor.shutdown(wait=False)
+
+    def _extract(self, url):
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'socket_timeout': 10,
+        }
+        with ConnectionPool.instance().youtube_dl(ydl_opts) as ydl:
+            return ydl.extract_info(url, download=False, process=False)
+
+    def _estimate_job(self, job):
+        if job.get('extraction') is not None or job['status'] != 'queued':
+            return  # The look-ahead or the download itself extracts it
+        try:
+            info = self._extract(job['url'])
+        except Exception as e:
+            log.debug("Size estimate failed for %s: %s", job['url'], e)
+            return  # Unknown size - the scheduler falls back to the queue median
+        settings = job.get('settings') or {}
+        job['estimated_size'] = self.estimate(info, job['download_type'], settings.get('quality'))
+
+    def _prefetch_job(self, job):
+        started = time.monotonic()
+        try:
+            info = self._extract(job['url'])
+        except Exception as e:
+            log.debug("Look-ahead extraction failed for %s: %s", job['url'], e)
+            return None  # The download extracts again and reports the error itself
+        MetricsRegistry.instance().observe('mediadl_extraction_seconds', time.monotonic() - started,
+                                           extractor=info.get('extractor_key') or 'Generic')
+        if info.get('_type') in ('playlist', 'multi_video'):
+            return None  # Entries are often a one-shot generator; the download has to list them itself
+        settings = job.get('settings') or {}
+        job['estimated_size'] = self.estimate(info, job['download_type'], settings.get('quality'))
+        return {'info': info, 'fetched_at': time.monotonic(), 'expires': self.stream_expiry(info)}
+
+    @classmethod
+    def stream_expiry(cls, info):
+        """Earliest expiry (Unix time) signed into the info's stream URLs, or None"""
+        expiries = []
+        for url in [info.get('url')] + [f.get('url') for f in info.get('formats') or []]:
+            if not url or '?' not in url:
+                continue
+            query = parse_qs(urlparse(url).query)
+            for name in cls.EXPIRY_PARAMS:
+                value = query.get(name, [''])[0]
+                if value.isdigit():
+                    expiries.append(int(value))
+                    break
+        return min(expiries, default=None)
+
+    @classmethod
+    def estimate(cls, info, download_type, quality=None):
+        """Estimate the download size in bytes from an (unprocessed) info dict"""
+        if not info:
+            return None
+        if info.get('_type') in ('playlist', 'multi_video'):
+            entries = info.get('entries')
+            if not isinstance(entries, list):
+                return None  # Lazily paged; listing a whole channel just to order the queue costs more than it saves
+            sizes = [cls.estimate(entry, download_type, quality) for entry in entries if isinstance(entry, dict)]
+            sizes = [size for size in sizes if size]
+            if not sizes:
+                return None
+            return statistics.median(sizes) * (info.get('playlist_count') or len(entries))
+
+        duration = info.get('duration')
+        formats = info.get('formats') or []
+        max_height = None
+        if quality and quality != "Best":
+            max_height = int(quality.rstrip('p'))
+
+        def format_size(f):
+            size = f.get('filesize') or f.get('filesize_approx')
+            if not size and f.get('tbr') and duration:
+                size = f['tbr'] * 125 * duration
+            return size or 0
+
+        audio_only = [f for f in formats if f.get('vcodec') == 'none' and f.get('acodec') != 'none']
+        best_audio = max((format_size(f) for f in audio_only), default=0)
+        if download_type == "audio":
+            if best_audio:
+                return best_audio
+            if duration:
+                return duration * cls.DEFAULT_AUDIO_BYTES_PER_SEC
+        else:
+            with_video = [f for f in formats if f.get('vcodec') not in (None, 'none')
+                          and (max_height is None or (f.get('height') or 0) <= max_height)]
+            if with_video:
+                best_video = max(with_video, key=lambda f: ((f.get('height') or 0), (f.get('tbr') or 0)))
+                video_size = format_size(best_video)
+                if video_size:
+                    # Video-only streams get merged with the best audio stream
+                    return video_size + (best_audio if best_video.get('acodec') == 'none' else 0)
+            if duration:
+                return duration * (cls.DEFAULT_VIDEO_BYTES_PER_SEC + cls.DEFAULT_AUDIO_BYTES_PER_SEC)
+
+        return info.get('filesize') or info.get('filesize_approx')
+
+# --- Job Registry ---
+class JobRegistry:
+    """Per-job state keyed by job id, plus a bytes-weighted view of the whole batch.
+
+    Entries are the scheduler's job dicts, extended with progress fields:
+    downloaded/total summed over the job's files, the latest speed and eta, and
+    the last phase. Finished jobs stay until clear_finished() so the batch view
+    still counts them; past max_done of them the oldest are folded into totals.
+    """
+
+    DONE_STATUSES = ('finished', 'failed', 'cancelled')
+
+    def __init__(self, max_done=500):
+        self._jobs = OrderedDict()
+        self.max_done = max_done
+        self._done_count = 0
+        self._retired = {}  # Counts and bytes of done jobs dropped to bound memory
+
+    def add(self, job):
+        job.update(files={}, downloaded=0, total=0, speed=0.0, eta=None, phase='queued')
+        self._jobs[job['job_id']] = job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, status=None):
+        return [job for job in self._jobs.values() if status is None or job['status'] == status]
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def update_progress(self, event):
+        job = self._jobs.get(event.job_id)
+        if job is None:
+            return None
+        if event.filename:
+            # A merged download is several files; each reports its own byte counts
+            job['files'][event.filename] = (event.downloaded, event.total)
+            job['downloaded'] = sum(done for done, _ in job['files'].values())
+            job['total'] = sum(total for _, total in job['files'].values())
+        job['speed'] = event.speed if event.phase == 'downloading' else 0.0
+        job['eta'] = event.eta
+        job['phase'] = event.phase
+        return job
+
+    def mark_done(self, job_id, status):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            if job['status'] not in self.DONE_STATUSES:
+                self._done_count += 1
+            job['status'] = status
+            job['phase'] = status
+            job['speed'] = 0.0
+            job['eta'] = None
+            self._retire_oldest_done()
+        return job
+
+    def _retire_oldest_done(self):
+        excess = self._done_count - self.max_done
+        if excess <= 0:
+            return
+        # Stop at the oldest few done jobs rather than copying the registry on every call
+        victims = []
+        for job_id, job in self._jobs.items():
+            if job['status'] in self.DONE_STATUSES:
+                victims.append(job_id)
+                if len(victims) >= excess:
+                    break
+        for job_id in victims:
+            job = self._jobs.pop(job_id)
+            self._done_count -= 1
+            self._retired[job['status']] = self._retired.get(job['status'], 0) + 1
+            self._retired['bytes'] = self._retired.get('bytes', 0) + (self.expected_bytes(job) or 0)
+
+    def expected_bytes(self, job):
+        """Best guess of a job's download size: the estimate, or what progress has revealed"""
+        expected = max(job.get('estimated_size') or 0, job['total'], job['downloaded'])
+        return expected or None
+
+    def clear_finished(self):
+        for job_id in [job_id for job_id, job in self._jobs.items() if job['status'] in self.DONE_STATUSES]:
+            del self._jobs[job_id]
+        self._done_count = 0
+        self._retired = {}
+
+    def aggregate(self):
+        """Batch totals weighted by expected bytes"""
+        jobs = list(self._jobs.values())
+        known = [self.expected_bytes(job) for job in jobs]
+        known_sizes = [size for size in known if size]
+        # Jobs with no size yet weigh as much as the average known job
+        fallback = sum(known_sizes) / len(known_sizes) if known_sizes else DownloadManager.DEFAULT_JOB_SIZE
+
+        expected_total = 0
+        done_total = 0
+        speed = 0.0
+        counts = {'queued': 0, 'active': 0, 'finished': 0, 'failed': 0, 'cancelled': 0}
+        for job, expected in zip(jobs, known):
+            expected = expected or fallback
+            expected_total += expected
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+            if job['status'] in self.DONE_STATUSES:
+                done_total += expected  # Done either way; nothing more will download
+            else:
+                done_total += min(job['downloaded'], expected)
+                speed += job['speed']
+
+        retired_jobs = 0
+        for status in self.DONE_STATUSES:
+            counts[status] += self._retired.get(status, 0)
+            retired_jobs += self._retired.get(status, 0)
+        expected_total += self._retired.get('bytes', 0)
+        done_total += self._retired.get('bytes', 0)
+
+        remaining = max(0, expected_total - done_total)
+        return dict(
+            counts,
+            total_jobs=len(jobs) + retired_jobs,
+            downloaded=done_total,
+            expected=expected_total,
+            progress=done_total / expected_total if expected_total else 0.0,
+            speed=speed,
+            eta=remaining / speed if speed else None,
+        )
+
+# --- Memory Budget ---
+INFO_FIELDS = ('_type', 'id', 'title', 'url', 'webpage_url', 'original_url', 'ie_key', 'extractor_key',
+               'duration', 'filesize', 'filesize_approx', 'playlist_count', 'entries_count')
+
+
+def trim_info(info, fields=INFO_FIELDS):
+    """Copy of an info dict with only the fields the app reads; playlist entries are trimmed too.
+
+    Full info dicts carry every format, thumbnail and subtitle track, and a flat
+    playlist listing can run to megabytes, so only trimmed copies are kept around.
+    """
+    if not isinstance(info, dict):
+        return info
+    trimmed = {key: info[key] for key in fields if key in info}
+    if info.get('entries') is not None:
+        trimmed['entries'] = [trim_info(entry, fields) for entry in info['entries']]
+    return trimmed
+
+
+class MemoryBudget:
+    """Memory accounting for download jobs and the limit the scheduler admits them under.
+
+    Memory is the RSS of this process plus its children (ffmpeg merges and
+    conversions). Each sample taken while jobs run splits the memory above the
+    idle baseline evenly across them, giving every job its share in
+    job['memory'] and job['peak_memory']. Finished jobs' peaks are averaged into
+    job_bytes, the expected cost of a job. admit() refuses a job when current
+    memory, plus what running jobs are still expected to grow by, plus that cost
+    would pass the budget, unless nothing is running, so a batch always makes
+    progress.
+    """
+
+    DEFAULT_JOB_BYTES = 150 * 1024 * 1024  # Until a job has been measured: yt-dlp, buffers and ffmpeg
+    SMOOTHING = 0.3
+
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = budget_bytes or self.default_budget()
+        self.job_bytes = self.DEFAULT_JOB_BYTES
+        self.baseline = self.rss()
+        self.last_rss = self.baseline
+
+    @staticmethod
+    def total_memory():
+        try:
+            import psutil
+            return psutil.virtual_memory().total
+        except ImportError:
+            pass
+        try:
+            return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (ValueError, OSError, AttributeError):
+            return None
+
+    @classmethod
+    def default_budget(cls):
+        """Half of physical memory, leaving the rest to the system and other apps"""
+        total = cls.total_memory()
+        return total // 2 if total else 1024 * 1024 * 1024
+
+    @staticmethod
+    def rss():
+        """RSS of this process and its children in bytes, or None when it can't be read"""
+        try:
+            import psutil
+            process = psutil.Process()
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass  # Exited while we looked
+            return total
+        except ImportError:
+            pass
+        try:
+            page_size = os.sysconf('SC_PAGE_SIZE')
+            with open('/proc/self/statm') as f:
+                total = int(f.read().split()[1]) * page_size
+        except (OSError, ValueError, AttributeError):
+            return None
+        # Children are listed per thread that started them
+        try:
+            tasks = os.listdir('/proc/self/task')
+        except OSError:
+            return total
+        for task in tasks:
+            try:
+                with open(f'/proc/self/task/{task}/children') as f:
+                    children = f.read().split()
+            except OSError:
+                continue
+            for pid in children:
+                try:
+                    with open(f'/proc/{pid}/statm') as f:
+                        total += int(f.read().split()[1]) * page_size
+                except (OSError, ValueError):
+                    pass
+        return total
+
+    def sample(self, jobs):
+        """Measure memory and charge it to the running jobs"""
+        rss = self.rss()
+        if rss is None:
+            return None
+        self.last_rss = rss
+        if not jobs:
+            self.baseline = rss
+        elif self.baseline is not None:
+            share = max(0, rss - self.baseline) // len(jobs)
+            for job in jobs:
+                job['memory'] = share
+                job['peak_memory'] = max(job.get('peak_memory', 0), share)
+        metrics = MetricsRegistry.instance()
+        metrics.set('mediadl_memory_bytes', rss)
+        metrics.set('mediadl_memory_budget_bytes', self.budget_bytes)
+        return rss
+
+    def job_done(self, job):
+        """Fold a finished job's peak into the expected cost of the next one"""
+        if job.get('peak_memory'):
+            self.job_bytes = int((1 - self.SMOOTHING) * self.job_bytes + self.SMOOTHING * job['peak_memory'])
+
+    def admit(self, jobs):
+        """Whether one more job fits next to the running jobs"""
+        if not jobs:
+            return True
+        rss = self.rss()
+        if rss is None:
+            return True
+        self.last_rss = rss
+        # Jobs that just started haven't allocated yet; reserve what they are expected to reach
+        growth = sum(max(0, self.job_bytes - job.get('peak_memory', 0)) for job in jobs)
+        return rss + growth + self.job_bytes <= self.budget_bytes
+
+# --- Retry Policy ---
+class RetryPolicy:
+    """Whether and when a failed job runs again, from how its error was classified.
+
+    Permanent errors (bad links, private videos, disk problems) fail at once.
+    Transient ones (timeouts, 5xx) go back to the queue after an exponential
+    backoff with jitter, so the wait doesn't hold a download slot and a burst
+    of failures doesn't come back all at once. A job's settings can set its own
+    limit with max_retries.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=5.0, max_delay=300.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, job, error):
+        limit = (job.get('settings') or {}).get('max_retries', self.max_attempts)
+        return bool(error and error.get('transient')) and job['attempts'] < limit
+
+    def delay(self, attempts):
+        """Seconds to wait before the next try after `attempts` retries"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** attempts)
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class CircuitBreakers:
+    """Per-host breakers that stop starting jobs against a host that keeps failing.
+
+    After `threshold` transient failures in a row a host's breaker opens and its
+    queued jobs wait out `cooldown` seconds. Then a single job goes through as a
+    probe: if it gets an answer from the host the breaker closes, if not it opens
+    again for twice as long, up to max_cooldown.
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._hosts = {}  # host -> {'failures', 'open_until', 'cooldown', 'probing'}
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {'failures': 0, 'open_until': None, 'cooldown': self.cooldown, 'probing': False}
+        return self._hosts[host]
+
+    def allow(self, host, now=None):
+        """Whether a job against host may start now"""
+        state = self._hosts.get(host)
+        if state is None or state['open_until'] is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now >= state['open_until'] and not state['probing']
+
+    def reopens_at(self, host):
+        """When an open breaker lets its next probe through, or None when closed"""
+        state = self._hosts.get(host)
+        return state['open_until'] if state else None
+
+    def started(self, host, now=None):
+        state = self._hosts.get(host)
+        if state is not None and state['open_until'] is not None:
+            state['probing'] = True
+
+    def released(self, host):
+        """A job ended without an answer either way (cancelled, preempted)"""
+        state = self._hosts.get(host)
+        if state is not None:
+            state['probing'] = False
+
+    def record_success(self, host):
+        """The host answered - a finished download or a permanent error like a 404"""
+        state = self._hosts.get(host)
+        if state is not None and (state['failures'] or state['open_until'] is not None):
+            if state['open_until'] is not None:
+                log.info("Circuit closed for %s", host)
+            self._hosts[host] = {'failures': 0, 'open_until': None, 'cooldown': self.cooldown, 'probing': False}
+
+    def record_failure(self, host, now=None):
+        """Count a transient failure; returns True when this opened the breaker"""
+        now = time.monotonic() if now is None else now
+        state = self._state(host)
+        state['failures'] += 1
+        if state['probing']:
+            state['cooldown'] = min(self.max_cooldown, state['cooldown'] * 2)
+        elif state['open_until'] is not None or state['failures'] < self.threshold:
+            return False  # Already open (a job started before it tripped), or not enough failures yet
+        state['probing'] = False
+        state['open_until'] = now + state['cooldown']
+        MetricsRegistry.instance().inc('mediadl_circuit_trips_total', host=host)
+        log.warning("Circuit open for %s after %d failures; holding its jobs for %.1fs",
+                    host, state['failures'], state['cooldown'])
+        return True
+
+# --- Dead Letter Queue ---
+class DeadLetterQueue:
+    """Failed downloads kept on disk so they can be retried later, in bulk.
+
+    There is one entry per URL and download type, holding its error category,
+    how many times it has been tried and the options it last ran with. An entry
+    stays until its URL downloads successfully; while a retry is queued its
+    status is 'retrying'. Saves run on a background thread and a burst of
+    changes writes only the newest state, like the download history.
+    """
+
+    MAX_ENTRIES = 5000  # Oldest failures are dropped past this
+    OPTION_KEYS = ('quality', 'audio_format', 'max_retries')  # Settings a retry reuses
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []  # Oldest failure first
+        self._index = {}  # (url, download_type) -> entry
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._snapshot = None  # Newest entries waiting to be written
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dead-letter-save')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Could not load failed downloads from %s: %s", self.path, e)
+            return
+        for entry in entries:
+            if entry.get('status') == 'retrying':
+                entry['status'] = 'failed'  # The app closed before the retry finished
+        self.entries = entries
+        self._index = {(entry['url'], entry['download_type']): entry for entry in entries}
+        self._ids = itertools.count(max((entry['id'] for entry in entries), default=0) + 1)
+        self._report()
+
+    def get(self, url, download_type):
+        return self._index.get((url, download_type))
+
+    def add(self, job, category, detail, output_path):
+        """Record a failed job, or update the entry of a URL that failed before"""
+        entry = self._index.pop((job['url'], job['download_type']), None)
+        if entry is None:
+            entry = {'id': next(self._ids), 'url': job['url'], 'download_type': job['download_type'],
+                     'attempts': 0, 'failures': 0}
+        else:
+            self.entries.remove(entry)  # Moves to the end, with the newest failures
+        settings = job.get('settings') or {}
+        entry.update({
+            'category': category,
+            'error': str(detail),
+            'attempts': entry['attempts'] + job.get('attempts', 0) + 1,
+            'failures': entry['failures'] + 1,
+            'options': {key: settings[key] for key in self.OPTION_KEYS if key in settings},
+            'output_path': output_path,
+            'priority': job.get('priority', 0),
+            'failed_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'status': 'failed',
+        })
+        self.entries.append(entry)
+        self._index[(entry['url'], entry['download_type'])] = entry
+        for dropped in self.entries[:-self.MAX_ENTRIES]:
+            del self._index[(dropped['url'], dropped['download_type'])]
+        del self.entries[:-self.MAX_ENTRIES]
+        self.save()
+        return entry
+
+    def resolve(self, url, download_type):
+        """Drop the entry of a URL that has now downloaded"""
+        entry = self._index.pop((url, download_type), None)
+        if entry is not None:
+            self.entries.remove(entry)
+            self.save()
+
+    def remove(self, entries):
+        ids = {entry['id'] for entry in entries}
+        self.entries = [entry for entry in self.entries if entry['id'] not in ids]
+        self._index = {(entry['url'], entry['download_type']): entry for entry in self.entries}
+        self.save()
+
+    def set_status(self, entries, status):
+        for entry in entries:
+            entry['status'] = status
+        self.save()
+
+    def release(self, url=None, download_type=None):
+        """A queued retry was cancelled: back to 'failed' (every retrying entry when url is None)"""
+        entries = self.entries if url is None else [self.get(url, download_type)]
+        released = [entry for entry in entries if entry and entry['status'] == 'retrying']
+        if released:
+            self.set_status(released, 'failed')
+
+    def categories(self):
+        """Entry count per error category"""
+        counts = {}
+        for entry in self.entries:
+            counts[entry['category']] = counts.get(entry['category'], 0) + 1
+        return counts
+
+    def save(self):
+        """Queue a write of the file; a burst of saves writes only the newest snapshot"""
+        self._report()
+        with self._lock:
+            pending = self._snapshot is not None
+            self._snapshot = [dict(entry) for entry in self.entries]
+        if not pending:
+            self._writer.submit(self._write)
+
+    def _write(self):
+        with self._lock:
+            entries, self._snapshot = self._snapshot, None
+        try:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            log.warning("Could not save failed downloads to %s: %s", self.path, e)
+
+    def shutdown(self):
+        self._writer.shutdown(wait=True)
+
+    def _report(self):
+        MetricsRegistry.instance().set('mediadl_dead_letters', len(self.entries))
+
+# --- Download Manager for Parallel Downloads ---
+class DownloadManager(QObject):
+    """Runs queued downloads with at most max_concurrent in flight.
+
+    Jobs wait in one bucket per priority; a heap of priorities picks the highest
+    non-empty bucket and the scheduling policy picks the job within it:
+      fifo - start jobs in the order they were added
+      sjf  - start the smallest estimated job first; waiting jobs earn aging_rate
+             bytes of credit per second so large jobs are not starved
+      fair - start from the group (by default the URL's host) with the fewest
+             active downloads, in order within a group
+
+    A job added with preempt=True suspends the lowest-priority running job when
+    every slot is busy. The suspended job goes back to the queue and resumes from
+    its partial files when it starts again.
+
+    A failed job the retry policy accepts goes back to the queue with a
+    not_before time instead of failing; jobs against a host whose circuit
+    breaker is open wait in the queue until it lets a probe through.
+
+    With a size estimator and lookahead > 0, the next `lookahead` jobs the
+    policy would start are extracted ahead of time, so a job that gets a slot
+    goes straight to downloading instead of leaving the network idle while it
+    resolves formats.
+
+    A schedule window (see ScheduleProfiles) can lower the concurrency limit,
+    cap the bandwidth all running jobs share, and hold a class of jobs in the
+    queue: jobs below normal priority are 'bulk', the rest 'interactive'.
+    """
+
+    POLICIES = ('fifo', 'sjf', 'fair')
+    JOB_CLASSES = ('interactive', 'bulk')
+    DEFAULT_JOB_SIZE = 50 * 1024 * 1024  # Assumed size when nothing is known yet
+
+    PRIORITY_LOW = -10
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 10
+    PRIORITY_URGENT = 100
+
+    job_started = pyqtSignal(int)
+    job_progress = pyqtSignal(object)  # ProgressEvent
+    job_finished = pyqtSignal(int, str)
+    job_failed = pyqtSignal(int, str)
+    job_preempted = pyqtSignal(int)
+    job_cancelled = pyqtSignal(int)  # A queued job was dropped; running jobs report through job_failed
+    job_retrying = pyqtSignal(int, float, str)  # job id, seconds until the retry, error message
+    queue_drained = pyqtSignal()
+
+    def __init__(self, max_concurrent=3, policy='fifo', aging_rate=4 * 1024 * 1024, size_estimator=None,
+                 memory_budget=None, retry_policy=None, circuit_breakers=None, lookahead=0, parent=None):
+        super().__init__(parent)
+        self.max_concurrent = max_concurrent
+        self.policy = policy if policy in self.POLICIES else 'fifo'
+        self.aging_rate = aging_rate
+        self.size_estimator = size_estimator
+        self.lookahead = lookahead  # Queued jobs extracted ahead of their download
+        self.worker_pool = None  # WorkerPool when jobs run in worker processes instead of threads
+        self.active_downloads = []
+        self.completed_downloads = []
+        self._queues = {}  # priority -> queued jobs in arrival order
+        self._priority_heap = []  # negated priorities; entries for emptied buckets are skipped lazily
+        self.registry = JobRegistry()  # Every job of the current batch, by job id
+        self._job_ids = itertools.count(1)
+        self.memory_budget = memory_budget  # Optional MemoryBudget checked before each start
+        self._memory_deferred = False  # A job is waiting for memory, not for a slot
+        self.memory_timer = QTimer(self)
+        self.memory_timer.setInterval(1000)
+        self.memory_timer.timeout.connect(self._sample_memory)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers or CircuitBreakers()
+        self.wakeup_timer = QTimer(self)  # Pumps again when a retry or blocked host becomes ready
+        self.wakeup_timer.setSingleShot(True)
+        self.wakeup_timer.timeout.connect(self.pump)
+        self.concurrency_cap = None  # Lower limit from the schedule window
+        self.rate_limit = None  # Bytes per second shared by the running jobs, from the schedule window
+        self.allowed_classes = None  # Job classes the schedule window lets start; None allows every class
+        
+    def add_download(self, downloader, url, download_type, settings=None, group=None,
+                     priority=PRIORITY_NORMAL, preempt=False, delay=0.0):
+        """Queue a job; with a delay it waits that many seconds before it may start"""
+        job = {
+            'job_id': next(self._job_ids),
+            'downloader': downloader,
+            'url': url,
+            'download_type': download_type,
+            'settings': settings,
+            'host': urlparse(url).hostname or '',
+            'group': group or urlparse(url).hostname or '',
+            'priority': priority,
+            'preempt': preempt,
+            'status': 'queued',
+            'enqueued_at': time.monotonic(),
+            'started_at': None,
+            'estimated_size': None,
+            'preemptions': 0,
+            'attempts': 0,  # Retries so far
+            'not_before': time.monotonic() + delay if delay else 0.0,  # Monotonic time a retry may start
+            'trace': JobTrace(),
+        }
+        self.registry.add(job)
+        self._enqueue(job)
+        if self.size_estimator is not None and self.policy == 'sjf' and self._can_extract_here(job):
+            self.size_estimator.submit(job)  # Jobs it can't extract wait with the queue median as their size
+        if preempt:
+            self._preempt_for(job)
+        self._report_load()
+        return job['job_id']
+
+    def get_job(self, job_id):
+        return self.registry.get(job_id)
+
+    @property
+    def download_queue(self):
+        """Queued jobs, highest priority first"""
+        return [job for priority in sorted(self._queues, reverse=True) for job in self._queues[priority]]
+
+    def _enqueue(self, job):
+        job['status'] = 'queued'
+        job['trace'].enter('queued')
+        if job['priority'] not in self._queues:
+            self._queues[job['priority']] = []
+            heapq.heappush(self._priority_heap, -job['priority'])
+        # Keep buckets in arrival order, so requeued and reprioritized jobs keep their place
+        bucket = self._queues[job['priority']]
+        index = len(bucket)
+        while index > 0 and bucket[index - 1]['enqueued_at'] > job['enqueued_at']:
+            index -= 1
+        bucket.insert(index, job)
+
+    def _remove_queued(self, job):
+        bucket = self._queues.get(job['priority'])
+        if bucket and job in bucket:
+            bucket.remove(job)
+            if not bucket:
+                del self._queues[job['priority']]
+            return True
+        return False
+
+    def pop_next_job(self, now=None):
+        """Take the job that should start next off the queue"""
+        while self._priority_heap and -self._priority_heap[0] not in self._queues:
+            heapq.heappop(self._priority_heap)
+        if not self._priority_heap:
+            return None
+        now = time.monotonic() if now is None else now
+        top = -self._priority_heap[0]
+        # Usually the top bucket has a ready job; if all of it is waiting, look lower
+        for priority in itertools.chain([top], sorted((p for p in self._queues if p != top), reverse=True)):
+            bucket = self._queues[priority]
+            ready = [job for job in bucket if self._is_ready(job, now)]
+            if not ready:
+                continue
+            job = ready[self._select_next_index(ready, now)]
+            bucket.remove(job)
+            if not bucket:
+                del self._queues[priority]
+            return job
+        return None
+
+    def _is_ready(self, job, now):
+        return job['not_before'] <= now and not self.is_held(job) and self.circuit_breakers.allow(job['host'], now)
+
+    @classmethod
+    def job_class(cls, priority):
+        """'bulk' below normal priority (subscriptions, lowered jobs), else 'interactive'"""
+        return 'bulk' if priority < cls.PRIORITY_NORMAL else 'interactive'
+
+    def class_allowed(self, job_class):
+        """Whether the schedule window lets jobs of job_class start"""
+        return self.allowed_classes is None or job_class in self.allowed_classes
+
+    def is_held(self, job):
+        """Whether the schedule window keeps the job's class from starting"""
+        return not self.class_allowed(self.job_class(job['priority']))
+
+    def concurrency_limit(self):
+        """max_concurrent, lowered by the schedule window's cap and the number of worker processes"""
+        limit = self.max_concurrent
+        if self.concurrency_cap is not None:
+            limit = min(limit, self.concurrency_cap)
+        if self.worker_pool is not None:
+            limit = min(limit, self.worker_pool.size)  # More would sit in pool.acquire() holding a slot
+        return limit
+
+    def set_schedule(self, concurrency_cap=None, rate_limit=None, allowed_classes=None):
+        """Apply a schedule window's limits; running jobs of a class it holds go back to the queue"""
+        self.concurrency_cap = concurrency_cap
+        self.rate_limit = rate_limit
+        self.allowed_classes = allowed_classes
+        for download in self.active_downloads:
+            job = download['info']
+            if not job.get('preempted') and self.is_held(job):
+                job['preempted'] = True  # Requeued like a preempted job; resumes from its .part files
+                download['thread'].cancel()
+        self.pump()
+
+    def _share_bandwidth(self):
+        """Split rate_limit evenly between the running jobs"""
+        running = [download for download in self.active_downloads if not download['info'].get('preempted')]
+        share = self.rate_limit / len(running) if self.rate_limit and running else None
+        for download in running:
+            download['thread'].set_rate_limit(share)
+
+    def _ready_at(self, job):
+        return max(job['not_before'], self.circuit_breakers.reopens_at(job['host']) or 0.0)
+
+    def _schedule_wakeup(self):
+        """Arm the wakeup timer for the first waiting job to become ready"""
+        now = time.monotonic()
+        waiting = [self._ready_at(job) for bucket in self._queues.values() for job in bucket
+                   if not self._is_ready(job, now)]
+        waiting = [ready_at for ready_at in waiting if ready_at > now]
+        if waiting:
+            self.wakeup_timer.start(int((min(waiting) - now) * 1000) + 10)
+
+    def _select_next_index(self, jobs, now=None):
+        """Index into jobs (one priority bucket) of the job the policy would start next"""
+        if self.policy == 'sjf':
+            now = time.monotonic() if now is None else now
+            known = [job['estimated_size'] for job in jobs if job['estimated_size']]
+            fallback = statistics.median(known) if known else self.DEFAULT_JOB_SIZE
+
+            def score(index):
+                job = jobs[index]
+                size = job['estimated_size'] or fallback
+                return (size - self.aging_rate * (now - job['enqueued_at']), index)
+
+            return min(range(len(jobs)), key=score)
+
+        if self.policy == 'fair':
+            active_per_group = {}
+            for download in self.active_downloads:
+                group = download['info'].get('group')
+                active_per_group[group] = active_per_group.get(group, 0) + 1
+            # Buckets are in arrival order, so the first job seen per group is its oldest
+            return min(range(len(jobs)),
+                       key=lambda index: (active_per_group.get(jobs[index]['group'], 0), index))
+
+        return 0
+
+    def set_priority(self, job_id, priority, preempt=False):
+        """Change a job's priority; queued jobs move to their new bucket"""
+        job = self.registry.get(job_id)
+        if job is None:
+            return False
+        if job['status'] == 'queued' and self._remove_queued(job):
+            job['priority'] = priority
+            self._enqueue(job)
+            if preempt:
+                job['preempt'] = True
+                self._preempt_for(job)
+        else:
+            job['priority'] = priority  # Only affects which job gets preempted
+        return True
+
+    def running_count(self):
+        # Jobs being preempted still hold their slot: they stop at their next progress
+        # hook, which can be a while during extraction or post-processing
+        return len(self.active_downloads)
+
+    def _preempt_for(self, job):
+        """Suspend the lowest-priority running job so job can start right away"""
+        if self.running_count() < self.concurrency_limit():
+            return False
+        victims = [d for d in self.active_downloads
+                   if not d['info'].get('preempted') and d['info']['priority'] < job['priority']]
+        if not victims:
+            return False
+        # Lowest priority first; among equals the most recently started loses the least work
+        victim = min(victims, key=lambda d: (d['info']['priority'], -d['info']['started_at']))
+        victim['info']['preempted'] = True
+        victim['thread'].cancel()  # job starts from _on_thread_error once the victim has left
+        return True
+        
+    def start_next_download(self):
+        if self.running_count() < self.concurrency_limit():
+            if self._queues and not self._admit_by_memory():
+                return None
+            download_info = self.pop_next_job()
+            if download_info is None:
+                return None
+            
+            # Each job gets its own Downloader so pause/cancel only affect that job
+            downloader = download_info['downloader'].spawn()
+            downloader.trace = download_info['trace']
+            downloader.prefetched = download_info.pop('extraction', None)
+            downloader.log = job_logger(job_id=download_info['job_id'], url=download_info['url'])
+            thread_class = DownloadThread if self.worker_pool is None else partial(ProcessDownloadThread, self.worker_pool)
+            thread = thread_class(
+                downloader,
+                download_info['url'],
+                download_info['download_type'],
+                download_info['settings'],
+                job_id=download_info['job_id']
+            )
+            thread.progress_signal.connect(self._on_thread_progress)
+            thread.finished_signal.connect(self._on_thread_finished)
+            thread.error_signal.connect(self._on_thread_error)
+            
+            download_info['status'] = 'active'
+            download_info['started_at'] = time.monotonic()
+            self.circuit_breakers.started(download_info['host'])
+            self.active_downloads.append({
+                'thread': thread,
+                'info': download_info
+            })
+            self._share_bandwidth()
+            
+            # Start the thread
+            thread.start()
+            if self.memory_budget is not None and not self.memory_timer.isActive():
+                self.memory_timer.start()
+            downloader.log.info("Job started", extra={'download_type': download_info['download_type'],
+                                                      'queued_s': round(download_info['trace'].duration('queued'), 3)})
+            self.job_started.emit(download_info['job_id'])
+            
+            return thread
+        return None
+
+    def pump(self):
+        """Start queued jobs until the concurrency limit is reached"""
+        started = []
+        while True:
+            thread = self.start_next_download()
+            if thread is None:
+                break
+            started.append(thread)
+        self._share_bandwidth()  # Jobs that left freed their share
+        self._extract_ahead()
+        self._schedule_wakeup()
+        self._report_load()
+        return started
+
+    def upcoming(self, count, now=None):
+        """The next count ready jobs, in the order the policy would start them"""
+        now = time.monotonic() if now is None else now
+        jobs = []
+        for priority in sorted(self._queues, reverse=True):
+            ready = [job for job in self._queues[priority] if self._is_ready(job, now)]
+            while ready and len(jobs) < count:
+                jobs.append(ready.pop(self._select_next_index(ready, now)))
+            if len(jobs) >= count:
+                break
+        return jobs
+
+    def _extract_ahead(self):
+        if self.size_estimator is None or not self.lookahead:
+            return
+        for job in self.upcoming(self.lookahead):
+            if job.get('extraction') is None and self._can_prefetch(job):
+                job['extraction'] = self.size_estimator.prefetch(job)
+
+    def _can_prefetch(self, job):
+        if job['download_type'] == 'playlist':
+            return False  # Playlist entries are listed lazily, so there is nothing to hand over
+        return self._can_extract_here(job)
+
+    def _can_extract_here(self, job):
+        """Whether the app process may extract the job early, for its size estimate or look-ahead"""
+        if self.worker_pool is not None:
+            return False  # Worker processes extract on their own cores; doing it here would put it back on the GIL
+        # Stream URLs are often signed for the address that resolved them, so proxied jobs extract when they start
+        proxy_pool = getattr(job['downloader'], 'proxy_pool', None)
+        return not (proxy_pool is not None and len(proxy_pool)) and not (job.get('settings') or {}).get('use_proxy')
+
+    def _admit_by_memory(self):
+        running = [d['info'] for d in self.active_downloads if not d['info'].get('preempted')]
+        if self.memory_budget is None or self.memory_budget.admit(running):
+            self._memory_deferred = False
+            return True
+        if not self._memory_deferred:
+            self._memory_deferred = True
+            MetricsRegistry.instance().inc('mediadl_admissions_deferred_total')
+            log.info("Holding queued jobs: %d MB in use, next job needs ~%d MB, budget %d MB",
+                     self.memory_budget.last_rss // (1024 * 1024), self.memory_budget.job_bytes // (1024 * 1024),
+                     self.memory_budget.budget_bytes // (1024 * 1024))
+        return False
+
+    def _sample_memory(self):
+        jobs = [download['info'] for download in self.active_downloads]
+        self.memory_budget.sample(jobs)
+        if not jobs:
+            self.memory_timer.stop()
+        if self._memory_deferred:
+            self.pump()  # Memory may have been freed since the job was held back
+
+    def _report_load(self):
+        metrics = MetricsRegistry.instance()
+        metrics.set('mediadl_queue_depth', self.queued_count())
+        metrics.set('mediadl_active_workers', len(self.active_downloads))
+        metrics.set('mediadl_max_concurrent', self.concurrency_limit())
+        
+    def remove_completed_download(self, thread):
+        self.active_downloads = [d for d in self.active_downloads if d['thread'] != thread]
+        # Keep the thread alive until run() has returned, then let it and its downloader go
+        self.completed_downloads.append(thread)
+        thread.finished.connect(self._release_thread)
+        if thread.isFinished():
+            self.completed_downloads.remove(thread)
+
+    def _release_thread(self):
+        thread = self.sender()
+        if thread in self.completed_downloads:
+            self.completed_downloads.remove(thread)
+
+    def _take_active(self, thread):
+        for download in self.active_downloads:
+            if download['thread'] is thread:
+                self.remove_completed_download(thread)
+                if self.memory_budget is not None:
+                    self.memory_budget.job_done(download['info'])
+                return download['info']
+        return None
+
+    def _on_thread_progress(self, event):
+        job = self.registry.update_progress(event)
+        if job is None:
+            return
+        if event.phase == 'finished' and event.filename:
+            job['filename'] = event.filename
+        self.job_progress.emit(event)
+
+    def _on_thread_finished(self, message):
+        job = self._take_active(self.sender())
+        if job is not None:
+            self.circuit_breakers.record_success(job['host'])
+            self.registry.mark_done(job['job_id'], 'finished')
+            MetricsRegistry.instance().inc('mediadl_jobs_total', outcome='finished')
+            job_logger(job_id=job['job_id'], url=job['url']).info(
+                "Job finished", extra={'bytes': job['trace'].bytes, 'peak_memory': job.get('peak_memory')})
+            self.job_finished.emit(job['job_id'], message)
+        self._pump_or_drain()
+
+    def _on_thread_error(self, message):
+        thread = self.sender()
+        job = self._take_active(thread)
+        if job is not None:
+            error = thread.downloader.last_error
+            job['error'] = error  # Classified once by the worker; later stages read it from here
+            if job.pop('preempted', False) and not job.get('cancelled'):
+                self.circuit_breakers.released(job['host'])
+                # Suspended for an urgent job - requeue; yt-dlp resumes from the .part files
+                job['preemptions'] += 1
+                job['checkpoint_bytes'] = thread.downloader.downloaded_bytes()
+                self._enqueue(job)
+                MetricsRegistry.instance().inc('mediadl_jobs_total', outcome='preempted')
+                job_logger(job_id=job['job_id'], url=job['url']).info(
+                    "Job preempted", extra={'checkpoint_bytes': job['checkpoint_bytes']})
+                self.job_preempted.emit(job['job_id'])
+            elif not job.get('cancelled') and self.retry_policy.should_retry(job, error):
+                self.circuit_breakers.record_failure(job['host'])
+                self._requeue_for_retry(job, error, message)
+            else:
+                if job.get('cancelled'):
+                    self.circuit_breakers.released(job['host'])
+                elif error and error.get('transient'):
+                    self.circuit_breakers.record_failure(job['host'])
+                else:
+                    self.circuit_breakers.record_success(job['host'])  # The host answered, just not with media
+                outcome = 'cancelled' if job.get('cancelled') else 'failed'
+                self.registry.mark_done(job['job_id'], outcome)
+                MetricsRegistry.instance().inc('mediadl_jobs_total', outcome=outcome)
+                job_logger(job_id=job['job_id'], url=job['url']).info("Job %s", outcome)  # The worker logged why
+                self.job_failed.emit(job['job_id'], message)
+        self._pump_or_drain()
+
+    def _requeue_for_retry(self, job, error, message):
+        """Put a transiently failed job back in the queue after a backoff"""
+        delay = self.retry_policy.delay(job['attempts'])
+        job['attempts'] += 1
+        job['not_before'] = time.monotonic() + delay
+        job['last_error'] = error['category']
+        job['trace'].enter('queued', f"retry {job['attempts']} after {error['category']}")
+        self._enqueue(job)
+        MetricsRegistry.instance().inc('mediadl_retries_total', kind='job')
+        MetricsRegistry.instance().inc('mediadl_jobs_total', outcome='retried')
+        job_logger(job_id=job['job_id'], url=job['url']).info(
+            "Job will retry in %.1fs", delay, extra={'attempt': job['attempts'], 'category': error['category']})
+        self.job_retrying.emit(job['job_id'], delay, message)
+
+    def _pump_or_drain(self):
+        self.pump()
+        if not self.has_pending_downloads():
+            self.queue_drained.emit()
+
+    def pause_all(self):
+        for download in self.active_downloads:
+            download['thread'].pause()
+
+    def resume_all(self):
+        for download in self.active_downloads:
+            download['thread'].resume()
+
+    def queued_count(self):
+        return sum(len(bucket) for bucket in self._queues.values())
+
+    def cancel_job(self, job_id):
+        """Drop one queued job, or cancel it if it's running"""
+        job = self.registry.get(job_id)
+        if job is None:
+            return False
+        if job['status'] == 'queued' and self._remove_queued(job):
+            extraction = job.pop('extraction', None)
+            if extraction is not None:
+                extraction.cancel()
+            self.registry.mark_done(job_id, 'cancelled')
+            self._report_load()
+            self.job_cancelled.emit(job_id)
+            if not self.has_pending_downloads():
+                self.queue_drained.emit()
+            return True
+        thread = self._active_thread(job)
+        if thread is None:
+            return False
+        job['cancelled'] = True
+        thread.cancel()
+        return True
+
+    def pause_job(self, job_id):
+        thread = self._active_thread(self.registry.get(job_id))
+        if thread is not None:
+            thread.pause()
+        return thread is not None
+
+    def resume_job(self, job_id):
+        thread = self._active_thread(self.registry.get(job_id))
+        if thread is not None:
+            thread.resume()
+        return thread is not None
+
+    def _active_thread(self, job):
+        for download in self.active_downloads:
+            if download['info'] is job:
+                return download['thread']
+        return None
+
+    def cancel_all(self):
+        """Drop every queued job and cancel the running ones"""
+        dropped = self.download_queue
+        for job in dropped:
+            extraction = job.pop('extraction', None)
+            if extraction is not None:
+                extraction.cancel()
+            self.registry.mark_done(job['job_id'], 'cancelled')
+        self._queues.clear()
+        self._priority_heap.clear()
+        for download in self.active_downloads:
+            download['info']['cancelled'] = True
+            download['thread'].cancel()
+        self._report_load()
+        for job in dropped:
+            self.job_cancelled.emit(job['job_id'])
+        
+    def has_pending_downloads(self):
+        return bool(self._queues) or len(self.active_downloads) > 0
+
+# --- Concurrency Controller ---
+class ConcurrencyController(QObject):
+    """AIMD tuning of DownloadManager.max_concurrent from measured throughput.
+
+    Every interval it looks at the last window of aggregate bytes/sec, job error
+    rate, time to first byte and CPU use:
+      - errors, rising time to first byte or CPU saturation halve concurrency
+      - with a backlog and every slot busy, concurrency goes up by one
+      - an increase that did not raise throughput by gain_threshold is undone
+        and further increases wait for a few windows
+    Every decision is kept in decisions; changes are also appended to log_path.
+    """
+
+    def __init__(self, download_manager, min_concurrent=1, max_concurrent=16, interval=10.0,
+                 gain_threshold=0.05, max_error_rate=0.3, cpu_limit=0.9, latency_factor=2.0,
+                 decrease_factor=0.5, cooldown_windows=3, log_path=None, parent=None):
+        super().__init__(parent)
+        self.download_manager = download_manager
+        self.min_concurrent = min_concurrent
+        self.max_concurrent = max_concurrent
+        self.interval = interval
+        self.gain_threshold = gain_threshold
+        self.max_error_rate = max_error_rate
+        self.cpu_limit = cpu_limit
+        self.latency_factor = latency_factor
+        self.decrease_factor = decrease_factor
+        self.cooldown_windows = cooldown_windows
+        self.log_path = log_path
+        self.decisions = deque(maxlen=1000)
+
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_successes = 0
+        self._window_latencies = []
+        self._baseline_latency = None
+        self._last_bytes = {}  # (job id, filename) -> downloaded bytes
+        self._started = {}  # job id -> start time, until its first byte arrives
+        self._window_start = time.monotonic()
+        self._cpu_sample = None
+        self._pending_increase = None  # (throughput before the increase, windows left to settle)
+        self._cooldown = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+
+        download_manager.job_started.connect(self._on_job_started)
+        download_manager.job_progress.connect(self._on_job_progress)
+        download_manager.job_finished.connect(self._on_job_finished)
+        download_manager.job_failed.connect(self._on_job_failed)
+        download_manager.job_retrying.connect(self._on_job_retrying)
+
+    def start(self):
+        self._window_start = time.monotonic()
+        self.timer.start(int(self.interval * 1000))
+
+    def stop(self):
+        self.timer.stop()
+
+    def _on_job_started(self, job_id):
+        self._started[job_id] = time.monotonic()
+
+    def _on_job_progress(self, event):
+        if event.phase != 'downloading':
+            return
+        started = self._started.pop(event.job_id, None)
+        if started is not None:
+            self._window_latencies.append(time.monotonic() - started)
+        key = (event.job_id, event.filename)
+        self._window_bytes += max(0, event.downloaded - self._last_bytes.get(key, 0))
+        self._last_bytes[key] = event.downloaded
+
+    def _forget_job(self, job_id):
+        self._started.pop(job_id, None)
+        for key in [key for key in self._last_bytes if key[0] == job_id]:
+            del self._last_bytes[key]
+
+    def _on_job_finished(self, job_id, message):
+        self._window_successes += 1
+        self._forget_job(job_id)
+
+    def _on_job_failed(self, job_id, message):
+        job = self.download_manager.get_job(job_id)
+        if not job or job.get('status') != 'cancelled':
+            self._window_errors += 1
+        self._forget_job(job_id)
+
+    def _on_job_retrying(self, job_id, delay, message):
+        self._window_errors += 1
+        self._forget_job(job_id)
+
+    def _cpu_utilization(self):
+        """System-wide CPU use in 0..1, which includes ffmpeg postprocessing children"""
+        try:
+            import psutil
+            return psutil.cpu_percent(interval=None) / 100.0
+        except ImportError:
+            pass
+        if hasattr(os, 'getloadavg'):
+            return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+        # Fall back to this process's own CPU time
+        now = (time.monotonic(), time.process_time())
+        previous, self._cpu_sample = self._cpu_sample, now
+        if previous is None or now[0] <= previous[0]:
+            return 0.0
+        return min(1.0, (now[1] - previous[1]) / ((now[0] - previous[0]) * (os.cpu_count() or 1)))
+
+    def tick(self):
+        """Close the current window and adjust concurrency"""
+        now = time.monotonic()
+        elapsed = max(now - self._window_start, 1e-6)
+        throughput = self._window_bytes / elapsed
+        completed = self._window_errors + self._window_successes
+        error_rate = self._window_errors / completed if completed >= 2 else 0.0
+        latency = statistics.median(self._window_latencies) if self._window_latencies else None
+        cpu = self._cpu_utilization()
+
+        manager = self.download_manager
+        current = manager.max_concurrent
+        backlog = len(manager.download_queue)
+        saturated = manager.running_count() >= current
+        latency_rising = (latency is not None and self._baseline_latency is not None
+                          and latency > 1.0 and latency > self._baseline_latency * self.latency_factor)
+
+        action, reason, new = 'hold', 'steady', current
+        if error_rate > self.max_error_rate:
+            action, reason = 'decrease', f'error rate {error_rate:.0%}'
+        elif cpu > self.cpu_limit:
+            action, reason = 'decrease', f'CPU {cpu:.0%}'
+        elif latency_rising:
+            action, reason = 'decrease', f'time to first byte {latency:.1f}s vs {self._baseline_latency:.1f}s'
+        elif self._pending_increase is not None:
+            before, windows_left = self._pending_increase
+            if windows_left > 1:
+                self._pending_increase = (before, windows_left - 1)
+                reason = 'waiting for the last increase to settle'
+            else:
+                self._pending_increase = None
+                if throughput < before * (1 + self.gain_threshold):
+                    action, reason = 'revert', f'{throughput / 1024:.0f} KiB/s did not beat {before / 1024:.0f} KiB/s'
+                else:
+                    reason = f'increase helped: {throughput / 1024:.0f} KiB/s'
+        elif not backlog or not saturated:
+            reason = 'no backlog' if not backlog else 'free slots'
+        elif self._cooldown > 0:
+            reason = 'cooling down'
+        elif current < self.max_concurrent:
+            action, reason = 'increase', 'backlog with every slot busy'
+
+        if action == 'decrease':
+            new = max(self.min_concurrent, int(current * self.decrease_factor))
+            self._pending_increase = None
+            self._cooldown = self.cooldown_windows
+        elif action == 'revert':
+            new = max(self.min_concurrent, current - 1)
+            self._cooldown = self.cooldown_windows
+        elif action == 'increase':
+            new = current + 1
+            self._pending_increase = (throughput, 2)  # Judge it on the second full window
+        elif self._cooldown > 0:
+            self._cooldown -= 1
+        if new == current and action != 'hold':
+            action = 'hold'  # Already at a bound
+
+        if latency is not None:
+            self._baseline_latency = latency if self._baseline_latency is None else 0.8 * self._baseline_latency + 0.2 * latency
+
+        decision = {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'action': action,
+            'reason': reason,
+            'concurrency': current,
+            'new_concurrency': new,
+            'throughput': round(throughput),
+            'error_rate': round(error_rate, 3),
+            'time_to_first_byte': round(latency, 2) if latency is not None else None,
+            'cpu': round(cpu, 2),
+            'backlog': backlog,
+        }
+        self.decisions.append(decision)
+        if new != current:
+            manager.max_concurrent = new
+            self._write_decision(decision)
+            manager.pump()
+
+        self._window_start = now
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._window_successes = 0
+        self._window_latencies = []
+        return decision
+
+    def _write_decision(self, decision):
+        if not self.log_path:
+            return
+        try:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(decision) + "\n")
+        except Exception as e:
+            log.warning("Could not save concurrency decision to %s: %s", self.log_path, e)
+
+# --- Schedule Profiles ---
+class ScheduleProfiles(QObject):
+    """Time-of-day windows that limit concurrency, bandwidth and which jobs may start.
+
+    Windows come from the schedule setting and the first one covering the
+    current time is in force; outside every window nothing is limited:
+        {"name": "business hours", "days": "mon-fri", "start": "09:00", "end": "18:00",
+         "max_concurrent": 2, "bandwidth_kib": 2048, "classes": ["interactive"]}
+    Every field is optional (the whole day, every day, no limits). A window
+    that ends before it starts runs past midnight and belongs to the day it
+    starts on. Jobs of a class the window leaves out wait in the queue, and
+    running ones are suspended back to it, until a window lets them start.
+    """
+
+    DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+    window_changed = pyqtSignal(object)  # the window now in force, or None
+
+    def __init__(self, download_manager, parent=None):
+        super().__init__(parent)
+        self.manager = download_manager
+        self.windows = []
+        self.active = None
+        self.timer = QTimer(self)  # Fires at the top of each minute, when a window can open or close
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    @classmethod
+    def parse(cls, windows):
+        """Checked copies of the schedule setting's windows; raises ValueError on a bad one"""
+        if not isinstance(windows, list):
+            raise ValueError("schedule must be a list of windows")
+        parsed = []
+        for number, window in enumerate(windows, 1):
+            if not isinstance(window, dict):
+                raise ValueError(f"schedule window {number} must be an object")
+            name = str(window.get('name') or f"window {number}")
+            try:
+                cap = window.get('max_concurrent')
+                cap = int(cap) if cap not in (None, '') else None
+                if cap is not None and cap < 0:
+                    raise ValueError("max_concurrent can't be negative")
+                rate = window.get('bandwidth_kib')
+                rate = float(rate) * 1024 if rate not in (None, '', 0) else None
+                if rate is not None and rate < 0:
+                    raise ValueError("bandwidth_kib can't be negative")
+                classes = window.get('classes')
+                if classes is not None:
+                    classes = tuple([classes] if isinstance(classes, str) else classes)
+                    unknown = [job_class for job_class in classes if job_class not in DownloadManager.JOB_CLASSES]
+                    if unknown:
+                        raise ValueError(f"unknown job class {unknown[0]!r}")
+                parsed.append({'name': name, 'days': cls._days(window.get('days')),
+                               'start': cls._minutes(window.get('start') or '00:00'),
+                               'end': cls._minutes(window.get('end') or '24:00'),
+                               'max_concurrent': cap, 'rate_limit': rate, 'classes': classes})
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"schedule window '{name}': {e}") from None
+        return parsed
+
+    @staticmethod
+    def _minutes(text):
+        """Minutes past midnight for "HH:MM"; "24:00" ends the day"""
+        hours, _, minutes = str(text).partition(':')
+        try:
+            hours, minutes = int(hours), int(minutes or 0)
+        except ValueError:
+            hours = minutes = -1
+        if not (0 <= minutes < 60 and 0 <= hours * 60 + minutes <= 24 * 60):
+            raise ValueError(f"{text!r} is not a time of day")
+        return hours * 60 + minutes
+
+    @classmethod
+    def _days(cls, days):
+        """Weekday numbers from a list or a string like "mon-fri" or "sat,sun"; everything when empty"""
+        if not days:
+            return frozenset(range(7))
+        tokens = days.split(',') if isinstance(days, str) else days
+        numbers = set()
+        for token in tokens:
+            first, _, last = str(token).strip().lower().partition('-')
+            if first[:3] not in cls.DAYS or (last and last[:3] not in cls.DAYS):
+                raise ValueError(f"{token!r} is not a day or range of days")
+            start = cls.DAYS.index(first[:3])
+            stop = cls.DAYS.index(last[:3]) if last else start
+            numbers.update((start + offset) % 7 for offset in range((stop - start) % 7 + 1))
+        return frozenset(numbers)
+
+    @staticmethod
+    def covers(window, when):
+        """Whether window is in force at the datetime when"""
+        minute = when.hour * 60 + when.minute
+        if window['start'] < window['end']:
+            return when.weekday() in window['days'] and window['start'] <= minute < window['end']
+        # Past midnight: the evening part belongs to today, the early morning to yesterday
+        return ((when.weekday() in window['days'] and minute >= window['start'])
+                or ((when.weekday() - 1) % 7 in window['days'] and minute < window['end']))
+
+    def window_at(self, when):
+        return next((window for window in self.windows if self.covers(window, when)), None)
+
+    def allows(self, window, job_class):
+        return window is None or window['classes'] is None or job_class in window['classes']
+
+    def next_opening(self, job_class, now=None):
+        """When job_class may next start (now if it may start now), or None if no window in the next week allows it"""
+        now = now or datetime.datetime.now()
+        if self.allows(self.window_at(now), job_class):
+            return now
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Which windows are in force only changes where one starts or ends
+        boundaries = sorted({today + datetime.timedelta(days=day, minutes=minute)
+                             for window in self.windows for day in range(-1, 8)
+                             for minute in (window['start'], window['end'])})
+        return next((when for when in boundaries
+                     if when > now and self.allows(self.window_at(when), job_class)), None)
+
+    def configure(self, windows):
+        """Use these windows (as in the schedule setting) from now on; raises ValueError on a bad one"""
+        self.windows = self.parse(windows)
+        self.tick(force=True)
+
+    def start(self):
+        self.tick(force=True)
+
+    def stop(self):
+        self.timer.stop()
+
+    def tick(self, force=False):
+        """Apply the window in force now if it changed, then wait for the next minute"""
+        now = datetime.datetime.now()
+        window = self.window_at(now)
+        if force or window != self.active:
+            self._apply(window)
+        if self.windows:
+            self.timer.start(int((60 - now.second - now.microsecond / 1e6) * 1000) + 50)
+        else:
+            self.timer.stop()
+
+    def _apply(self, window):
+        previous, self.active = self.active, window
+        if window is None:
+            self.manager.set_schedule()
+        else:
+            self.manager.set_schedule(window['max_concurrent'], window['rate_limit'], window['classes'])
+        metrics = MetricsRegistry.instance()
+        if previous is not None and previous is not window:
+            metrics.set('mediadl_schedule_window', 0, window=previous['name'])
+        if window is not None:
+            metrics.set('mediadl_schedule_window', 1, window=window['name'])
+        metrics.set('mediadl_bandwidth_limit_bytes', (window or {}).get('rate_limit') or 0)
+        if window != previous:
+            log.info("Schedule: %s", self.describe(window))
+            self.window_changed.emit(window)
+
+    @staticmethod
+    def describe(window):
+        """One line for the window's limits, for the log and the status bar"""
+        if window is None:
+            return "no schedule window, nothing limited"
+        limits = []
+        if window['max_concurrent'] is not None:
+            limits.append(f"{window['max_concurrent']} download(s) at a time")
+        if window['rate_limit']:
+            limits.append(f"{format_bytes(window['rate_limit'])}/s")
+        if window['classes'] is not None:
+            limits.append(f"{' and '.join(window['classes']) or 'no'} jobs only")
+        return f"{window['name']} - {', '.join(limits) or 'nothing limited'}"
+
+    def summary(self):
+        """The window in force and when held bulk jobs may start, for the job API"""
+        manager = self.manager
+        opens = self.next_opening('bulk') if not manager.class_allowed('bulk') else None
+        return {
+            'window': self.active['name'] if self.active else None,
+            'max_concurrent': manager.concurrency_limit(),
+            'bandwidth_kib': round(manager.rate_limit / 1024) if manager.rate_limit else None,
+            'classes': list(DownloadManager.JOB_CLASSES if manager.allowed_classes is None else manager.allowed_classes),
+            'held': sum(1 for job in manager.download_queue if manager.is_held(job)),
+            'bulk_opens_at': opens.isoformat(timespec='minutes') if opens else None,
+        }
+
+# --- Shared Job Queue ---
+class SharedJobQueue:
+    """A download backlog several machines work through together, in one SQLite file.
+
+    Put the file on a volume every node can reach. A node leases jobs for
+    lease_seconds and renews the lease with heartbeats while it works on them;
+    a lease that runs out (the node crashed or lost the volume) goes back to
+    whoever leases next. Every lease bumps the job's lease token, so a node
+    whose lease was taken over finds out at its next heartbeat and stops.
+    Finished jobs move to the archive table, which is also how a URL that was
+    already downloaded by any node is kept out of the queue.
+
+    The journal stays in rollback mode: WAL needs shared memory, which network
+    file systems don't provide. Lease times are wall-clock, so nodes' clocks
+    must agree to well within lease_seconds.
+    """
+
+    MAX_LEASES = 5  # A job whose lease ran out this many times fails instead of taking down more nodes
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            download_type TEXT NOT NULL,
+            options TEXT NOT NULL DEFAULT '{}',
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            node TEXT,
+            lease_token INTEGER NOT NULL DEFAULT 0,
+            lease_expires REAL,
+            leases INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            submitted_by TEXT,
+            submitted_at REAL,
+            UNIQUE (url, download_type)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, priority DESC, id);
+        CREATE TABLE IF NOT EXISTS archive (
+            url TEXT NOT NULL,
+            download_type TEXT NOT NULL,
+            title TEXT,
+            filename TEXT,
+            bytes INTEGER,
+            node TEXT,
+            finished_at REAL,
+            PRIMARY KEY (url, download_type)
+        );
+    """
+
+    def __init__(self, path, node=None, lease_seconds=60.0):
+        self.path = path
+        self.node = node or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            # Autocommit; writes take the database lock up front with BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def submit(self, urls, download_type, options=None, priority=0):
+        """Add URLs to the backlog; returns how many were new.
+
+        URLs already queued or in the archive are skipped; ones that failed
+        before are queued again.
+        """
+        options = json.dumps(options or {})
+        now = time.time()
+        added = 0
+        with self._transaction() as db:
+            for url in urls:
+                if db.execute("SELECT 1 FROM archive WHERE url = ? AND download_type = ?",
+                              (url, download_type)).fetchone():
+                    continue
+                cursor = db.execute(
+                    "INSERT INTO jobs (url, download_type, options, priority, submitted_by, submitted_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (url, download_type) DO UPDATE SET status = 'queued', options = excluded.options, "
+                    "priority = excluded.priority, error = NULL, leases = 0 WHERE status = 'failed'",
+                    (url, download_type, options, priority, self.node, now))
+                added += cursor.rowcount
+        return added
+
+    def lease(self, count):
+        """Take up to count jobs, highest priority first, including ones whose lease ran out.
+
+        Returns (jobs, remaining): job dicts with the lease token to hand back,
+        and how many jobs are still waiting for a node.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = 'failed', node = NULL, error = 'Lease expired ' || leases || ' times' "
+                       "WHERE status = 'leased' AND lease_expires < ? AND leases >= ?", (now, self.MAX_LEASES))
+            rows = db.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY priority DESC, id LIMIT ?", (now, count)).fetchall() if count > 0 else []
+            jobs = []
+            for row in rows:
+                db.execute("UPDATE jobs SET status = 'leased', node = ?, lease_token = lease_token + 1, "
+                           "lease_expires = ?, leases = leases + 1 WHERE id = ?",
+                           (self.node, now + self.lease_seconds, row['id']))
+                jobs.append({'id': row['id'], 'url': row['url'], 'download_type': row['download_type'],
+                             'options': json.loads(row['options']), 'priority': row['priority'],
+                             'token': row['lease_token'] + 1, 'reassigned': row['status'] == 'leased'})
+            remaining = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' "
+                                   "OR (status = 'leased' AND lease_expires < ?)", (now,)).fetchone()[0]
+        metrics = MetricsRegistry.instance()
+        reassigned = sum(job['reassigned'] for job in jobs)
+        if reassigned:
+            metrics.inc('mediadl_shared_jobs_total', reassigned, event='reassigned')
+        if len(jobs) > reassigned:
+            metrics.inc('mediadl_shared_jobs_total', len(jobs) - reassigned, event='leased')
+        return jobs, remaining
+
+    def heartbeat(self, leases):
+        """Renew (id, token) leases; returns the ids this node no longer holds"""
+        if not leases:
+            return []
+        expires = time.time() + self.lease_seconds
+        lost = []
+        with self._transaction() as db:
+            for job_id, token in leases:
+                cursor = db.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_token = ? "
+                                    "AND node = ? AND status = 'leased'", (expires, job_id, token, self.node))
+                if not cursor.rowcount:
+                    lost.append(job_id)
+        return lost
+
+    def complete(self, job_id, token, url, download_type, title=None, filename=None, size=None):
+        """Move a downloaded job to the archive"""
+        with self._transaction() as db:
+            held = db.execute("SELECT 1 FROM jobs WHERE id = ? AND lease_token = ?", (job_id, token)).fetchone()
+            # Deleted even if the lease moved on, so the node that took it over stops at its next heartbeat
+            db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            db.execute("INSERT OR REPLACE INTO archive (url, download_type, title, filename, bytes, node, finished_at) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (url, download_type, title, filename, size, self.node, time.time()))
+        MetricsRegistry.instance().inc('mediadl_shared_jobs_total', event='completed')
+        return held is not None
+
+    def fail(self, job_id, token, error):
+        """Record that a leased job failed for good on this node"""
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET status = 'failed', node = NULL, lease_expires = NULL, error = ? "
+                       "WHERE id = ? AND lease_token = ?", (str(error), job_id, token))
+        MetricsRegistry.instance().inc('mediadl_shared_jobs_total', event='failed')
+
+    def release(self, leases):
+        """Give (id, token) leases back unfinished, so another node can take them now"""
+        if not leases:
+            return
+        with self._transaction() as db:
+            for job_id, token in leases:
+                db.execute("UPDATE jobs SET status = 'queued', node = NULL, lease_expires = NULL, "
+                           "leases = MAX(leases - 1, 0) WHERE id = ? AND lease_token = ? AND node = ?",
+                           (job_id, token, self.node))
+
+    def counts(self):
+        """Jobs per status, plus 'archived'"""
+        connection = self._connect()
+        counts = dict(connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        counts['archived'] = connection.execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+        return counts
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SharedQueueFeeder(QObject):
+    """Keeps a DownloadManager supplied with jobs leased from a SharedJobQueue.
+
+    The feeder leases enough jobs to fill the manager's slots plus `buffer`
+    more, adds them with add_download like any other job, and reports each
+    outcome back: finished jobs go to the archive, failed ones are marked
+    failed, cancelled ones are released for another node. Retries stay local
+    and keep the lease. All database work runs on one background thread, so a
+    slow shared volume never blocks the event loop; results come back through
+    queued signals.
+    """
+
+    jobs_leased = pyqtSignal(int)  # number of jobs just added to the manager
+    _leased = pyqtSignal(object)  # (jobs, remaining) from the database thread
+    _lost = pyqtSignal(object)  # ids whose lease another node took over
+
+    def __init__(self, shared_queue, download_manager, downloader, settings=None, buffer=1,
+                 poll_interval=5.0, parent=None):
+        super().__init__(parent)
+        self.queue = shared_queue
+        self.manager = download_manager
+        self.downloader = downloader
+        self.settings = settings or {}
+        self.buffer = buffer  # Leased jobs waiting locally beyond the free slots
+        self.remaining = 0  # Jobs waiting for any node, as of the last lease
+        self._leases = {}  # local job id -> (shared id, lease token)
+        self._leasing = False
+        self.paused = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shared-queue')
+        self._leased.connect(self._add_leased)
+        self._lost.connect(self._drop_lost)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(int(poll_interval * 1000))
+        self.poll_timer.timeout.connect(self.poll)
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(int(shared_queue.lease_seconds * 1000 / 3))
+        self.heartbeat_timer.timeout.connect(self.heartbeat)
+        download_manager.job_finished.connect(self._on_job_finished)
+        download_manager.job_failed.connect(self._on_job_failed)
+        download_manager.job_cancelled.connect(self._on_job_cancelled)
+
+    def start(self):
+        self.poll_timer.start()
+        self.heartbeat_timer.start()
+        self.poll()
+
+    def stop(self):
+        """Stop leasing and give back the jobs this node hasn't finished"""
+        self.poll_timer.stop()
+        self.heartbeat_timer.stop()
+        self.release_all()
+        self._run(self.queue.close)
+        self._executor.shutdown(wait=True)
+
+    def pause(self):
+        """Stop taking jobs and give back the ones leased here, until the next submit"""
+        self.paused = True
+        self.poll_timer.stop()
+        self.release_all()
+
+    def has_work(self):
+        """Jobs are leased here or still waiting in the shared queue"""
+        return bool(self._leases) or self.remaining > 0
+
+    def _run(self, function, *args, on_result=None):
+        """Call function on the database thread; on_result runs there too"""
+        def call():
+            try:
+                result = function(*args)
+            except (sqlite3.Error, OSError) as e:
+                log.warning("Shared queue %s: %s failed: %s", self.queue.path, function.__name__, e)
+                result = None
+            if on_result is not None:
+                on_result(result)
+        return self._executor.submit(call)
+
+    def submit(self, urls, download_type, options=None, priority=0):
+        options = {key: value for key, value in (options or {}).items() if key in DeadLetterQueue.OPTION_KEYS}
+
+        def submitted(added):
+            if added is not None:
+                log.info("Added %d of %d URL(s) to the shared queue", added, len(urls))
+        self._run(self.queue.submit, urls, download_type, options, priority, on_result=submitted)
+        if self.paused:
+            self.paused = False
+            self.poll_timer.start()
+        self.poll()
+
+    def poll(self):
+        """Lease jobs for the slots that are free now"""
+        wanted = self.manager.concurrency_limit() + self.buffer - len(self._leases)
+        if self._leasing or self.paused or wanted <= 0:
+            return
+        self._leasing = True
+        self._run(self.queue.lease, wanted, on_result=self._leased.emit)
+
+    def _add_leased(self, result):
+        self._leasing = False
+        if result is None:
+            return
+        jobs, self.remaining = result
+        if self.paused:
+            self._run(self.queue.release, [(shared['id'], shared['token']) for shared in jobs])
+            return
+        for shared in jobs:
+            job_id = self.manager.add_download(self.downloader.spawn(), shared['url'], shared['download_type'],
+                                               dict(self.settings, **shared['options']), priority=shared['priority'])
+            self.manager.get_job(job_id)['shared_id'] = shared['id']
+            self._leases[job_id] = (shared['id'], shared['token'])
+        if jobs:
+            log.info("Leased %d job(s) from the shared queue, %d waiting", len(jobs), self.remaining)
+            self.jobs_leased.emit(len(jobs))
+            self.manager.pump()
+
+    def heartbeat(self):
+        if self._leases:
+            self._run(self.queue.heartbeat, list(self._leases.values()), on_result=self._lost.emit)
+
+    def _drop_lost(self, lost):
+        for shared_id in lost or []:
+            job_id = next((job_id for job_id, lease in self._leases.items() if lease[0] == shared_id), None)
+            if job_id is None:
+                continue  # Finished while the heartbeat was in flight
+            del self._leases[job_id]
+            MetricsRegistry.instance().inc('mediadl_shared_jobs_total', event='lost')
+            log.warning("Lease on shared job %d was taken over by another node; stopping it here", shared_id)
+            self.manager.cancel_job(job_id)
+
+    def release_all(self):
+        leases, self._leases = list(self._leases.values()), {}
+        self._run(self.queue.release, leases)
+
+    def _on_job_finished(self, job_id, message):
+        lease = self._leases.pop(job_id, None)
+        if lease is None:
+            return
+        job = self.manager.get_job(job_id)
+        if job is None:
+            return
+        filename = job.get('filename')
+        title = os.path.splitext(os.path.basename(filename))[0] if filename else None
+        self._run(self.queue.complete, *lease, job['url'], job['download_type'], title, filename, job['trace'].bytes)
+        self.poll()
+
+    def _on_job_failed(self, job_id, message):
+        lease = self._leases.pop(job_id, None)
+        if lease is None:
+            return
+        job = self.manager.get_job(job_id)
+        if job is None or job['status'] == 'cancelled':
+            self._run(self.queue.release, [lease])
+        else:
+            error = job.get('error')
+            self._run(self.queue.fail, *lease, error['category'] if error else message)
+        self.poll()
+
+    def _on_job_cancelled(self, job_id):
+        lease = self._leases.pop(job_id, None)
+        if lease is not None:
+            self._run(self.queue.release, [lease])  # The next poll refills the buffer
+
+# --- URL Ingestion ---
+def read_url_records(f, kind='text', default_type='video', header=None, default_priority=0):
+    """Yield (offset, record) for each URL line of a binary file, from its current position.
+
+    offset is the byte position just past the line, so reading can resume
+    there. kind is 'text' (one URL per line, # comments), 'csv' (url, type
+    and priority columns by header name, or in that order without a header) or
+    'jsonl' ({"url": ..., "type": ..., "priority": ...} per line). Lines that
+    aren't a URL yield a record of None. Pass the CSV header when starting
+    past the first line.
+    """
+    first = f.tell() == 0
+    offset = f.tell()
+    for raw in f:
+        offset += len(raw)
+        line = raw.decode('utf-8', errors='replace').strip()
+        if not line or line.startswith('#'):
+            continue
+        record = None
+        if kind == 'jsonl':
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if isinstance(record, str):
+                record = {'url': record}
+            elif not isinstance(record, dict):
+                record = None
+        elif kind == 'csv':
+            cells = next(csv.reader([line]))
+            if first and csv_header(cells):
+                header = csv_header(cells)
+                first = False
+                continue
+            first = False
+            record = dict(zip(header or CSV_COLUMNS, (cell.strip() for cell in cells)))
+        else:
+            record = {'url': line}
+        url = str(record.get('url') or '').strip() if record else ''
+        if '://' not in url:
+            yield offset, None
+            continue
+        try:
+            priority = int(record['priority']) if record.get('priority') not in (None, '') else default_priority
+        except (TypeError, ValueError):
+            priority = default_priority
+        yield offset, {'url': url, 'type': record.get('type') or default_type, 'priority': priority}
+
+
+CSV_COLUMNS = ('url', 'type', 'priority')  # Column order when a CSV file has no header
+
+
+def csv_header(cells):
+    """Lower-cased column names if cells look like a header row with a url column, else None"""
+    names = [cell.strip().lower() for cell in cells]
+    return names if 'url' in names and not any('://' in cell for cell in cells) else None
+
+
+class UrlIngestor(QObject):
+    """Streams URL lists from files and a watched inbox folder into the download manager.
+
+    Files are read a slice at a time on the event loop, only while fewer than
+    queue_depth jobs are waiting, so a list of any length starts downloading
+    at once and never sits in memory whole. Each URL is deduplicated against
+    everything ingested this session by a short hash of the URL and type.
+    The checkpoint for a file is the offset below which every line's job is
+    done, saved to checkpoint_path, so an interrupted file resumes without
+    skipping queued lines or downloading finished ones twice.
+
+    Files dropped into the inbox are read once their size stops changing,
+    then moved to inbox/done (or inbox/cancelled).
+    """
+
+    KINDS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+    TYPES = ('video', 'audio', 'playlist')
+    SLICE_SECONDS = 0.02  # Longest a fill may hold the event loop
+    SCAN_INTERVAL = 2.0  # Inbox scan, in seconds
+
+    jobs_added = pyqtSignal(int)
+    source_finished = pyqtSignal(str, int)  # path, jobs queued from it
+
+    def __init__(self, download_manager, downloader, settings=None, checkpoint_path=None, queue_depth=100,
+                 parent=None):
+        super().__init__(parent)
+        self.manager = download_manager
+        self.downloader = downloader
+        self.settings = settings if settings is not None else {}
+        self.checkpoint_path = checkpoint_path
+        self.queue_depth = queue_depth
+        self.shared_feeder = None  # Lines go to the shared queue when set
+        self.inbox = None
+        self._sources = deque()  # Files being read, oldest first
+        self._seen = set()  # 8-byte digests of (type, url) already ingested
+        self._pending = {}  # local job id -> source waiting for it
+        self._checkpoints = self._load_checkpoints()
+        self._inbox_sizes = {}  # path -> size at the last scan
+        self._dirty = False
+        self.fill_timer = QTimer(self)  # Coalesces fill requests into one slice per event-loop turn
+        self.fill_timer.setSingleShot(True)
+        self.fill_timer.setInterval(0)
+        self.fill_timer.timeout.connect(self.fill)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(2000)
+        self.save_timer.timeout.connect(self.save_checkpoints)
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setInterval(int(self.SCAN_INTERVAL * 1000))
+        self.scan_timer.timeout.connect(self.scan_inbox)
+        download_manager.job_started.connect(lambda job_id: self.fill_timer.start())
+        download_manager.queue_drained.connect(self.fill_timer.start)  # Also after queued jobs are cancelled
+        download_manager.job_finished.connect(lambda job_id, message: self._job_done(job_id))
+        download_manager.job_failed.connect(lambda job_id, message: self._job_done(job_id))
+        download_manager.job_cancelled.connect(self._job_done)
+
+    # Sources
+    def add_file(self, path, download_type='video', priority=0):
+        """Queue the URLs in a text, CSV or JSONL file, resuming from its checkpoint.
+
+        priority applies to lines that don't give their own; below 0 makes
+        them bulk jobs, which a schedule window can hold back.
+        """
+        path = os.path.abspath(path)
+        if any(source['path'] == path for source in self._sources):
+            return False
+        try:
+            f = open(path, 'rb')
+        except OSError as e:
+            log.warning("Could not open URL list %s: %s", path, e)
+            return False
+        checkpoint = self._checkpoints.get(path)
+        size = os.fstat(f.fileno()).st_size
+        offset = checkpoint['offset'] if checkpoint and checkpoint['offset'] <= size else 0  # Smaller: replaced
+        kind = self.KINDS.get(os.path.splitext(path)[1].lower(), 'text')
+        header = None
+        if kind == 'csv' and offset:
+            header = csv_header(next(csv.reader([f.readline().decode('utf-8', errors='replace')]), []))
+        f.seek(offset)
+        self._sources.append({
+            'path': path, 'file': f, 'records': read_url_records(f, kind, download_type, header, priority),
+            'read_offset': offset, 'lines': deque(),  # (offset after line, job id or None) in read order
+            'committed': offset, 'queued': 0, 'eof': False,
+        })
+        self._checkpoints[path] = {'offset': offset, 'type': download_type, 'priority': priority}
+        self._mark_dirty()
+        log.info("Reading URLs from %s%s", path, f" from byte {offset}" if offset else "")
+        self.fill_timer.start()
+        return True
+
+    def add_text(self, text, download_type='video'):
+        """Queue pasted URLs through a file in the data folder, so they are checkpointed like any list"""
+        folder = get_data_path('pasted')
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, datetime.datetime.now().strftime('pasted-%Y%m%d-%H%M%S-%f.txt'))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return self.add_file(path, download_type)
+
+    def watch(self, folder):
+        """Read every file dropped into folder (None stops watching)"""
+        self.inbox = os.path.abspath(folder) if folder else None
+        if self.inbox is None:
+            self.scan_timer.stop()
+            return
+        os.makedirs(self.inbox, exist_ok=True)
+        self.scan_timer.start()
+        self.scan_inbox()
+
+    def resume(self):
+        """Carry on with files an earlier run didn't finish"""
+        for path, checkpoint in list(self._checkpoints.items()):
+            if os.path.exists(path):
+                self.add_file(path, checkpoint.get('type', 'video'), checkpoint.get('priority', 0))
+            else:
+                del self._checkpoints[path]
+                self._mark_dirty()
+
+    def scan_inbox(self):
+        if self.inbox is None:
+            return
+        try:
+            names = sorted(os.listdir(self.inbox))
+        except OSError as e:
+            log.warning("Could not read inbox %s: %s", self.inbox, e)
+            return
+        reading = {source['path'] for source in self._sources}
+        sizes = {}
+        for name in names:
+            path = os.path.join(self.inbox, name)
+            if name.startswith('.') or name.endswith(('.tmp', '.part')) or not os.path.isfile(path) or path in reading:
+                continue
+            sizes[path] = os.path.getsize(path)
+            if self._inbox_sizes.get(path) == sizes[path]:  # Unchanged since the last scan: fully written
+                self.add_file(path)
+        self._inbox_sizes = sizes
+
+    def has_work(self):
+        return bool(self._sources)
+
+    def cancel(self):
+        """Stop reading every file and forget their checkpoints"""
+        for source in list(self._sources):
+            self._close(source, 'cancelled')
+        self._pending.clear()
+
+    # Reading
+    def fill(self):
+        """Queue lines until queue_depth jobs wait or the time slice is used up"""
+        deadline = time.perf_counter() + self.SLICE_SECONDS
+        added = 0
+        batch = []  # For the shared queue: (type, priority) -> urls
+        while self._sources and time.perf_counter() < deadline:
+            if self.shared_feeder is None and self.manager.queued_count() >= self.queue_depth:
+                break
+            source = next((source for source in self._sources if not source['eof']), None)
+            if source is None:
+                break  # Every file is read; waiting for their last jobs
+            try:
+                offset, record = next(source['records'])
+            except StopIteration:
+                source['eof'] = True
+                source['file'].close()
+                self._advance(source)
+                continue
+            source['read_offset'] = offset
+            outcome = self._queue_record(source, offset, record, batch)
+            MetricsRegistry.instance().inc('mediadl_ingested_total', outcome=outcome)
+            added += outcome == 'queued'
+        if batch:
+            self._submit_shared(batch)
+        if added:
+            self.jobs_added.emit(added)
+            self.manager.pump()
+        more = any(not source['eof'] for source in self._sources)
+        if more and (self.shared_feeder is not None or self.manager.queued_count() < self.queue_depth):
+            self.fill_timer.start()  # Used up the slice; carry on after other events
+
+    def _queue_record(self, source, offset, record, batch):
+        if record is None:
+            source['lines'].append((offset, None))
+            return 'invalid'
+        download_type = record['type'] if record['type'] in self.TYPES else 'video'
+        digest = hashlib.blake2b(f"{download_type} {record['url']}".encode('utf-8'), digest_size=8).digest()
+        if digest in self._seen:
+            source['lines'].append((offset, None))
+            return 'duplicate'
+        self._seen.add(digest)
+        source['queued'] += 1
+        if self.shared_feeder is not None:
+            batch.append((download_type, record['priority'], record['url']))
+            source['lines'].append((offset, None))  # Safe in the shared queue once submitted
+            return 'queued'
+        job_id = self.manager.add_download(self.downloader, record['url'], download_type, self.settings,
+                                           priority=record['priority'])
+        self._pending[job_id] = source
+        source['lines'].append((offset, job_id))
+        return 'queued'
+
+    def _submit_shared(self, batch):
+        groups = {}
+        for download_type, priority, url in batch:
+            groups.setdefault((download_type, priority), []).append(url)
+        for (download_type, priority), urls in groups.items():
+            self.shared_feeder.submit(urls, download_type, self.settings, priority)
+        for source in self._sources:
+            self._advance(source)
+
+    # Checkpoints
+    def _job_done(self, job_id):
+        source = self._pending.pop(job_id, None)
+        if source is not None:
+            self._advance(source)
+
+    def _advance(self, source):
+        """Move the checkpoint past every line whose job is done"""
+        lines = source['lines']
+        while lines and not self._is_pending(lines[0][1]):
+            source['committed'] = lines.popleft()[0]
+        if source['committed'] != self._checkpoints.get(source['path'], {}).get('offset'):
+            self._checkpoints[source['path']]['offset'] = source['committed']
+            self._mark_dirty()
+        if source['eof'] and not lines:
+            self._close(source, 'done')
+            self.fill_timer.start()
+
+    def _is_pending(self, job_id):
+        if job_id is None:
+            return False
+        job = self.manager.get_job(job_id)  # Gone once the registry retires it, i.e. done
+        return job is not None and job['status'] not in JobRegistry.DONE_STATUSES
+
+    def _close(self, source, outcome):
+        if source in self._sources:
+            self._sources.remove(source)
+        source['file'].close()
+        self._checkpoints.pop(source['path'], None)
+        self._mark_dirty()
+        log.info("Finished reading %s: %d URL(s) queued", source['path'], source['queued'])
+        if self.inbox and os.path.dirname(source['path']) == self.inbox:
+            target = os.path.join(self.inbox, outcome)
+            try:
+                os.makedirs(target, exist_ok=True)
+                os.replace(source['path'], os.path.join(target, os.path.basename(source['path'])))
+            except OSError as e:
+                log.warning("Could not move %s to %s: %s", source['path'], target, e)
+        elif os.path.dirname(source['path']) == os.path.abspath(get_data_path('pasted')):
+            try:
+                os.remove(source['path'])
+            except OSError:
+                pass
+        self.source_finished.emit(source['path'], source['queued'])
+
+    def _load_checkpoints(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Could not load ingestion checkpoints from %s: %s", self.checkpoint_path, e)
+            return {}
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+
+    def save_checkpoints(self):
+        """Write the checkpoints now; otherwise a burst of changes is saved once, two seconds later"""
+        if not self._dirty or not self.checkpoint_path:
+            return
+        self._dirty = False
+        try:
+            with open(self.checkpoint_path + ".tmp", "w") as f:
+                json.dump(self._checkpoints, f, indent=2)
+            os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+        except OSError as e:
+            log.warning("Could not save ingestion checkpoints to %s: %s", self.checkpoint_path, e)
+
+# --- Subscriptions ---
+class Subscriptions(QObject):
+    """Channels and playlists checked on a schedule, queuing only entries not seen before.
+
+    Each subscription keeps the ids of its newest entries and its newest
+    upload date. A sync flat-extracts the source and stops at the first run
+    of known entries, so a channel with thousands of videos costs a page or
+    two per check. Syncs run on a small thread pool; each is due interval
+    seconds after the last, moved by up to a tenth either way so a large set
+    doesn't hit the sites all at once. A failed sync is tried again after a
+    growing wait. The first sync queues the newest backfill entries (all of
+    them when None) and remembers the rest as seen.
+    """
+
+    SEEN_LIMIT = 5000  # Entry ids kept per subscription, most recently found first
+    STOP_AFTER = 3  # Known entries in a row that end a sync; one pinned or re-dated entry doesn't
+    JITTER = 0.1
+    TICK_SECONDS = 30.0
+    PRIORITY = -1  # Behind anything pasted or submitted by hand
+    TYPES = ('video', 'audio')
+
+    jobs_added = pyqtSignal(int)
+    sync_finished = pyqtSignal(int, int)  # subscription id, new entries queued (-1: failed)
+    _synced = pyqtSignal(int, object, object)  # subscription id, result, error from a sync thread
+
+    def __init__(self, download_manager, downloader, settings=None, path=None, parent=None):
+        super().__init__(parent)
+        self.manager = download_manager
+        self.downloader = downloader
+        self.settings = settings if settings is not None else {}
+        self.path = path
+        self.shared_feeder = None  # New entries go to the shared queue when set
+        self.interval = 24 * 3600.0  # Default for new subscriptions
+        self.backfill = None
+        self.entries = []  # Oldest subscription first
+        self._ids = itertools.count(1)
+        self._running = {}  # subscription id -> Future of its sync
+        self._downloaders = {}  # output folder -> Downloader, for subscriptions with their own folder
+        self._workers = 4
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='subscription-sync')
+        self._backoff = RetryPolicy(base_delay=300.0, max_delay=6 * 3600.0)
+        self._synced.connect(self._sync_done)
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(self.TICK_SECONDS * 1000))
+        self.timer.timeout.connect(self.tick)
+        self.save_timer = QTimer(self)  # A burst of syncs is saved once
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(2000)
+        self.save_timer.timeout.connect(self.save)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set_concurrency(self, workers):
+        """How many subscriptions sync at once; syncs already started finish on the old pool"""
+        workers = max(1, int(workers))
+        if workers != self._workers:
+            old, self._workers = self._executor, workers
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='subscription-sync')
+            old.shutdown(wait=False)
+
+    def start(self):
+        self.timer.start()
+        QTimer.singleShot(0, self.tick)
+
+    def stop(self):
+        self.timer.stop()
+        for future in self._running.values():
+            future.cancel()  # Every sync is in _running; shutdown(cancel_futures=True) needs Python 3.9
+        self._executor.shutdown(wait=False)
+        self.save()
+
+    # Subscriptions
+    def get(self, subscription_id):
+        return next((entry for entry in self.entries if entry['id'] == subscription_id), None)
+
+    def add(self, url, download_type='video', interval=None, backfill=None, output_path=None, options=None):
+        """Subscribe to a channel or playlist URL; the first sync runs on the next tick"""
+        url = url.strip()
+        existing = next((entry for entry in self.entries
+                         if entry['url'] == url and entry['download_type'] == download_type), None)
+        if existing is not None:
+            return existing
+        entry = {
+            'id': next(self._ids), 'url': url, 'title': url, 'download_type': download_type,
+            'interval': float(interval or self.interval),
+            'backfill': backfill if backfill is not None else self.backfill,
+            'output_path': output_path,
+            'options': {key: value for key, value in (options or {}).items() if key in DeadLetterQueue.OPTION_KEYS},
+            'seen': [], 'last_upload_date': None, 'entry_count': None, 'synced': False,
+            'last_sync': None, 'next_sync': 0.0, 'last_new': 0, 'new_total': 0, 'failures': 0, 'error': None,
+            'added_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.entries.append(entry)
+        self._mark_dirty()
+        QTimer.singleShot(0, self.tick)
+        return entry
+
+    def remove(self, subscription_ids):
+        ids = set(subscription_ids)
+        for subscription_id in ids:
+            future = self._running.pop(subscription_id, None)
+            if future is not None:
+                future.cancel()
+        self.entries = [entry for entry in self.entries if entry['id'] not in ids]
+        self._mark_dirty()
+
+    def sync_now(self, subscription_ids=None):
+        """Make subscriptions due now (all of them when None)"""
+        for entry in self.entries:
+            if subscription_ids is None or entry['id'] in subscription_ids:
+                entry['next_sync'] = 0.0
+        self.tick()
+
+    def has_work(self):
+        return bool(self._running)
+
+    def is_syncing(self, subscription_id):
+        return subscription_id in self._running
+
+    def due(self):
+        now = time.time()
+        return [entry for entry in self.entries if entry['next_sync'] <= now and entry['id'] not in self._running]
+
+    # Syncing
+    def tick(self):
+        """Start the syncs that are due"""
+        for entry in self.due():
+            since = entry['last_upload_date'] if entry['synced'] else None
+            self._running[entry['id']] = self._executor.submit(
+                self._sync, entry['id'], entry['url'], list(entry['seen']), since, entry['entry_count'])
+
+    def _sync(self, subscription_id, url, known, since, entry_count):
+        """Runs on a sync thread; the result goes back to the Qt thread through _synced"""
+        started = time.monotonic()
+        try:
+            downloader = self.downloader.spawn()
+            info, new, scanned = downloader.extract_new_entries(url, known, since, self.STOP_AFTER)
+            count = info.get('playlist_count')
+            if not new and known and count and entry_count and count > entry_count:
+                # Grew, yet nothing new at the top: a playlist that adds at the end, so read all of it
+                info, new, more = downloader.extract_new_entries(url, known, None, None)
+                scanned += more
+            result = {'title': info.get('title') or info.get('uploader') or url, 'new': new, 'scanned': scanned,
+                      'count': info.get('playlist_count'), 'seconds': time.monotonic() - started}
+            self._synced.emit(subscription_id, result, None)
+        except Exception as e:
+            self._synced.emit(subscription_id, None, e)
+
+    def _sync_done(self, subscription_id, result, error):
+        self._running.pop(subscription_id, None)
+        entry = self.get(subscription_id)
+        if entry is None:
+            return  # Removed while syncing
+        entry['last_sync'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if error is not None:
+            entry['failures'] += 1
+            entry['error'] = str(error)
+            entry['next_sync'] = time.time() + min(entry['interval'], self._backoff.delay(entry['failures'] - 1))
+            MetricsRegistry.instance().inc('mediadl_subscription_syncs_total', outcome='failed')
+            log.warning("Sync of %s failed: %s", entry['url'], error)
+            self._mark_dirty()
+            self.sync_finished.emit(subscription_id, -1)
+            return
+        new = result['new']
+        queued = new
+        if not entry['synced'] and entry['backfill'] is not None:
+            queued = new[:max(0, int(entry['backfill']))]  # Source order is newest first for channels
+        entry.update({
+            'title': result['title'], 'synced': True, 'failures': 0, 'error': None,
+            'seen': ([item['id'] for item in new] + entry['seen'])[:self.SEEN_LIMIT],
+            'last_new': len(queued), 'new_total': entry['new_total'] + len(queued),
+            'entry_count': result['count'] or entry['entry_count'],
+            'next_sync': time.time() + entry['interval'] * (1 + random.uniform(-self.JITTER, self.JITTER)),
+        })
+        dates = [item['upload_date'] for item in new if item['upload_date']]
+        if dates:
+            entry['last_upload_date'] = max(dates + [entry['last_upload_date'] or ''])
+        self._queue(entry, queued)
+        registry = MetricsRegistry.instance()
+        registry.inc('mediadl_subscription_syncs_total', outcome='new' if queued else 'unchanged')
+        registry.inc('mediadl_subscription_entries_total', result['scanned'], outcome='read')
+        registry.inc('mediadl_subscription_entries_total', len(queued), outcome='queued')
+        registry.observe('mediadl_subscription_sync_seconds', result['seconds'])
+        log.info("Synced %s: %d new of %d read in %.1fs", entry['url'], len(queued), result['scanned'],
+                 result['seconds'])
+        self._mark_dirty()
+        self.sync_finished.emit(subscription_id, len(queued))
+
+    def _queue(self, entry, items):
+        """Queue new entries oldest first, so a mirror fills in upload order"""
+        if not items:
+            return
+        settings = dict(self.settings, **entry['options'])
+        urls = [item['url'] for item in reversed(items)]
+        if self.shared_feeder is not None:
+            self.shared_feeder.submit(urls, entry['download_type'], settings, self.PRIORITY)
+            return
+        downloader = self._downloader_for(entry.get('output_path'))
+        for url in urls:
+            self.manager.add_download(downloader, url, entry['download_type'], settings, priority=self.PRIORITY)
+        self.jobs_added.emit(len(urls))
+        self.manager.pump()
+
+    def _downloader_for(self, output_path):
+        if not output_path or output_path == self.downloader.output_path:
+            return self.downloader
+        downloader = self._downloaders.get(output_path)
+        if downloader is None:
+            downloader = self._downloaders[output_path] = Downloader(output_path)
+            downloader.proxy_pool = self.downloader.proxy_pool
+        return downloader
+
+    # Persistence
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("Could not load subscriptions from %s: %s", self.path, e)
+            return
+        self._ids = itertools.count(max((entry['id'] for entry in self.entries), default=0) + 1)
+
+    def _mark_dirty(self):
+        if not self.save_timer.isActive():
+            self.save_timer.start()
+
+    def save(self):
+        self.save_timer.stop()
+        if not self.path:
+            return
+        try:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            log.warning("Could not save subscriptions to %s: %s", self.path, e)
+
+# --- Profiling ---
+class Profiler:
+    """Opt-in profiling of download workers and the GUI thread.
+
+    cprofile - every job's worker runs under cProfile and writes job-<id>.pstats;
+               the GUI thread is profiled for the whole session into gui.pstats
+    sample   - a background thread samples the stacks of the GUI thread and every
+               worker `rate` times a second and writes collapsed stacks per job
+               (job-<id>.collapsed, gui.collapsed) for flamegraph.pl or speedscope
+
+    Either way summary.txt lists the hottest functions when profiling stops.
+    Python 3.12+ allows only one active cProfile, which then sees every thread:
+    there, gui.pstats covers the workers too and no per-job files are written.
+    """
+
+    MODES = ('off', 'cprofile', 'sample')
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.mode = 'off'
+        self.output_dir = 'profiles'
+        self.rate = 100
+        self.top = 25
+        self._written = []  # Files written this session, for the summary
+        self._names = {}  # thread ident -> profile name, for the sampler
+        self._samples = {}  # profile name -> {collapsed stack: count}
+        self._gui_profile = None
+        self._sampler = None
+        self._stop_event = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """Get the shared profiler, creating it on first use"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def start(self, mode, output_dir=None, rate=None):
+        """Begin profiling; call from the GUI thread, which is profiled as 'gui'"""
+        if mode not in self.MODES:
+            log.warning("Unknown profile mode %r; expected one of %s", mode, ', '.join(self.MODES))
+            mode = 'off'
+        self.stop()
+        self.mode = mode
+        self.output_dir = output_dir or self.output_dir
+        self.rate = rate or self.rate
+        if not self.enabled:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._written = []
+        if mode == 'cprofile':
+            self._gui_profile = cProfile.Profile()
+            self._gui_profile.enable()
+        else:
+            self._names[threading.get_ident()] = 'gui'
+            self._stop_event = threading.Event()
+            self._sampler = threading.Thread(target=self._sample_loop, args=(self._stop_event,),
+                                             name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        """Write the GUI thread's profile and the summary, and stop collecting"""
+        if not self.enabled:
+            return
+        if self._gui_profile is not None:
+            self._gui_profile.disable()
+            self._dump_pstats(self._gui_profile, 'gui')
+            self._gui_profile = None
+        if self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+            self._dump_collapsed('gui')
+        path = self.write_summary()
+        log.info("Profiles written to %s; hottest functions in %s", self.output_dir, path)
+        self.mode = 'off'
+
+    @contextmanager
+    def profile_job(self, name):
+        """Profile the calling worker thread for the duration of a job"""
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                yield  # Another profiler is active (Python 3.12+); it already covers this thread
+                return
+            try:
+                yield
+            finally:
+                profile.disable()
+                self._dump_pstats(profile, name)
+        elif self.mode == 'sample':
+            ident = threading.get_ident()
+            with self._lock:
+                self._names[ident] = name
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._names.pop(ident, None)
+                self._dump_collapsed(name)
+        else:
+            yield
+
+    def _unique_path(self, name, extension):
+        # A preempted job runs again; keep each run's profile
+        path = os.path.join(self.output_dir, f"{name}{extension}")
+        run = 2
+        while os.path.exists(path) and path in self._written:
+            path = os.path.join(self.output_dir, f"{name}-run{run}{extension}")
+            run += 1
+        return path
+
+    def _dump_pstats(self, profile, name):
+        with self._lock:
+            path = self._unique_path(name, '.pstats')
+            self._written.append(path)
+        profile.dump_stats(path)
+
+    def _sample_loop(self, stop_event):
+        interval = 1.0 / self.rate
+        while not stop_event.wait(interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, name in self._names.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                        frame = frame.f_back
+                    collapsed = ';'.join(reversed(stack))
+                    counts = self._samples.setdefault(name, {})
+                    counts[collapsed] = counts.get(collapsed, 0) + 1
+
+    def _dump_collapsed(self, name):
+        with self._lock:
+            counts = self._samples.pop(name, None)
+            if not counts:
+                return
+            path = self._unique_path(name, '.collapsed')
+            self._written.append(path)
+        with open(path, 'w') as f:
+            for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+    def write_summary(self):
+        """Top functions across everything written this session, to summary.txt"""
+        path = os.path.join(self.output_dir, 'summary.txt')
+        pstats_files = [f for f in self._written if f.endswith('.pstats')]
+        collapsed_files = [f for f in self._written if f.endswith('.collapsed')]
+        with open(path, 'w') as out:
+            out.write(f"Profile summary ({self.mode}), {len(self._written)} file(s)\n\n")
+            if pstats_files:
+                stats = pstats.Stats(*pstats_files, stream=out)
+                stats.sort_stats('tottime').print_stats(self.top)
+                stats.sort_stats('cumulative').print_stats(self.top)
+            if collapsed_files:
+                self_samples = {}
+                total_samples = {}
+                total = 0
+                for collapsed_file in collapsed_files:
+                    with open(collapsed_file) as f:
+                        for line in f:
+                            stack, _, count = line.rstrip('\n').rpartition(' ')
+                            count = int(count)
+                            frames = stack.split(';')
+                            total += count
+                            self_samples[frames[-1]] = self_samples.get(frames[-1], 0) + count
+                            for frame in set(frames):
+                                total_samples[frame] = total_samples.get(frame, 0) + count
+                for title, table in (("Self time", self_samples), ("Total time", total_samples)):
+                    out.write(f"{title} ({total} samples)\n")
+                    for frame, count in sorted(table.items(), key=lambda item: -item[1])[:self.top]:
+                        out.write(f"{count * 100.0 / total:6.1f}%  {count:>7}  {frame}\n")
+                    out.write("\n")
+        return path
+
+# --- Event Loop Watchdog ---
+class EventLoopWatchdog(QObject):
+    """Measures GUI event-loop latency and reports handlers that block it.
+
+    A timer on the GUI thread beats every `interval_ms`; how late each beat runs
+    is the loop's latency. A monitor thread notices when a beat is overdue by
+    more than `threshold_ms` and captures the GUI thread's stack right then,
+    while the blocking handler is still on it. Once the loop recovers the stall
+    is logged with that stack, counted per handler and kept in `stalls`.
+    """
+
+    stall_detected = pyqtSignal(dict)
+
+    def __init__(self, threshold_ms=250, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.stalls = deque(maxlen=50)  # Most recent stalls, newest last
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+        self._gui_ident = None
+        self._last_beat = 0.0
+        self._captured = None  # (handler, stack) taken by the monitor during the current stall
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._stop_event = None
+
+    @property
+    def running(self):
+        return self._monitor is not None
+
+    def start(self):
+        """Begin watching; call from the GUI thread"""
+        if self.running:
+            return
+        self._gui_ident = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._timer.start()
+        self._stop_event = threading.Event()
+        self._monitor = threading.Thread(target=self._monitor_loop, args=(self._stop_event,),
+                                         name='gui-watchdog', daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._timer.stop()
+        self._stop_event.set()
+        self._monitor.join()
+        self._monitor = None
+
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            late = max(0.0, now - self._last_beat - self.interval)
+            self._last_beat = now
+            captured, self._captured = self._captured, None
+        MetricsRegistry.instance().observe('mediadl_gui_lag_seconds', late)
+        if late < self.threshold:
+            return
+        handler, stack = captured or ('unknown', [])
+        stall = {
+            'handler': handler,
+            'seconds': round(late, 3),
+            'date': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'stack': stack,
+        }
+        self.stalls.append(stall)
+        MetricsRegistry.instance().inc('mediadl_gui_stalls_total', handler=handler)
+        log.warning("GUI thread blocked for %.2fs in %s", late, handler,
+                    extra={'handler': handler, 'stack': ''.join(stack)})
+        self.stall_detected.emit(stall)
+
+    def _monitor_loop(self, stop_event):
+        while not stop_event.wait(self.interval):
+            with self._lock:
+                beat = self._last_beat
+                if self._captured is not None or time.monotonic() - beat - self.interval < self.threshold:
+                    continue
+            frame = sys._current_frames().get(self._gui_ident)
+            if frame is None:
+                continue
+            captured = self.describe(frame)
+            with self._lock:
+                if self._last_beat == beat:  # Still the same stall
+                    self._captured = captured
+
+    @staticmethod
+    def describe(frame):
+        """(handler name, formatted stack) for a frame on the GUI thread.
+
+        The handler is the outermost call made by the event loop; a nested loop
+        (a dialog's exec()) dispatches its own handlers, so the search restarts
+        below each call to exec().
+        """
+        frames = []
+        current = frame
+        while current is not None:
+            frames.append(current)
+            current = current.f_back
+        handler = None
+        for current in reversed(frames):
+            if handler is None and current.f_code.co_name != '<module>':
+                handler = current
+            if '.exec(' in linecache.getline(current.f_code.co_filename, current.f_lineno):
+                handler = None
+        code = (handler or frame).f_code
+        return getattr(code, 'co_qualname', code.co_name), traceback.format_stack(frame)
+
+# --- Threading for UI Responsiveness ---
+class BackgroundTask(QThread):
+    """Runs one blocking call off the GUI thread and reports its result or exception"""
+    result_signal = pyqtSignal(object)  # The call's return value
+    error_signal = pyqtSignal(object)  # The exception it raised
+
+    def __init__(self, function, *args, parent=None):
+        super().__init__(parent)
+        self.function = function
+        self.args = args
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            log.exception("Background task %s failed", getattr(self.function, '__qualname__', self.function))
+            self.error_signal.emit(e)
+        else:
+            self.result_signal.emit(result)
+
+
+class DownloadThread(QThread):
+    progress_signal = pyqtSignal(object) # To send ProgressEvent updates
+    finished_signal = pyqtSignal(str) # To send final status
+    error_signal = pyqtSignal(str) # To send error messages
+
+    def __init__(self, downloader, url, download_type, settings=None, job_id=None, parent=None):
+        super().__init__(parent)
+        self.downloader = downloader
+        self.job_id = job_id
+        self.url = url
+        self.download_type = download_type
+        self.settings = settings or {}
+        # Set the downloader's hook to emit our signal
+        self.downloader.set_progress_hook(self._threaded_progress_hook)
+        self._paused = False
+        # yt-dlp calls the hook for every chunk; only emit this often per job
+        self.progress_interval = 1.0 / max(1, self.settings.get('progress_rate_hz', 10))
+        self._last_emit = 0.0
+
+    def _threaded_progress_hook(self, d):
+        # Handle pause state in the progress hook
+        if d.get('status') == 'paused':
+            # Wait until resumed
+            while self._paused and self.isRunning():
+                self.msleep(100)  # Sleep for 100ms and check again
+            if not self.isRunning():
+                return  # Thread was terminated
+        
+        # Coalesce chunk updates; phase changes (finished, error) always go through
+        phase = d.get('status')
+        now = time.monotonic()
+        if phase in ('downloading', 'paused') and now - self._last_emit < self.progress_interval:
+            return
+        self._last_emit = now
+        self.progress_signal.emit(ProgressEvent.from_hook(self.job_id, d))
+
+    def run(self):
+        with Profiler.instance().profile_job(f"job-{self.job_id}"):
+            self._run_download()
+
+    def _run_download(self):
+        try:
+            result = self.downloader.download_media(self.url, self.download_type, self.settings)
+        except Exception as e:
+            result = self.failure(self.downloader, e)
+        self._report(result)
+
+    @staticmethod
+    def failure(downloader, error):
+        """Classify an exception download_media raised; the download manager reads the result from the downloader"""
+        classified_error = ErrorClassifier.classify_error(error)
+        downloader.last_error = dict(classified_error, detail=str(error))
+        formatted_error = ErrorClassifier.format_error_message(str(error), classified_error)
+        return f"Download failed: {formatted_error}"
+
+    def _report(self, result):
+        # Check if the result indicates a failure
+        if result.startswith("Download failed:"):
+            self.error_signal.emit(result)
+        elif result == "Download cancelled by user":
+            self.error_signal.emit(result)
+        else:
+            self.finished_signal.emit(result)
+
+    def pause(self):
+        """Pause the download"""
+        self._paused = True
+        if hasattr(self.downloader, 'pause'):
+            self.downloader.pause()
+
+    def resume(self):
+        """Resume the download"""
+        self._paused = False
+        if hasattr(self.downloader, 'resume'):
+            self.downloader.resume()
+
+    def cancel(self):
+        """Cancel the download"""
+        self._paused = False
+        if hasattr(self.downloader, 'cancel'):
+            self.downloader.cancel()
+
+    def set_rate_limit(self, rate):
+        """Limit the download to rate bytes per second (None lifts the limit)"""
+        if hasattr(self.downloader, 'set_rate_limit'):
+            self.downloader.set_rate_limit(rate)
+
+# --- Worker Processes ---
+PROGRESS_KEYS = ('status', 'filename', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate', 'speed', 'eta')
+
+
+class _RelayedTrace(JobTrace):
+    """A worker's JobTrace that also sends every phase change to the app, which keeps the job's real trace"""
+
+    def __init__(self, send):
+        super().__init__()
+        self._send = send
+
+    def enter(self, phase, detail=None):
+        before = (len(self.spans), self.phase)
+        elapsed = super().enter(phase, detail)
+        if (len(self.spans), self.phase) != before:
+            self._send(('phase', phase, detail))
+        return elapsed
+
+
+class _PipeLogHandler(logging.Handler):
+    """Sends a worker's log records to the app, which passes them to its own log pipeline"""
+
+    def __init__(self, send):
+        super().__init__()
+        self._send = send
+
+    def emit(self, record):
+        try:
+            fields = dict(record.__dict__)
+            fields['msg'] = record.getMessage()
+            fields['args'] = None
+            if record.exc_info:
+                fields['exc_text'] = logging.Formatter().formatException(record.exc_info)
+            fields['exc_info'] = None
+            self._send(('log', fields))
+        except Exception:
+            self.handleError(record)
+
+
+def _run_worker_job(spec, downloader, send):
+    """Run one job in a worker process; returns the final message for the app"""
+    settings = spec['settings'] or {}
+    downloader.trace = _RelayedTrace(send)
+    downloader.log = job_logger(job_id=spec['job_id'], url=spec['url'])
+    interval = 1.0 / max(1, settings.get('progress_rate_hz', 10))
+    last_sent = [0.0]
+
+    def progress(d):
+        if d.get('status') == 'paused':
+            while downloader.is_paused() and not downloader.is_cancelled():
+                time.sleep(0.1)
+            if downloader.is_cancelled():
+                raise Exception("Download cancelled by user")  # Cancelled while paused
+        # Coalesce chunk updates here, so the pipe only carries what the window shows
+        now = time.monotonic()
+        if d.get('status') in ('downloading', 'paused') and now - last_sent[0] < interval:
+            return
+        last_sent[0] = now
+        send(('progress', {key: d.get(key) for key in PROGRESS_KEYS}))
+
+    downloader.set_progress_hook(progress)
+    try:
+        if downloader.is_cancelled():
+            result = "Download cancelled by user"  # Cancelled before it got here; don't extract for nothing
+        else:
+            result = downloader.download_media(spec['url'], spec['download_type'], settings)
+    except Exception as e:
+        result = DownloadThread.failure(downloader, e)
+    metrics = MetricsRegistry.instance().drain()
+    metrics.pop('mediadl_job_phase_seconds', None)  # The app's trace records phases from the relayed changes
+    return ('done', result, downloader.last_error, downloader.downloaded_bytes(), downloader.trace.format_ids, metrics)
+
+
+def _worker_main(conn, log_level):
+    """Entry point of a worker process: runs the jobs WorkerPool sends until told to stop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is for the app to handle
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    logger = logging.getLogger('mediadl')
+    logger.handlers = [_PipeLogHandler(send)]
+    logger.setLevel(log_level)
+    logger.propagate = False
+
+    jobs = queue.Queue()
+    current = [None]  # The running job's Downloader
+
+    def listen():
+        # Control messages arrive while a job runs, so they're read on their own thread
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ('stop',)
+            if message[0] == 'run':
+                spec = message[1]
+                current[0] = Downloader(spec['output_path'])
+                current[0].rate_limit = spec['rate_limit']  # Set before the job starts; it picks the read size
+                current[0].keep_controls = True  # Pause or cancel can land before download_media runs
+                if spec['paused']:
+                    current[0].pause()
+                jobs.put((spec, current[0]))
+            elif message[0] == 'stop':
+                jobs.put(None)
+                return
+            elif current[0] is not None:
+                getattr(current[0], message[0])(*message[1:])  # pause, resume, cancel or set_rate_limit
+
+    threading.Thread(target=listen, name='worker-control', daemon=True).start()
+    rules = None
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        spec, downloader = job
+        if (spec['settings'] or {}).get('error_rules') != rules:
+            rules = spec['settings'].get('error_rules')
+            ErrorClassifier.configure(rules)
+        try:
+            send(_run_worker_job(spec, downloader, send))
+        except (OSError, ValueError):
+            break  # The app is gone
+    ConnectionPool.instance().close()
+
+
+class WorkerProcess:
+    """One worker process and the app's end of its pipe"""
+
+    def __init__(self, context, log_level):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, log_level),
+                                       name='mediadl-worker', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self._send_lock = threading.Lock()  # The window thread sends pause/cancel while the job thread sends the job
+
+    def send(self, message):
+        with self._send_lock:
+            self.conn.send(message)
+
+    def recv(self):
+        return self.conn.recv()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def stop(self, timeout=2.0):
+        try:
+            self.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Long-lived processes that run download jobs outside the app's process.
+
+    Extraction and progress handling are pure Python, so download threads in one
+    process take turns on the GIL; worker processes let them use every core.
+    Workers start on demand, up to `size`, and are reused from job to job. Each
+    talks to the app over its own pipe: the app sends the job and any pause,
+    resume, cancel or rate limit; the worker sends back progress, phase changes
+    and log records as they happen, then the result with the error
+    classification and the metrics it recorded.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or os.cpu_count() or 2
+        self._context = multiprocessing.get_context('spawn')  # Forking a process that runs Qt threads isn't safe
+        self._workers = []
+        self._idle = []
+        self._available = threading.Condition()
+        self._closed = False
+
+    def acquire(self):
+        """An idle worker, starting one while the pool isn't full; waits when every worker is busy"""
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Worker pool is shut down")
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        return worker
+                    self._workers.remove(worker)
+                if len(self._workers) < self.size:
+                    worker = WorkerProcess(self._context, logging.getLogger('mediadl').getEffectiveLevel())
+                    self._workers.append(worker)
+                    return worker
+                self._available.wait()
+
+    def release(self, worker, healthy=True):
+        """Return a worker after its job; one that broke off mid-job is stopped instead of reused"""
+        with self._available:
+            if healthy and not self._closed:
+                self._idle.append(worker)
+            else:
+                self._workers.remove(worker)
+            self._available.notify()
+        if not healthy:
+            worker.stop(timeout=0)
+
+    def pids(self):
+        """Process ids of the running workers"""
+        with self._available:
+            return [worker.process.pid for worker in self._workers]
+
+    def shutdown(self):
+        with self._available:
+            self._closed = True
+            workers, self._workers, self._idle = self._workers, [], []
+            self._available.notify_all()
+        for worker in workers:
+            worker.stop()
+
+
+class ProcessDownloadThread(DownloadThread):
+    """DownloadThread whose job runs in a WorkerPool process.
+
+    The thread only relays: it sends the job, turns the worker's messages into
+    the usual signals, progress accounting and trace phases, and forwards pause,
+    resume, cancel and rate limits. The download manager treats it like any DownloadThread.
+    """
+
+    def __init__(self, pool, downloader, url, download_type, settings=None, job_id=None, parent=None):
+        super().__init__(downloader, url, download_type, settings, job_id, parent)
+        self.pool = pool
+        self._worker = None
+        self._control_lock = threading.Lock()
+
+    def run(self):
+        worker = self.pool.acquire()
+        settings = dict(self.settings)
+        # The proxy pool lives in the app, so the app picks the proxy and the worker just uses it
+        proxy_pool = self.downloader.proxy_pool
+        proxy = proxy_pool.acquire() if proxy_pool is not None else None
+        if proxy:
+            settings.update(use_proxy=True, proxy_url=proxy)
+        started = time.monotonic()
+        healthy = False
+        try:
+            with self._control_lock:
+                # Controls up to here travel in the spec; later ones follow the run message down the pipe
+                cancelled = self.downloader.is_cancelled()
+                if not cancelled:
+                    worker.send(('run', {'job_id': self.job_id, 'url': self.url, 'download_type': self.download_type,
+                                         'settings': settings, 'output_path': self.downloader.output_path,
+                                         'rate_limit': self.downloader.rate_limit,
+                                         'paused': self.downloader.is_paused()}))
+                    self._worker = worker
+            result = "Download cancelled by user" if cancelled else self._relay(worker)
+            healthy = True
+        except (EOFError, OSError) as e:
+            result = self.failure(self.downloader, RuntimeError(f"Worker process stopped unexpectedly: {e}"))
+        finally:
+            with self._control_lock:
+                self._worker = None
+            self.pool.release(worker, healthy)
+            if proxy:
+                error = self.downloader.last_error
+                self.downloader.proxy_pool.release(proxy, self.downloader.downloaded_bytes(), time.monotonic() - started,
+                                                   failed=bool(error) and error['category'] == 'Network Connection Issue')
+        self._report(result)
+
+    def _relay(self, worker):
+        while True:
+            message = worker.recv()
+            kind = message[0]
+            if kind == 'progress':
+                self.downloader.account_progress(message[1])
+                self.progress_signal.emit(ProgressEvent.from_hook(self.job_id, message[1]))
+            elif kind == 'phase':
+                self.downloader.trace.enter(message[1], message[2])
+            elif kind == 'log':
+                logging.getLogger('mediadl').handle(logging.makeLogRecord(message[1]))
+            elif kind == 'done':
+                _, result, last_error, downloaded, format_ids, metrics = message
+                self.downloader.last_error = last_error
+                self.downloader.trace.bytes = downloaded
+                self.downloader.trace.format_ids.extend(f for f in format_ids if f not in self.downloader.trace.format_ids)
+                MetricsRegistry.instance().merge(metrics)
+                return result
+
+    def _control(self, command, *args):
+        with self._control_lock:
+            getattr(self.downloader, command)(*args)  # Remembered for a job that hasn't reached its worker yet
+            if self._worker is not None:
+                try:
+                    self._worker.send((command, *args))
+                except (OSError, ValueError):
+                    pass  # The worker is gone; run() reports it
+
+    def pause(self):
+        self._control('pause')
+
+    def resume(self):
+        self._control('resume')
+
+    def cancel(self):
+        self._control('cancel')
+
+    def set_rate_limit(self, rate):
+        self._control('set_rate_limit', rate)
+
+# --- Job API ---
+class JobApiError(Exception):
+    """A request the job API refuses, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class JobApi(QObject):
+    """Local HTTP/JSON API over the download manager, for scripts and ingest tools.
+
+    Requests are served on background threads, but every operation runs on
+    the thread that owns the DownloadManager: the handler posts it through a
+    queued signal and waits for the result, so the API and the window share
+    one scheduler without locking. /events streams job events as server-sent
+    events; each client has a bounded queue and a client that stops reading
+    is disconnected instead of holding up the app.
+
+      GET  /status                        batch totals, limits and the schedule window
+      GET  /jobs[?status=queued]          jobs of the current batch
+      POST /jobs                          {"urls": [...], "type": "video", "priority": 0, "options": {...}}
+      GET  /jobs/<id>
+      POST /jobs/<id>/cancel|pause|resume
+      POST /jobs/<id>/priority            {"priority": 10, "preempt": false}
+      POST /pause|resume|cancel           every job
+      POST /ingest                        {"path": "/lists/urls.csv", "type": "video", "priority": 0}: stream a URL list
+      GET  /subscriptions
+      POST /subscriptions                 {"url": ..., "type": "video", "hours": 24, "backfill": 10}
+      POST /subscriptions/sync            sync every subscription now
+      POST /subscriptions/<id>/sync|remove
+      GET  /events                        server-sent events
+
+    Only localhost is served. POSTs must be application/json, so a web page
+    can't submit jobs, and with a token every request needs
+    "Authorization: Bearer <token>" (or ?token= for EventSource clients).
+    """
+
+    TYPES = ('video', 'audio', 'playlist')
+    JOB_PATH = re.compile(r'^/jobs/(\d+)(?:/(cancel|pause|resume|priority))?$')
+    SUBSCRIPTION_PATH = re.compile(r'^/subscriptions/(\d+)/(sync|remove)$')
+    EVENT_QUEUE_SIZE = 1000  # Events buffered per /events client before it is dropped
+    CALL_TIMEOUT = 30.0
+
+    jobs_submitted = pyqtSignal(int)  # number of jobs just added to the manager
+    _invoke = pyqtSignal(object)  # (future, function, args) from a request thread
+
+    def __init__(self, download_manager, downloader, settings=None, host='127.0.0.1', port=8765, token=None,
+                 parent=None):
+        super().__init__(parent)
+        self.manager = download_manager
+        self.downloader = downloader
+        self.settings = settings if settings is not None else {}
+        self.shared_feeder = None  # Submissions go to the shared queue when set
+        self.ingestor = None  # UrlIngestor behind POST /ingest
+        self.subscriptions = None  # Subscriptions behind /subscriptions
+        self.schedule = None  # ScheduleProfiles reported by /status
+        self.host = host
+        self.port = port
+        self.token = token
+        self._server = None
+        self._thread = None
+        self._subscribers = set()
+        self._subscribers_lock = threading.Lock()
+        self._invoke.connect(self._run_invoked)
+        download_manager.job_started.connect(lambda job_id: self._publish('started', self._job_event(job_id)))
+        download_manager.job_progress.connect(self._on_progress)
+        download_manager.job_finished.connect(
+            lambda job_id, message: self._publish('finished', self._job_event(job_id)))
+        download_manager.job_failed.connect(
+            lambda job_id, message: self._publish('failed', dict(self._job_event(job_id), message=message)))
+        download_manager.job_retrying.connect(
+            lambda job_id, delay, message: self._publish('retrying', dict(self._job_event(job_id), delay=delay)))
+        download_manager.job_preempted.connect(lambda job_id: self._publish('preempted', self._job_event(job_id)))
+        download_manager.job_cancelled.connect(lambda job_id: self._publish('cancelled', self._job_event(job_id)))
+        download_manager.queue_drained.connect(lambda: self._publish('drained', {}))
+
+    # Running operations on the manager's thread
+    def call(self, function, *args):
+        """Run function(*args) on the manager's thread and return its result"""
+        future = Future()
+        self._invoke.emit((future, function, args))
+        return future.result(timeout=self.CALL_TIMEOUT)
+
+    def _run_invoked(self, item):
+        future, function, args = item
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    # Operations; these run on the manager's thread
+    @staticmethod
+    def job_summary(job):
+        error = job.get('error')
+        return {
+            'id': job['job_id'],
+            'url': job['url'],
+            'type': job['download_type'],
+            'status': job['status'],
+            'phase': job.get('phase'),
+            'priority': job['priority'],
+            'downloaded': job.get('downloaded', 0),
+            'total': job.get('total') or job.get('estimated_size'),
+            'speed': job.get('speed', 0.0),
+            'eta': job.get('eta'),
+            'attempts': job['attempts'],
+            'retry_in': max(0.0, job['not_before'] - time.monotonic()) if job['status'] == 'queued' else None,
+            'filename': job.get('filename'),
+            'error': error['category'] if error else job.get('last_error'),
+        }
+
+    def _job(self, job_id):
+        job = self.manager.get_job(job_id)
+        if job is None:
+            raise JobApiError(404, f"No job {job_id}")
+        return job
+
+    def status(self):
+        batch = self.manager.registry.aggregate()
+        return dict(batch, max_concurrent=self.manager.max_concurrent, running=self.manager.running_count(),
+                    shared_queue=self.shared_feeder is not None,
+                    schedule=self.schedule.summary() if self.schedule is not None else None)
+
+    def list_jobs(self, status=None):
+        return [self.job_summary(job) for job in self.manager.registry.jobs(status)]
+
+    def get_job(self, job_id):
+        return self.job_summary(self._job(job_id))
+
+    def submit(self, request):
+        urls = request.get('urls')
+        if urls is None and request.get('url'):
+            urls = [request['url']]
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            raise JobApiError(400, "'urls' must be a list of URLs")
+        urls = [url.strip() for url in urls if url.strip()]
+        if not urls:
+            raise JobApiError(400, "No URLs to download")
+        download_type = request.get('type', 'video')
+        if download_type not in self.TYPES:
+            raise JobApiError(400, f"'type' must be one of {', '.join(self.TYPES)}")
+        try:
+            priority = int(request.get('priority', DownloadManager.PRIORITY_NORMAL))
+        except (TypeError, ValueError):
+            raise JobApiError(400, "'priority' must be a number")
+        options = request.get('options') or {}
+        if not isinstance(options, dict):
+            raise JobApiError(400, "'options' must be an object")
+        options = {key: value for key, value in options.items() if key in DeadLetterQueue.OPTION_KEYS}
+        settings = dict(self.settings, **options)
+
+        if self.shared_feeder is not None:
+            self.shared_feeder.submit(urls, download_type, settings, priority)
+            return {'shared': True, 'submitted': len(urls)}
+        preempt = bool(request.get('preempt')) or priority >= DownloadManager.PRIORITY_URGENT
+        job_ids = [self.manager.add_download(self.downloader, url, download_type, settings,
+                                             priority=priority, preempt=preempt)
+                   for url in urls]
+        self.jobs_submitted.emit(len(job_ids))
+        self.manager.pump()
+        return {'job_ids': job_ids}
+
+    def job_action(self, job_id, action, request):
+        job = self._job(job_id)
+        if action == 'priority':
+            try:
+                priority = int(request['priority'])
+            except (KeyError, TypeError, ValueError):
+                raise JobApiError(400, "'priority' must be a number")
+            self.manager.set_priority(job_id, priority, bool(request.get('preempt')))
+        else:
+            done = {'cancel': self.manager.cancel_job, 'pause': self.manager.pause_job,
+                    'resume': self.manager.resume_job}[action](job_id)
+            if not done:
+                raise JobApiError(409, f"Job {job_id} is {job['status']}")
+        return self.job_summary(job)
+
+    def ingest(self, request):
+        path = request.get('path')
+        if self.ingestor is None or not isinstance(path, str) or not path:
+            raise JobApiError(400, "'path' must name a URL list file")
+        if not os.path.isfile(path):
+            raise JobApiError(404, f"No such file: {path}")
+        download_type = request.get('type', 'video')
+        if download_type not in self.TYPES:
+            raise JobApiError(400, f"'type' must be one of {', '.join(self.TYPES)}")
+        try:
+            priority = int(request.get('priority', DownloadManager.PRIORITY_NORMAL))
+        except (TypeError, ValueError):
+            raise JobApiError(400, "'priority' must be a number")
+        if not self.ingestor.add_file(path, download_type, priority):
+            raise JobApiError(409, f"{path} is already being read")
+        return {'path': os.path.abspath(path)}
+
+    def _subscriptions(self):
+        if self.subscriptions is None:
+            raise JobApiError(404, "Subscriptions aren't available")
+        return self.subscriptions
+
+    def list_subscriptions(self):
+        return [{key: entry[key] for key in ('id', 'url', 'title', 'download_type', 'interval', 'last_sync',
+                                             'next_sync', 'last_new', 'new_total', 'error')}
+                for entry in self._subscriptions().entries]
+
+    def subscribe(self, request):
+        url = request.get('url')
+        if not isinstance(url, str) or '://' not in url:
+            raise JobApiError(400, "'url' must be a channel or playlist URL")
+        download_type = request.get('type', 'video')
+        if download_type not in Subscriptions.TYPES:
+            raise JobApiError(400, f"'type' must be one of {', '.join(Subscriptions.TYPES)}")
+        try:
+            hours = float(request['hours']) if request.get('hours') is not None else None
+            backfill = int(request['backfill']) if request.get('backfill') is not None else None
+        except (TypeError, ValueError):
+            raise JobApiError(400, "'hours' and 'backfill' must be numbers")
+        options = request.get('options') or {}
+        if not isinstance(options, dict):
+            raise JobApiError(400, "'options' must be an object")
+        entry = self._subscriptions().add(url, download_type, hours * 3600 if hours else None, backfill,
+                                          options=options)
+        return {'id': entry['id']}
+
+    def subscription_action(self, subscription_id, action):
+        subscriptions = self._subscriptions()
+        if action == 'sync' and subscription_id is None:
+            subscriptions.sync_now()
+            return {'syncing': len(subscriptions)}
+        if subscriptions.get(subscription_id) is None:
+            raise JobApiError(404, f"No subscription {subscription_id}")
+        if action == 'remove':
+            subscriptions.remove([subscription_id])
+        else:
+            subscriptions.sync_now([subscription_id])
+        return {'id': subscription_id}
+
+    def batch_action(self, action):
+        {'pause': self.manager.pause_all, 'resume': self.manager.resume_all,
+         'cancel': self.manager.cancel_all}[action]()
+        if action == 'cancel' and self.ingestor is not None:
+            self.ingestor.cancel()
+        if action == 'cancel' and self.shared_feeder is not None:
+            self.shared_feeder.pause()
+        return self.status()
+
+    # Server-sent events
+    def _job_event(self, job_id):
+        job = self.manager.get_job(job_id)
+        return self.job_summary(job) if job is not None else {'id': job_id}
+
+    def _on_progress(self, event):
+        if self._subscribers:
+            self._publish('progress', {'id': event.job_id, 'phase': event.phase, 'downloaded': event.downloaded,
+                                       'total': event.total, 'speed': event.speed, 'eta': event.eta})
+
+    def _publish(self, name, data):
+        if not self._subscribers:
+            return
+        message = f"event: {name}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+        with self._subscribers_lock:
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    self._subscribers.discard(subscriber)  # Its request thread ends the stream
+                    log.warning("Dropped a job API event stream that stopped reading")
+
+    def _subscribe(self):
+        subscriber = queue.Queue(maxsize=self.EVENT_QUEUE_SIZE)
+        with self._subscribers_lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def _subscribed(self, subscriber):
+        with self._subscribers_lock:
+            return subscriber in self._subscribers
+
+    def _unsubscribe(self, subscriber):
+        with self._subscribers_lock:
+            self._subscribers.discard(subscriber)
+
+    # HTTP
+    def start(self):
+        if self._server is not None:
+            return
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def _handle(self, method):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                status = 200
+                try:
+                    api._check_request(self.headers, query, method)
+                    if method == 'GET' and url.path == '/events':
+                        self._stream_events()
+                        return
+                    request = self._read_json() if method == 'POST' else {}
+                    result = api._route(method, url.path, query, request)
+                except JobApiError as e:
+                    status, result = e.status, {'error': str(e)}
+                except FutureTimeoutError:  # Not the builtin TimeoutError before Python 3.11
+                    status, result = 503, {'error': "The app is busy; try again"}
+                except Exception:
+                    log.exception("Job API %s %s failed", method, url.path)
+                    status, result = 500, {'error': "Internal error; see the log"}
+                MetricsRegistry.instance().inc('mediadl_api_requests_total', method=method, status=status)
+                body = json.dumps(result).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self):
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    raise JobApiError(400, "Content-Length must be a byte count")
+                if not length:
+                    return {}
+                try:
+                    request = json.loads(self.rfile.read(length))
+                except ValueError:
+                    raise JobApiError(400, "Body is not valid JSON")
+                if not isinstance(request, dict):
+                    raise JobApiError(400, "Body must be a JSON object")
+                return request
+
+            def _stream_events(self):
+                MetricsRegistry.instance().inc('mediadl_api_requests_total', method='GET', status=200)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                subscriber = api._subscribe()
+                try:
+                    while api._server is not None and api._subscribed(subscriber):
+                        try:
+                            message = subscriber.get(timeout=15)
+                        except queue.Empty:
+                            message = b": keep-alive\n\n"
+                        self.wfile.write(message)
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client went away
+                finally:
+                    api._unsubscribe(subscriber)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='job-api', daemon=True)
+        self._thread.start()
+        log.info("Job API listening on http://%s:%d", self.host, self.port)
+
+    def stop(self):
+        if self._server is None:
+            return
+        server, self._server = self._server, None  # Event streams see this and end
+        server.shutdown()
+        server.server_close()
+        self._thread = None
+
+    def _check_request(self, headers, query, method):
+        # A page in the browser can reach localhost too: refuse other Host names (DNS rebinding)
+        # and anything but JSON posts, which browsers can't send cross-origin without asking
+        host = (headers.get('Host') or '').rsplit(':', 1)[0].strip('[]')
+        if host not in ('127.0.0.1', 'localhost', '::1'):
+            raise JobApiError(403, "Only local clients may use the job API")
+        if method == 'POST' and not (headers.get('Content-Type') or '').startswith('application/json'):
+            raise JobApiError(415, "Send requests as application/json")
+        if self.token:
+            supplied = headers.get('Authorization') or ''
+            supplied = (supplied[len('Bearer '):] if supplied.startswith('Bearer ') else supplied).strip()
+            supplied = supplied or (query.get('token') or [''])[0]
+            if not hmac.compare_digest(supplied, self.token):
+                raise JobApiError(401, "Missing or wrong API token")
+
+    def _route(self, method, path, query, request):
+        if method == 'GET' and path == '/status':
+            return self.call(self.status)
+        if path == '/jobs':
+            if method == 'POST':
+                return self.call(self.submit, request)
+            return self.call(self.list_jobs, (query.get('status') or [None])[0])
+        if method == 'POST' and path == '/ingest':
+            return self.call(self.ingest, request)
+        if path == '/subscriptions':
+            if method == 'POST':
+                return self.call(self.subscribe, request)
+            return self.call(self.list_subscriptions)
+        if method == 'POST' and path == '/subscriptions/sync':
+            return self.call(self.subscription_action, None, 'sync')
+        match = self.SUBSCRIPTION_PATH.match(path)
+        if match and method == 'POST':
+            return self.call(self.subscription_action, int(match.group(1)), match.group(2))
+        if method == 'POST' and path in ('/pause', '/resume', '/cancel'):
+            return self.call(self.batch_action, path[1:])
+        match = self.JOB_PATH.match(path)
+        if match:
+            job_id, action = int(match.group(1)), match.group(2)
+            if method == 'GET' and action is None:
+                return self.call(self.get_job, job_id)
+            if method == 'POST' and action is not None:
+                return self.call(self.job_action, job_id, action, request)
+            raise JobApiError(405, f"{method} is not supported on {path}")
+        raise JobApiError(404, f"No such endpoint: {path}")
+
+# --- Engine Settings ---
+class EngineSettings:
+    """Settings that configure the download engine, shared by the window and headless mode.
+
+    Mixed into a class that has settings, downloader, download_manager,
+    concurrency_controller, schedule, proxy_pool, metrics_server,
+    shared_feeder, job_api, ingestor and subscriptions attributes.
+    """
+
+    def load_app_settings(self):
+        settings_file = "app_config.json"
+        if getattr(sys, 'frozen', False):
+            base_path = os.path.dirname(sys.executable)
+            # Use getattr to avoid linter warnings
+            _MEIPASS = getattr(sys, '_MEIPASS', None)
+            if _MEIPASS:
+                base_path = _MEIPASS
+            settings_path = os.path.join(base_path, settings_file)
+        else:
+            settings_path = settings_file
+            
+        if os.path.exists(settings_path):
+            try:
+                with open(settings_path, "r") as f:
+                    import json
+                    self.settings = json.load(f)
+            except Exception as e:
+                log.warning("Could not load app settings from %s: %s", settings_path, e)
+                self.settings = {}
+
+    def save_app_settings(self):
+        settings_file = "app_config.json"
+        if getattr(sys, 'frozen', False):
+            base_path = os.path.dirname(sys.executable)
+            # Use getattr to avoid linter warnings
+            _MEIPASS = getattr(sys, '_MEIPASS', None)
+            if _MEIPASS:
+                base_path = _MEIPASS
+            settings_path = os.path.join(base_path, settings_file)
+        else:
+            settings_path = settings_file
+            
+        try:
+            with open(settings_path, "w") as f:
+                import json
+                json.dump(self.settings, f, indent=2)
+        except Exception as e:
+            log.warning("Could not save app settings to %s: %s", settings_path, e)
+
+    def apply_proxy_settings(self):
+        """Rebuild the proxy pool from the current settings"""
+        proxies = []
+        if self.settings.get('use_proxy'):
+            if self.settings.get('proxy_url'):
+                proxies.append(self.settings['proxy_url'])
+            proxies.extend(self.settings.get('proxy_list', []))
         
-    def has_pending_downloads(self):
-        return len(self.download_queue) > 0 or len(self.active_downloads) > 0
+        self.proxy_pool.strategy = self.settings.get('proxy_strategy', 'round_robin')
+        self.proxy_pool.probe_url = self.settings.get('proxy_probe_url') or ProxyPool.DEFAULT_PROBE_URL
+        self.proxy_pool.max_latency = self.settings.get('proxy_max_latency', 5.0)
+        self.proxy_pool.set_proxies(proxies)
+        if len(self.proxy_pool) > 1:
+            # Health probes only matter when there is somewhere else to send jobs
+            self.proxy_pool.start_health_checks()
+        else:
+            self.proxy_pool.stop()
 
-# --- Threading for UI Responsiveness ---
-class DownloadThread(QThread):
-    progress_signal = pyqtSignal(dict) # To send progress updates
-    finished_signal = pyqtSignal(str) # To send final status
-    error_signal = pyqtSignal(str) # To send error messages
+    def apply_concurrency_settings(self):
+        """Use a fixed number of parallel downloads, or let the controller tune it"""
+        max_concurrent = self.settings.get('max_concurrent', 'auto')
+        if max_concurrent == 'auto':
+            self.concurrency_controller.min_concurrent = self.settings.get('min_concurrent', 1)
+            self.concurrency_controller.max_concurrent = self.settings.get('max_concurrent_limit', 16)
+            if not self.concurrency_controller.timer.isActive():
+                self.download_manager.max_concurrent = 3  # Starting point for the controller
+                self.concurrency_controller.start()
+        else:
+            self.concurrency_controller.stop()
+            self.download_manager.max_concurrent = int(max_concurrent)
+        self.download_manager.pump()
+
+    def apply_schedule_settings(self):
+        """Time-of-day windows from schedule that cap concurrency and bandwidth and hold bulk jobs"""
+        try:
+            self.schedule.configure(self.settings.get('schedule') or [])
+        except ValueError as e:
+            log.warning("Ignoring the schedule setting: %s", e)
+            self.schedule.configure([])
+
+    def apply_memory_settings(self):
+        """Admit jobs under memory_budget_mb ('auto' is half of physical memory, 0 turns it off)"""
+        budget_mb = self.settings.get('memory_budget_mb', 'auto')
+        if budget_mb == 'auto' or int(budget_mb) > 0:
+            budget_bytes = None if budget_mb == 'auto' else int(budget_mb) * 1024 * 1024
+            self.download_manager.memory_budget = MemoryBudget(budget_bytes)
+        else:
+            self.download_manager.memory_budget = None
+
+    def apply_worker_settings(self):
+        """Run downloads in worker processes when worker_mode (or MEDIADL_WORKER_MODE) is 'processes'"""
+        mode = os.environ.get('MEDIADL_WORKER_MODE') or self.settings.get('worker_mode', 'threads')
+        if mode != 'processes' or self.download_manager.worker_pool is not None:
+            return  # Only at startup: switching under running jobs would orphan them
+        self.download_manager.worker_pool = WorkerPool(self.settings.get('worker_processes') or None)
+        log.info("Running downloads in up to %d worker processes", self.download_manager.worker_pool.size)
+
+    def apply_shared_queue_settings(self):
+        """Take jobs from, and submit them to, the shared queue file in shared_queue (empty keeps the queue local)"""
+        path = self.settings.get('shared_queue')
+        if not path or self.shared_feeder is not None:
+            return  # Only at startup, like worker_mode
+        shared_queue = SharedJobQueue(path, self.settings.get('node_name') or None,
+                                      float(self.settings.get('shared_queue_lease', 60.0)))
+        self.shared_feeder = SharedQueueFeeder(shared_queue, self.download_manager, self.downloader, self.settings,
+                                               parent=self)
+        self.shared_feeder.jobs_leased.connect(self._external_jobs_added)
+        self.shared_feeder.start()
+        log.info("Working through the shared queue %s as %s", path, shared_queue.node)
+
+    def apply_retry_settings(self):
+        """Backoff and circuit breaker tuning; the number of retries is Max Retries in Settings"""
+        policy = self.download_manager.retry_policy
+        policy.base_delay = float(self.settings.get('retry_base_delay', 5.0))
+        policy.max_delay = float(self.settings.get('retry_max_delay', 300.0))
+        breakers = self.download_manager.circuit_breakers
+        breakers.threshold = int(self.settings.get('breaker_threshold', 5))
+        breakers.cooldown = float(self.settings.get('breaker_cooldown', 30.0))
+
+    def apply_metrics_settings(self):
+        """Serve metrics on localhost when metrics_port is set (0 turns it off)"""
+        port = int(self.settings.get('metrics_port', 0))
+        if self.metrics_server is not None and self.metrics_server.port != port:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if port and self.metrics_server is None:
+            server = MetricsServer(port=port)
+            try:
+                server.start()
+            except OSError as e:
+                log.warning("Could not start metrics endpoint on port %s: %s", port, e)
+                return
+            self.metrics_server = server
+
+    def apply_profiling_settings(self):
+        """Profile workers and the GUI thread when MEDIADL_PROFILE or profile_mode asks for it"""
+        mode = os.environ.get('MEDIADL_PROFILE') or self.settings.get('profile_mode', 'off')
+        if mode == '1':
+            mode = 'sample'
+        output_dir = (os.environ.get('MEDIADL_PROFILE_DIR') or self.settings.get('profile_dir')
+                      or get_data_path('profiles'))
+        if mode != Profiler.instance().mode:
+            Profiler.instance().start(mode, output_dir, self.settings.get('profile_sample_rate'))
+
+    def apply_logging_settings(self):
+        """Log file level and rotation from log_level, log_max_bytes and log_backups; MEDIADL_LOG_LEVEL wins"""
+        pipeline = LogPipeline.instance()
+        level = os.environ.get('MEDIADL_LOG_LEVEL') or self.settings.get('log_level', 'INFO')
+        max_bytes = int(self.settings.get('log_max_bytes', 5 * 1024 * 1024))
+        backups = int(self.settings.get('log_backups', 5))
+        if pipeline.path and (max_bytes, backups) != (pipeline.max_bytes, pipeline.backups):
+            pipeline.start(pipeline.path, level, max_bytes, backups, pipeline.console)  # Reopen with the new rotation
+        else:
+            pipeline.set_level(level)
+
+    def apply_api_settings(self):
+        """Serve the job API on localhost when api_port is set (0 turns it off)"""
+        port = int(self.settings.get('api_port', 0))
+        if self.job_api is not None and self.job_api.port != port:
+            self.job_api.stop()
+            self.job_api = None
+        if port and self.job_api is None:
+            api = JobApi(self.download_manager, self.downloader, self.settings, port=port,
+                         token=self.settings.get('api_token') or None, parent=self)
+            api.shared_feeder = self.shared_feeder
+            api.ingestor = self.ingestor
+            api.subscriptions = self.subscriptions
+            api.schedule = self.schedule
+            try:
+                api.start()
+            except OSError as e:
+                log.warning("Could not start the job API on port %s: %s", port, e)
+                return
+            api.jobs_submitted.connect(self._external_jobs_added)
+            self.job_api = api
+
+    def apply_ingest_settings(self):
+        """Queue depth for streamed URL lists, the watch_folder inbox, and lists an earlier run didn't finish"""
+        self.ingestor.queue_depth = int(self.settings.get('ingest_queue_depth', 100))
+        self.ingestor.shared_feeder = self.shared_feeder
+        self.ingestor.watch(self.settings.get('watch_folder') or None)
+        self.ingestor.resume()
+
+    def apply_subscription_settings(self):
+        """Sync interval, backfill and parallel syncs for subscriptions"""
+        subscriptions = self.subscriptions
+        subscriptions.settings = self.settings
+        subscriptions.shared_feeder = self.shared_feeder
+        subscriptions.interval = float(self.settings.get('subscription_hours', 24)) * 3600
+        backfill = self.settings.get('subscription_backfill')
+        subscriptions.backfill = int(backfill) if backfill not in (None, '') else None
+        subscriptions.set_concurrency(self.settings.get('subscription_syncs', 4))
 
-    def __init__(self, downloader, url, download_type, settings=None, parent=None):
+    def _external_jobs_added(self, count):
+        """Jobs arrived from the shared queue, the job API, a URL list or a subscription"""
+
+# --- Headless Mode ---
+class HeadlessService(QObject, EngineSettings):
+    """The download engine without a window, driven by the job API and the shared queue.
+
+    Reads app_config.json like the window. Download history and the Failed
+    list belong to the window and aren't written here; results are in the
+    log, the API and the shared queue's archive.
+    """
+
+    def __init__(self, output_path="downloads", parent=None):
         super().__init__(parent)
-        self.downloader = downloader
-        self.url = url
-        self.download_type = download_type
-        self.settings = settings or {}
-        # Set the downloader's hook to emit our signal
-        self.downloader.set_progress_hook(self._threaded_progress_hook)
-        self._paused = False
+        self.settings = {}
+        self.downloader = Downloader(output_path)
+        self.download_manager = DownloadManager(max_concurrent=3, size_estimator=SizeEstimator(), parent=self)
+        self.concurrency_controller = ConcurrencyController(self.download_manager,
+                                                            log_path=get_data_path("concurrency_decisions.jsonl"))
+        self.schedule = ScheduleProfiles(self.download_manager, parent=self)
+        self.proxy_pool = ProxyPool()
+        self.downloader.proxy_pool = self.proxy_pool
+        self.metrics_server = None
+        self.shared_feeder = None
+        self.job_api = None
+        self.ingestor = UrlIngestor(self.download_manager, self.downloader, self.settings,
+                                    get_data_path("ingest_checkpoints.json"), parent=self)
+        self.subscriptions = Subscriptions(self.download_manager, self.downloader, self.settings,
+                                           get_data_path("subscriptions.json"), parent=self)
+        self.subscriptions.load()
+        self.download_manager.job_finished.connect(
+            lambda job_id, message: log.info("Finished %s", self.download_manager.get_job(job_id)['url']))
+        self.download_manager.job_failed.connect(
+            lambda job_id, message: log.warning("Failed %s: %s", self.download_manager.get_job(job_id)['url'], message))
 
-    def _threaded_progress_hook(self, d):
-        # Handle pause state in the progress hook
-        if d.get('status') == 'paused':
-            # Wait until resumed
-            while self._paused and self.isRunning():
-                self.msleep(100)  # Sleep for 100ms and check again
-            if not self.isRunning():
-                return  # Thread was terminated
-        self.progress_signal.emit(d)
+    def start(self, api_port=None):
+        self.load_app_settings()
+        if api_port is not None:
+            self.settings['api_port'] = api_port
+        ConnectionPool.instance().dns_cache.ttl = self.settings.get('dns_cache_ttl', 300)
+        self.apply_proxy_settings()
+        self.download_manager.policy = self.settings.get('scheduling_policy', 'sjf')
+        self.download_manager.lookahead = self.settings.get('prefetch_depth', 4)
+        self.apply_concurrency_settings()
+        self.apply_schedule_settings()
+        self.apply_memory_settings()
+        self.apply_worker_settings()
+        self.apply_shared_queue_settings()
+        self.apply_retry_settings()
+        ErrorClassifier.configure(self.settings.get('error_rules'))
+        self.apply_metrics_settings()
+        self.apply_api_settings()
+        self.apply_profiling_settings()
+        self.apply_logging_settings()
+        self.ingestor.settings = self.settings
+        self.apply_ingest_settings()
+        self.apply_subscription_settings()
 
-    def run(self):
-        try:
-            result = self.downloader.download_media(self.url, self.download_type, self.settings)
-            # Check if the result indicates a failure
-            if result.startswith("Download failed:"):
-                self.error_signal.emit(result)
-            elif result == "Download cancelled by user":
-                self.error_signal.emit(result)
-            else:
-                self.finished_signal.emit(result)
-        except Exception as e:
-            # Classify and format the error
-            classified_error = ErrorClassifier.classify_error(str(e))
-            formatted_error = ErrorClassifier.format_error_message(str(e), classified_error)
-            self.error_signal.emit(f"Download failed: {formatted_error}")
+    def submit(self, urls, download_type, priority=DownloadManager.PRIORITY_NORMAL):
+        if self.shared_feeder is not None:
+            self.shared_feeder.submit(urls, download_type, self.settings, priority)
+            return
+        for url in urls:
+            self.download_manager.add_download(self.downloader, url, download_type, self.settings, priority=priority)
+        self.download_manager.pump()
 
-    def pause(self):
-        """Pause the download"""
-        self._paused = True
-        if hasattr(self.downloader, 'pause'):
-            self.downloader.pause()
+    def is_idle(self):
+        return not self.download_manager.has_pending_downloads() and not self.ingestor.has_work() and not (
+            self.subscriptions.has_work()) and not (self.shared_feeder is not None and self.shared_feeder.has_work())
 
-    def resume(self):
-        """Resume the download"""
-        self._paused = False
-        if hasattr(self.downloader, 'resume'):
-            self.downloader.resume()
+    def shutdown(self):
+        if self.job_api is not None:
+            self.job_api.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.concurrency_controller.stop()
+        self.schedule.stop()
+        self.proxy_pool.stop()
+        self.ingestor.save_checkpoints()
+        self.subscriptions.stop()
+        threads = [download['thread'] for download in self.download_manager.active_downloads]
+        self.download_manager.cancel_all()  # Running downloads stop; yt-dlp resumes their .part files next time
+        for thread in threads:
+            thread.wait(10000)
+        if self.shared_feeder is not None:
+            self.shared_feeder.stop()
+        self.download_manager.size_estimator.shutdown()
+        if self.download_manager.worker_pool is not None:
+            self.download_manager.worker_pool.shutdown()
 
-    def cancel(self):
-        """Cancel the download"""
-        self._paused = False
-        if hasattr(self.downloader, 'cancel'):
-            self.downloader.cancel()
+
+def run_headless(argv, launch_dir):
+    """python app.py --headless [--api-port N] [--output DIR] [--type video] [--priority N] [--ingest FILE]
+    [--watch DIR] [--subscribe URL] [--sync] [--exit-when-done] [URL ...]"""
+    parser = argparse.ArgumentParser(prog='app.py --headless', description="Run downloads without a window")
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('urls', nargs='*', help='URLs to download')
+    parser.add_argument('--type', default='video', choices=JobApi.TYPES)
+    parser.add_argument('--output', default='downloads', help='Download folder')
+    parser.add_argument('--priority', type=int, default=DownloadManager.PRIORITY_NORMAL,
+                        help='Priority of the URLs and lists given here; below 0 makes them bulk jobs, '
+                             'which schedule windows can hold')
+    parser.add_argument('--api-port', type=int, help='Serve the job API on this port (overrides api_port)')
+    parser.add_argument('--ingest', action='append', default=[], metavar='FILE',
+                        help='Download the URLs in a text, CSV or JSONL file (may repeat)')
+    parser.add_argument('--watch', metavar='DIR', help='Download URL lists dropped into this folder')
+    parser.add_argument('--subscribe', action='append', default=[], metavar='URL',
+                        help='Subscribe to a channel or playlist (may repeat)')
+    parser.add_argument('--sync', action='store_true', help='Sync every subscription now and download what is new')
+    parser.add_argument('--exit-when-done', action='store_true',
+                        help='Quit once the queue is empty (the default when only URLs are given)')
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication(sys.argv[:1])
+    service = HeadlessService(os.path.join(launch_dir, args.output))
+    service.start(args.api_port)
+    if args.watch:
+        service.ingestor.watch(os.path.join(launch_dir, args.watch))
+    for path in args.ingest:
+        service.ingestor.add_file(os.path.join(launch_dir, path), args.type, args.priority)
+    for url in args.subscribe:
+        service.subscriptions.add(url, args.type if args.type in Subscriptions.TYPES else 'video')
+    serving = service.job_api or args.watch or service.shared_feeder
+    if serving or args.sync:
+        service.subscriptions.start()  # A one-off run of URLs or lists leaves subscriptions alone
+    if args.sync:
+        service.subscriptions.sync_now()
+    if not (args.urls or serving or service.ingestor.has_work() or args.sync):
+        if args.subscribe:
+            service.subscriptions.save()
+            return 0
+        parser.error("nothing to do: give URLs, --ingest, --watch, --sync, --api-port "
+                     "or a shared_queue in app_config.json")
+    if args.exit_when_done or not (service.job_api or args.watch):
+        def quit_if_idle():
+            if service.is_idle():
+                app.quit()
+        service.download_manager.queue_drained.connect(quit_if_idle)
+        idle_timer = QTimer(app)  # The shared queue can run dry without a job ever starting here
+        idle_timer.timeout.connect(quit_if_idle)
+        idle_timer.start(5000)
+    if args.urls:
+        service.submit(args.urls, args.type, args.priority)
+
+    # Qt's loop doesn't run Python signal handlers on its own; wake it now and then so Ctrl+C works
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: app.quit())
+    wake_timer = QTimer(app)
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(500)
+    app.aboutToQuit.connect(service.shutdown)
+    app.aboutToQuit.connect(Profiler.instance().stop)
+    app.aboutToQuit.connect(LogPipeline.instance().stop)
+    return app.exec()
 
 # --- PyQt6 GUI Application ---
-class DownloaderApp(QWidget):
+class DownloaderApp(QWidget, EngineSettings):
+    PASTE_STREAM_LINES = 1000  # Pasted lists this long are streamed in instead of queued at once
+
     def __init__(self):
         super().__init__()
         self.downloader = Downloader() # Initialize downloader with default path
-        self.download_thread = None
         self.settings = {}  # Store user settings
         self.download_history = []  # Store download history
-        self.download_queue = []  # Queue for batch downloads
-        self.current_download_index = 0  # Track current download in queue
-        self.total_downloads = 0  # Track total number of downloads in batch
-        self.download_manager = DownloadManager(max_concurrent=3)  # Parallel download manager
+        self.download_manager = DownloadManager(max_concurrent=3, size_estimator=SizeEstimator())  # Parallel download manager
+        self.jobs = self.download_manager.registry  # Per-job progress of the current batch
+        self.batch_refresh_timer = QTimer(self)  # Batch progress is redrawn on a timer, not per event
+        self.batch_refresh_timer.setSingleShot(True)
+        self.batch_refresh_timer.setInterval(250)
+        self.batch_refresh_timer.timeout.connect(self._update_batch_progress)
+        self.download_manager.job_progress.connect(self.update_progress)
+        self.download_manager.job_finished.connect(self.job_finished)
+        self.download_manager.job_failed.connect(self.job_failed)
+        self.download_manager.job_preempted.connect(self.job_preempted)
+        self.download_manager.job_retrying.connect(self.job_retrying)
+        self.download_manager.queue_drained.connect(self.all_downloads_finished)
+        self.concurrency_controller = ConcurrencyController(self.download_manager,
+                                                            log_path=get_data_path("concurrency_decisions.jsonl"))
+        self.schedule = ScheduleProfiles(self.download_manager, parent=self)  # Off-peak windows from app_config.json
+        self.schedule.window_changed.connect(self.schedule_changed)
+        self.proxy_pool = ProxyPool()  # Proxies shared by all jobs
+        self.downloader.proxy_pool = self.proxy_pool
+        self.metrics_server = None  # Local metrics endpoint, when metrics_port is set
+        self.watchdog = EventLoopWatchdog(parent=self)  # Flags handlers that block the window
+        self._background_tasks = set()  # Running BackgroundTasks, kept alive until they finish
+        self._history_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-save')
+        self._history_lock = threading.Lock()
+        self._history_snapshot = None  # Newest history waiting to be written
+        self.dead_letters = DeadLetterQueue(get_data_path("dead_letters.json"))  # Failed downloads to retry later
+        self.shared_feeder = None  # SharedQueueFeeder when this node works through a shared backlog
+        self.job_api = None  # Local job API, when api_port is set
+        self.ingestor = UrlIngestor(self.download_manager, self.downloader, self.settings,
+                                    get_data_path("ingest_checkpoints.json"), parent=self)  # URL lists from files
+        self.subscriptions = Subscriptions(self.download_manager, self.downloader, self.settings,
+                                           get_data_path("subscriptions.json"), parent=self)  # Channels to keep synced
         self.last_update_check = None  # Track when we last checked for updates
         self.is_downloading = False  # Track download state
-        self.last_downloaded_filename = None  # Track the last downloaded filename
         self.initUI()
         self.load_settings() # Load last saved directory
         self.load_app_settings() # Load app settings
+        ConnectionPool.instance().dns_cache.ttl = self.settings.get('dns_cache_ttl', 300)
+        self.apply_proxy_settings()
+        self.download_manager.policy = self.settings.get('scheduling_policy', 'sjf')
+        self.download_manager.lookahead = self.settings.get('prefetch_depth', 4)
+        self.apply_concurrency_settings()
+        self.apply_schedule_settings()
+        self.apply_memory_settings()
+        self.apply_worker_settings()
+        self.apply_shared_queue_settings()
+        self.apply_retry_settings()
+        ErrorClassifier.configure(self.settings.get('error_rules'))  # Site-specific rules from app_config.json
+        self.apply_metrics_settings()
+        self.apply_api_settings()
+        self.apply_profiling_settings()
+        self.apply_logging_settings()
+        self.apply_watchdog_settings()
+        self.ingestor.settings = self.settings  # load_app_settings replaced the dict
+        self.ingestor.jobs_added.connect(self._external_jobs_added)
+        self.apply_ingest_settings()
+        self.subscriptions.load()
+        self.subscriptions.jobs_added.connect(self._external_jobs_added)
+        self.apply_subscription_settings()
+        self.subscriptions.start()
         self.load_download_history() # Load download history
+        self.dead_letters.load()
         self.check_for_updates() # Check for updates on startup
 
     def initUI(self):
@@ -989,8 +6915,24 @@ class DownloaderApp(QWidget):
         history_button.clicked.connect(self.open_history)
         
         # Create update button
-        update_button = QPushButton("Check Updates")
-        update_button.clicked.connect(self.manual_update_check)
+        self.update_button = QPushButton("Check Updates")
+        self.update_button.clicked.connect(self.manual_update_check)
+        
+        # Create queue button
+        queue_button = QPushButton("Queue")
+        queue_button.clicked.connect(self.open_queue)
+        
+        # Create failed downloads button
+        failed_button = QPushButton("Failed")
+        failed_button.clicked.connect(self.open_dead_letters)
+
+        import_button = QPushButton("Import List")
+        import_button.setToolTip("Download every URL in a text, CSV or JSONL file")
+        import_button.clicked.connect(self.import_url_list)
+
+        subscriptions_button = QPushButton("Subscriptions")
+        subscriptions_button.setToolTip("Channels and playlists whose new uploads download automatically")
+        subscriptions_button.clicked.connect(self.open_subscriptions)
         
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -1000,8 +6942,12 @@ class DownloaderApp(QWidget):
         top_layout = QHBoxLayout()
         top_layout.addStretch()
         top_layout.addWidget(settings_button)
+        top_layout.addWidget(queue_button)
+        top_layout.addWidget(failed_button)
+        top_layout.addWidget(import_button)
+        top_layout.addWidget(subscriptions_button)
         top_layout.addWidget(history_button)
-        top_layout.addWidget(update_button)
+        top_layout.addWidget(self.update_button)
         main_layout.addLayout(top_layout)
 
         # URL Input - Changed to QTextEdit for multi-line input
@@ -1032,6 +6978,10 @@ class DownloaderApp(QWidget):
         self.playlist_button.setStyleSheet("background-color: #FF9800; color: white; font-weight: bold;")
         button_layout.addWidget(self.playlist_button)
         main_layout.addLayout(button_layout)
+        
+        # Urgent jobs go ahead of everything queued and may suspend a running download
+        self.urgent_checkbox = QCheckBox("Urgent - start now, ahead of queued downloads", self)
+        main_layout.addWidget(self.urgent_checkbox)
 
         # Output Directory Selector
         output_layout = QHBoxLayout()
@@ -1138,7 +7088,7 @@ class DownloaderApp(QWidget):
                         self.downloader.output_path = last_dir
                         self.output_dir_label.setText(f"Output: {self.downloader.output_path}")
             except Exception as e:
-                print(f"Error loading settings: {e}")
+                log.warning("Could not load settings from %s: %s", settings_path, e)
                 # Fallback to default path if settings file is corrupted or unreadable
                 self.downloader.output_path = "downloads"
                 self.output_dir_label.setText(f"Output: {self.downloader.output_path}")
@@ -1161,7 +7111,7 @@ class DownloaderApp(QWidget):
             with open(settings_path, "w") as f:
                 f.write(self.downloader.output_path)
         except Exception as e:
-            print(f"Error saving settings: {e}")
+            log.warning("Could not save settings to %s: %s", settings_path, e)
 
     def open_settings(self):
         dialog = SettingsDialog(self)
@@ -1184,6 +7134,23 @@ class DownloaderApp(QWidget):
             
         if 'proxy_url' in self.settings:
             dialog.proxy_input.setText(self.settings['proxy_url'])
+            
+        if 'proxy_list' in self.settings:
+            dialog.proxy_list_input.setPlainText('\n'.join(self.settings['proxy_list']))
+            
+        if self.settings.get('proxy_strategy') == 'least_loaded':
+            dialog.proxy_strategy_combo.setCurrentIndex(1)
+            
+        max_concurrent = self.settings.get('max_concurrent', 'auto')
+        dialog.concurrency_spinbox.setValue(0 if max_concurrent == 'auto' else int(max_concurrent))
+            
+        policies = ['sjf', 'fifo', 'fair']
+        policy = self.settings.get('scheduling_policy', 'sjf')
+        dialog.policy_combo.setCurrentIndex(policies.index(policy) if policy in policies else 0)
+        
+        levels = list(LogPipeline.LEVELS)
+        log_level = str(self.settings.get('log_level', 'INFO')).upper()
+        dialog.log_level_combo.setCurrentIndex(levels.index(log_level) if log_level in levels else 1)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
             # Save settings
@@ -1192,47 +7159,60 @@ class DownloaderApp(QWidget):
             self.settings['max_retries'] = dialog.retries_spinbox.value()
             self.settings['use_proxy'] = dialog.proxy_checkbox.isChecked()
             self.settings['proxy_url'] = dialog.proxy_input.text()
+            self.settings['proxy_list'] = [line.strip() for line in dialog.proxy_list_input.toPlainText().split('\n') if line.strip()]
+            self.settings['proxy_strategy'] = 'least_loaded' if dialog.proxy_strategy_combo.currentIndex() == 1 else 'round_robin'
+            self.settings['scheduling_policy'] = policies[dialog.policy_combo.currentIndex()]
+            self.download_manager.policy = self.settings['scheduling_policy']
+            self.settings['max_concurrent'] = dialog.concurrency_spinbox.value() or 'auto'
+            self.settings['log_level'] = levels[dialog.log_level_combo.currentIndex()]
             self.save_app_settings()
+            self.apply_proxy_settings()
+            self.apply_concurrency_settings()
+            self.apply_logging_settings()
 
-    def load_app_settings(self):
-        settings_file = "app_config.json"
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-            # Use getattr to avoid linter warnings
-            _MEIPASS = getattr(sys, '_MEIPASS', None)
-            if _MEIPASS:
-                base_path = _MEIPASS
-            settings_path = os.path.join(base_path, settings_file)
-        else:
-            settings_path = settings_file
-            
-        if os.path.exists(settings_path):
-            try:
-                with open(settings_path, "r") as f:
-                    import json
-                    self.settings = json.load(f)
-            except Exception as e:
-                print(f"Error loading app settings: {e}")
-                self.settings = {}
+    def _external_jobs_added(self, count):
+        """Jobs from the shared queue, the job API, a URL list or a subscription: show the batch as running"""
+        if not self.is_downloading:
+            self._prepare_batch()
+            self._batch_submitted(f"Downloading {len(self.jobs)} item(s) added from outside the window",
+                                  clear_input=False)  # Don't throw away what the user is typing
 
-    def save_app_settings(self):
-        settings_file = "app_config.json"
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-            # Use getattr to avoid linter warnings
-            _MEIPASS = getattr(sys, '_MEIPASS', None)
-            if _MEIPASS:
-                base_path = _MEIPASS
-            settings_path = os.path.join(base_path, settings_file)
-        else:
-            settings_path = settings_file
-            
-        try:
-            with open(settings_path, "w") as f:
-                import json
-                json.dump(self.settings, f, indent=2)
-        except Exception as e:
-            print(f"Error saving app settings: {e}")
+    def apply_watchdog_settings(self):
+        """Watch the event loop for handlers blocking longer than stall_threshold_ms (0 turns it off)"""
+        threshold = int(self.settings.get('stall_threshold_ms', 250))
+        self.watchdog.stop()
+        if threshold > 0:
+            self.watchdog.threshold = threshold / 1000.0
+            QTimer.singleShot(0, self.watchdog.start)  # Once the event loop runs; startup isn't a stall
+
+    def run_in_background(self, function, *args, on_result=None, on_error=None):
+        """Call function(*args) on a BackgroundTask; the callbacks run on the GUI thread"""
+        task = BackgroundTask(function, *args)
+        if on_result is not None:
+            task.result_signal.connect(on_result)
+        if on_error is not None:
+            task.error_signal.connect(on_error)
+        task.finished.connect(lambda: self._background_tasks.discard(task))
+        self._background_tasks.add(task)
+        task.start()
+        return task
+
+    def shutdown_background_work(self):
+        """Let running tasks and the last history write finish before the app exits"""
+        self.watchdog.stop()
+        for task in list(self._background_tasks):
+            task.wait()
+        self._history_writer.shutdown(wait=True)
+        self.dead_letters.shutdown()
+        self.ingestor.save_checkpoints()
+        self.subscriptions.stop()
+        self.schedule.stop()
+        if self.job_api is not None:
+            self.job_api.stop()
+        if self.shared_feeder is not None:
+            self.shared_feeder.stop()
+        if self.download_manager.worker_pool is not None:
+            self.download_manager.worker_pool.shutdown()
 
     def open_history(self):
         dialog = DownloadHistoryDialog(self.download_history, self)
@@ -1255,10 +7235,20 @@ class DownloaderApp(QWidget):
                 with open(history_path, "r") as f:
                     self.download_history = json.load(f)
             except Exception as e:
-                print(f"Error loading download history: {e}")
+                log.warning("Could not load download history from %s: %s", history_path, e)
                 self.download_history = []
 
     def save_download_history(self):
+        """Queue a write of the history file; a burst of saves writes only the newest snapshot"""
+        with self._history_lock:
+            pending = self._history_snapshot is not None
+            self._history_snapshot = list(self.download_history)
+        if not pending:
+            self._history_writer.submit(self._write_download_history)
+
+    def _write_download_history(self):
+        with self._history_lock:
+            history, self._history_snapshot = self._history_snapshot, None
         history_file = "download_history.json"
         if getattr(sys, 'frozen', False):
             base_path = os.path.dirname(sys.executable)
@@ -1271,18 +7261,22 @@ class DownloaderApp(QWidget):
             history_path = history_file
             
         try:
-            with open(history_path, "w") as f:
-                json.dump(self.download_history, f, indent=2)
+            # Write a temporary file and swap it in, so a crash never leaves half a history
+            with open(history_path + ".tmp", "w") as f:
+                json.dump(history, f, indent=2)
+            os.replace(history_path + ".tmp", history_path)
         except Exception as e:
-            print(f"Error saving download history: {e}")
+            log.warning("Could not save download history to %s: %s", history_path, e)
 
-    def add_to_history(self, title, url, status):
+    def add_to_history(self, title, url, status, job=None):
         entry = {
             "title": title,
             "url": url,
             "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "status": status
         }
+        if job and job.get('trace'):
+            entry["trace"] = job['trace'].to_dict()  # Phase timings for slow-job analysis
         self.download_history.append(entry)
         self.save_download_history()
 
@@ -1301,16 +7295,30 @@ class DownloaderApp(QWidget):
             QMessageBox.warning(self, "Input Error", "Please enter at least one URL to download.")
             return
             
+        if urls_text.count('\n') >= self.PASTE_STREAM_LINES:
+            # Too many to queue at once; stream them like an imported list
+            self.ingestor.add_text(urls_text, download_type)
+            self.url_input.clear()
+            self.status_label.setText("Queuing pasted URLs...")
+            return
+
         urls = [url.strip() for url in urls_text.split('\n') if url.strip()]
+        priority = DownloadManager.PRIORITY_URGENT if self.urgent_checkbox.isChecked() else DownloadManager.PRIORITY_NORMAL
         
         # For single URL, use existing logic
         if len(urls) == 1:
-            self.process_single_url(urls[0], download_type)
+            self.process_single_url(urls[0], download_type, priority)
         else:
             # For multiple URLs, use batch download
-            self.process_batch_urls(urls, download_type)
+            self.process_batch_urls(urls, download_type, priority)
 
-    def process_single_url(self, url, download_type):
+    def import_url_list(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import URL List", "",
+                                              "URL lists (*.txt *.csv *.jsonl *.ndjson);;All files (*)")
+        if path and self.ingestor.add_file(path):
+            self.status_label.setText(f"Queuing URLs from {os.path.basename(path)}...")
+
+    def process_single_url(self, url, download_type, priority=DownloadManager.PRIORITY_NORMAL):
         # Auto-detect playlist URLs
         if download_type == "video" or download_type == "audio":
             # Check if it's actually a playlist URL
@@ -1321,26 +7329,90 @@ class DownloaderApp(QWidget):
                                            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                            QMessageBox.StandardButton.No)
                 if reply == QMessageBox.StandardButton.Yes:
-                    download_type = "playlist"
-                    
-                    # Extract playlist info and show selection dialog
-                    try:
-                        playlist_info = self.downloader.extract_playlist_info(url)
-                        dialog = PlaylistSelectionDialog(playlist_info, self)
-                        if dialog.exec() == QDialog.DialogCode.Accepted:
-                            # TODO: Implement selective playlist download
-                            # For now, we'll download the entire playlist
-                            pass
-                    except Exception as e:
-                        QMessageBox.warning(self, "Playlist Info Error", 
-                                          f"Could not extract playlist information: {e}\nDownloading entire playlist.")
-
-        # Disable buttons during download
-        self.video_button.setEnabled(False)
-        self.audio_button.setEnabled(False)
-        self.playlist_button.setEnabled(False)
+                    # Extract playlist info off the GUI thread, then show the selection dialog
+                    self.status_label.setText("Reading playlist - please wait...")
+                    self.run_in_background(
+                        self.downloader.extract_playlist_info, url,
+                        on_result=lambda playlist_info: self._playlist_info_ready(url, playlist_info, priority),
+                        on_error=lambda error: self._playlist_info_failed(url, error, priority))
+                    return
+
+        self.submit_downloads([url], download_type, priority)
+
+    def _playlist_info_ready(self, url, playlist_info, priority):
+        dialog = PlaylistSelectionDialog(playlist_info, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            # TODO: Implement selective playlist download
+            # For now, we'll download the entire playlist
+            pass
+        self.submit_downloads([url], "playlist", priority)
+
+    def _playlist_info_failed(self, url, error, priority):
+        QMessageBox.warning(self, "Playlist Info Error", 
+                          f"Could not extract playlist information: {error}\nDownloading entire playlist.")
+        self.submit_downloads([url], "playlist", priority)
+
+    def process_batch_urls(self, urls, download_type, priority=DownloadManager.PRIORITY_NORMAL):
+        self.submit_downloads(urls, download_type, priority)
+
+    def submit_downloads(self, urls, download_type, priority=DownloadManager.PRIORITY_NORMAL):
+        """Queue URLs with the download manager; new URLs join a running batch"""
+        if self.shared_feeder is not None:
+            # Every node takes from the shared queue, this one included
+            self.shared_feeder.submit(urls, download_type, self.settings, priority)
+            self.url_input.clear()
+            self.status_label.setText(f"Added {len(urls)} item(s) to the shared queue")
+            return
+        self._prepare_batch()
+        preempt = priority >= DownloadManager.PRIORITY_URGENT
+        for url in urls:
+            self.download_manager.add_download(self.downloader, url, download_type, self.settings,
+                                               priority=priority, preempt=preempt)
+        
+        if self._is_single_job():
+            status = f"Starting {download_type} download..."
+        elif preempt:
+            status = f"Starting {len(urls)} urgent item(s) ahead of the queue"
+        else:
+            status = f"Starting batch download: {len(self.jobs)} items in queue"
+        self._batch_submitted(status)
+
+    def retry_dead_letters(self, entries):
+        """Queue failed downloads again with their last options.
+
+        Retries against the same site are spaced dead_letter_spacing seconds
+        apart, with jitter, so a site that was failing isn't hit by the whole
+        backlog at once; the circuit breakers still hold them if it fails again.
+        """
+        spacing = self.settings.get('dead_letter_spacing', 2.0)
+        per_host = {}
+        self._prepare_batch()
+        for entry in entries:
+            host = urlparse(entry['url']).hostname or ''
+            slot = per_host[host] = per_host.get(host, -1) + 1
+            delay = slot * spacing + random.uniform(0, spacing / 2) if slot else 0.0
+            downloader = self.downloader.spawn()
+            downloader.output_path = entry.get('output_path') or self.downloader.output_path
+            job_id = self.download_manager.add_download(downloader, entry['url'], entry['download_type'],
+                                                        dict(self.settings, **entry.get('options', {})),
+                                                        priority=entry.get('priority', DownloadManager.PRIORITY_NORMAL),
+                                                        delay=delay)
+            self.download_manager.get_job(job_id)['last_error'] = entry['category']
+        self.dead_letters.set_status(entries, 'retrying')
+        log.info("Retrying %d failed download(s) across %d site(s)", len(entries), len(per_host))
+        self._batch_submitted(f"Retrying {len(entries)} failed download(s): {len(self.jobs)} items in queue")
+
+    def _prepare_batch(self):
+        if not self.is_downloading:
+            self.jobs.clear_finished()
+            self.progress_bar.setValue(0)  # Set to 0% only when starting a download
+
+    def _batch_submitted(self, status, clear_input=True):
+        # The folder can't change under queued jobs; URL input stays open for more work
         self.output_dir_button.setEnabled(False)
-        self.url_input.setEnabled(False)
+        if clear_input:
+            self.url_input.clear()
+            self.urgent_checkbox.setChecked(False)
         
         # Enable control buttons
         self.pause_button.setEnabled(True)
@@ -1349,137 +7421,168 @@ class DownloaderApp(QWidget):
 
         # Show progress bar when starting download
         self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)  # Set to 0% only when starting a download
-        self.status_label.setText(f"Starting {download_type} download...")
+        self.status_label.setText(status)
         self.is_downloading = True
-
-        # Create and start the download thread with settings
-        self.download_thread = DownloadThread(self.downloader, url, download_type, self.settings)
-        self.download_thread.progress_signal.connect(self.update_progress)
-        self.download_thread.finished_signal.connect(self.download_finished)
-        self.download_thread.error_signal.connect(self.download_error)
-        self.download_thread.start()
-
-    def process_batch_urls(self, urls, download_type):
-        # For batch downloads, create a queue
-        self.download_queue = [(url, download_type) for url in urls]
-        self.current_download_index = 0
-        self.total_downloads = len(urls)
-        
-        # Disable buttons during batch download
-        self.video_button.setEnabled(False)
-        self.audio_button.setEnabled(False)
-        self.playlist_button.setEnabled(False)
-        self.output_dir_button.setEnabled(False)
-        self.url_input.setEnabled(False)
-        
-        # Show progress bar when starting batch download
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.status_label.setText(f"Starting batch download: {len(urls)} items in queue")
         
-        # Add all downloads to the download manager
-        for url, d_type in self.download_queue:
-            self.download_manager.add_download(self.downloader, url, d_type, self.settings)
-        
-        # Start parallel downloads
-        self.start_parallel_downloads()
+        self.download_manager.pump()
 
-    def download_finished(self, message):
-        self.status_label.setText("Download completed successfully!")
-        self.progress_bar.setValue(100)
-        self._reset_ui_state()
-        self.is_downloading = False
+    def _is_single_job(self):
+        return len(self.jobs) == 1
+
+    def _job_title(self, job, fallback):
+        # Use the actual downloaded filename if available
+        filename = job.get('filename') if job else None
+        if not filename:
+            return fallback
+        title = os.path.basename(filename)
+        # Remove file extension for cleaner display
+        if '.' in title:
+            title = '.'.join(title.split('.')[:-1])
+        return title
+
+    def job_finished(self, job_id, message):
+        job = self.download_manager.get_job(job_id)
+        url = job['url'] if job else ""
+        title = self._job_title(job, "Unknown Title")
+        self.add_to_history(title, url, "Success", job)
+        if job:
+            self.dead_letters.resolve(url, job['download_type'])
         
-        # Add to history
-        url = self.url_input.toPlainText().strip().split('\n')[0] if self.url_input.toPlainText().strip() else ""
+        if self._is_single_job():
+            self.status_label.setText("Download completed successfully!")
+            self.progress_bar.setValue(100)
+            QMessageBox.information(self, "Download Complete", 
+                                  f"Great job! Your file has been successfully downloaded.\n\n"
+                                  f"File: {title}\n"
+                                  f"Location: {self.downloader.output_path}\n\n"
+                                  "Enjoy your media!")
+        else:
+            self._update_batch_progress()
+
+    def job_failed(self, job_id, message):
+        job = self.download_manager.get_job(job_id)
+        url = job['url'] if job else ""
+        if job and job.get('status') == 'cancelled':
+            self.add_to_history(self._job_title(job, "Unknown Title"), url, "Cancelled", job)
+            self.dead_letters.release(url, job['download_type'])
+            return
         
-        # Use the actual downloaded filename if available
-        if self.last_downloaded_filename:
-            title = self.last_downloaded_filename
-            # Remove file extension for cleaner display
-            if '.' in title:
-                title = '.'.join(title.split('.')[:-1])
+        # The worker already classified the error; only older paths need it done here
+        classified_error = job.get('error') if job else None
+        if classified_error:
+            formatted_error = ErrorClassifier.format_error_message(classified_error['detail'], classified_error)
         else:
-            title = "Unknown Title"
-            # Try to extract title from message or use a default
-            if "complete" in message.lower():
-                title = message.replace("Download complete!", "").strip() or "Downloaded Media"
-        
-        self.add_to_history(title, url, "Success")
-        QMessageBox.information(self, "Download Complete", 
-                              f"Great job! Your file has been successfully downloaded.\n\n"
-                              f"File: {title}\n"
-                              f"Location: {self.downloader.output_path}\n\n"
-                              "Enjoy your media!")
-
-    def download_error(self, message):
-        self.status_label.setText("Download encountered an issue")
-        self._reset_ui_state()
-        self.is_downloading = False
+            classified_error = ErrorClassifier.classify_error(message)
+            formatted_error = ErrorClassifier.format_error_message(message, classified_error)
         
-        # Add to history
-        url = self.url_input.toPlainText().strip().split('\n')[0] if self.url_input.toPlainText().strip() else ""
+        title = self._job_title(job, "Unknown Title")
+        self.add_to_history(title, url, "Error: " + classified_error['category'], job)
+        if job:
+            detail = classified_error.get('detail', message)
+            self.dead_letters.add(job, classified_error['category'], detail, job['downloader'].output_path)
         
-        # Classify and format the error for better user experience
-        classified_error = ErrorClassifier.classify_error(message)
-        formatted_error = ErrorClassifier.format_error_message(message, classified_error)
+        if self._is_single_job():
+            self.status_label.setText("Download encountered an issue")
+            QMessageBox.critical(self, f"Download Issue - {classified_error['category']}", formatted_error)
+        else:
+            # Show error message for the first error in batch
+            if len(self.jobs.jobs('failed')) == 1:
+                QMessageBox.critical(self, f"Download Issue - {classified_error['category']}", formatted_error)
+            self._update_batch_progress()
+
+    def job_preempted(self, job_id):
+        job = self.download_manager.get_job(job_id)
+        if job and self.download_manager.is_held(job):
+            self.status_label.setText(f"Paused {job['url']} until the schedule allows bulk downloads")
+        elif job:
+            self.status_label.setText(f"Paused {job['url']} to make room for an urgent download")
+
+    def schedule_changed(self, window):
+        message = f"Schedule: {ScheduleProfiles.describe(window)}"
+        if not self.download_manager.class_allowed('bulk'):
+            opens = self.schedule.next_opening('bulk')
+            message += f" - bulk downloads wait until {opens:%a %H:%M}" if opens else " - bulk downloads wait"
+        self.status_label.setText(message)
+
+    def job_retrying(self, job_id, delay, message):
+        job = self.download_manager.get_job(job_id)
+        if job and self._is_single_job():
+            self.status_label.setText(f"{job.get('last_error', 'Download failed')} - retrying in {format_eta(delay)} "
+                                      f"(attempt {job['attempts'] + 1})")
+        else:
+            self._update_batch_progress()
+
+    def _update_batch_progress(self):
+        """Show the whole batch: bytes-weighted progress, combined speed and batch ETA"""
+        if not self.is_downloading:
+            return
+        batch = self.jobs.aggregate()
+        self.progress_bar.setValue(int(batch['progress'] * 100))
+        done = batch['finished'] + batch['failed'] + batch['cancelled']
+        if done >= batch['total_jobs']:
+            return
+        speed_str = f"{format_bytes(batch['speed'])}/s" if batch['speed'] else 'N/A'
+        self.status_label.setText(
+            f"Completed {done}/{batch['total_jobs']}, {batch['active']} active - "
+            f"{batch['progress'] * 100:.1f}% ({speed_str}) - ETA: {format_eta(batch['eta'])}"
+        )
+
+    def all_downloads_finished(self):
+        if not self.is_downloading:
+            return
+        if self.shared_feeder is not None and self.shared_feeder.has_work():
+            return  # Between leases; more jobs are on their way
+        if self.ingestor.has_work():
+            return  # More lines to read
+        batch = self.jobs.aggregate()
+        batch_size = batch['total_jobs'] - batch['cancelled']
+        failed = batch['failed']
+        self._reset_ui_state()
+        if batch_size <= 1:
+            return  # Single downloads report in job_finished / job_failed
         
-        self.add_to_history("Unknown Title", url, "Error: " + classified_error['category'])
-        QMessageBox.critical(self, f"Download Issue - {classified_error['category']}", formatted_error)
+        self.progress_bar.setValue(100)
+        if failed:
+            self.status_label.setText(f"Batch finished with {failed} failed download(s).")
+            QMessageBox.information(self, "Batch Download Complete", 
+                                  f"{batch_size - failed} of {batch_size} files were downloaded.\n\n"
+                                  f"Files are saved in: {self.downloader.output_path}\n\n"
+                                  "Click Failed to retry the downloads that failed.")
+        else:
+            self.status_label.setText("All downloads completed successfully!")
+            QMessageBox.information(self, "Batch Download Complete", 
+                                  f"Excellent! All {batch_size} files have been downloaded successfully.\n\n"
+                                  f"Files are saved in: {self.downloader.output_path}\n\n"
+                                  "Enjoy your media collection!")
 
-    def update_progress(self, d):
-        if d['status'] == 'downloading':
-            try:
-                # yt-dlp's _percent_str can be tricky, sometimes it's like ' 50.1%'
-                percent_str = d.get('_percent_str', '0%').strip().replace('%', '')
-                percent = float(percent_str)
+    def update_progress(self, event):
+        if not self._is_single_job():
+            # Several jobs report at once; redraw the aggregate instead of flickering between them
+            if not self.batch_refresh_timer.isActive():
+                self.batch_refresh_timer.start()
+            return
+        if event.phase == 'downloading':
+            percent = event.percent
+            if percent is not None:
                 self.progress_bar.setValue(int(percent))
-                # Display file name if available
-                filename = d.get('filename', 'Unknown File')
-                if isinstance(filename, list): # sometimes filename can be a list of paths
-                    filename = os.path.basename(filename[0])
-                else:
-                    filename = os.path.basename(filename)
+            # Display file name if available
+            filename = os.path.basename(event.filename) or 'Unknown File'
 
-                # Trim filename for display if too long
-                display_filename = filename
-                if len(display_filename) > 50:
-                    display_filename = display_filename[:25] + "..." + display_filename[-25:]
+            # Trim filename for display if too long
+            display_filename = filename
+            if len(display_filename) > 50:
+                display_filename = display_filename[:25] + "..." + display_filename[-25:]
 
-                self.status_label.setText(
-                    f"Downloading: {display_filename} - {d['_percent_str']} ({d.get('_speed_str', 'N/A')}) - ETA: {d.get('_eta_str', 'N/A')}"
-                )
-            except ValueError:
-                # Handle cases where percent_str might not be a valid float
-                self.status_label.setText(f"Downloading: {d.get('status')} - {d.get('_percent_str', '')}")
-            except Exception as e:
-                self.status_label.setText(f"Progress update error: {e}")
-        elif d['status'] == 'finished':
+            percent_str = f"{percent:.1f}%" if percent is not None else format_bytes(event.downloaded)
+            speed_str = f"{format_bytes(event.speed)}/s" if event.speed else 'N/A'
+            self.status_label.setText(
+                f"Downloading: {display_filename} - {percent_str} ({speed_str}) - ETA: {format_eta(event.eta)}"
+            )
+        elif event.phase == 'finished':
             self.progress_bar.setValue(100)
             self.status_label.setText("Processing final file...")
-            # Capture the filename when download is finished
-            filename = d.get('filename', 'Unknown File')
-            if isinstance(filename, list): # sometimes filename can be a list of paths
-                filename = os.path.basename(filename[0])
-            else:
-                filename = os.path.basename(filename)
-            # Store the filename for use in download_finished
-            self.last_downloaded_filename = filename
-        elif d['status'] == 'error':
-            # Classify and format the error for better user experience
-            error_msg = d.get('error', 'Unknown error')
-            classified_error = ErrorClassifier.classify_error(error_msg)
-            formatted_error = ErrorClassifier.format_error_message(error_msg, classified_error)
-            self.status_label.setText(f"Download error: {classified_error['category']} - {classified_error['message']}")
-            
-            # Show automatic feedback for connection problems
-            if 'network' in classified_error['category'].lower() or 'connection' in classified_error['category'].lower():
-                QMessageBox.warning(self, "Connection Issue", 
-                                  f"We detected a connection problem during your download:\n\n"
-                                  f"{classified_error['message']}\n\n"
-                                  f"How to fix this:\n{classified_error['suggestion']}\n\n"
-                                  "Please check your internet connection and try again.")
+        elif event.phase == 'error':
+            self.status_label.setText("Download encountered an issue")
     
     def _reset_ui_state(self):
         self.video_button.setEnabled(True)
@@ -1487,9 +7590,7 @@ class DownloaderApp(QWidget):
         self.playlist_button.setEnabled(True)
         self.output_dir_button.setEnabled(True)
         self.url_input.setEnabled(True)
-        self.download_thread = None # Clear reference to the finished thread
-        self.download_queue = []  # Clear the queue
-        self.current_download_index = 0  # Reset index
+        self.batch_refresh_timer.stop()
         self.is_downloading = False
         
         # Reset control buttons
@@ -1501,124 +7602,48 @@ class DownloaderApp(QWidget):
         self.progress_bar.setVisible(False)
 
     def pause_download(self):
-        """Pause the current download"""
-        if self.download_thread and self.download_thread.isRunning():
-            self.download_thread.pause()
+        """Pause the running downloads"""
+        if self.download_manager.active_downloads:
+            self.download_manager.pause_all()
             self.pause_button.setEnabled(False)
             self.retry_button.setEnabled(True)
             self.status_label.setText("Download paused. Click Retry to continue.")
 
     def retry_download(self):
-        """Resume the current download"""
-        if self.download_thread:
-            self.download_thread.resume()
-            self.pause_button.setEnabled(True)
-            self.retry_button.setEnabled(False)
-            self.status_label.setText("Resuming download...")
+        """Resume the running downloads"""
+        self.download_manager.resume_all()
+        self.pause_button.setEnabled(True)
+        self.retry_button.setEnabled(False)
+        self.status_label.setText("Resuming download...")
 
     def cancel_download(self):
-        """Cancel the current download"""
-        if self.download_thread and self.download_thread.isRunning():
+        """Cancel the running and queued downloads"""
+        if self.download_manager.has_pending_downloads():
             reply = QMessageBox.question(self, 'Cancel Download', 
                                        'Are you sure you want to cancel this download?',
                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                        QMessageBox.StandardButton.No)
             if reply == QMessageBox.StandardButton.Yes:
-                self.download_thread.cancel()
+                self.ingestor.cancel()
+                self.download_manager.cancel_all()
+                self.dead_letters.release()
+                if self.shared_feeder is not None:
+                    self.shared_feeder.pause()  # Another node can take them
                 self._reset_ui_state()
                 self.progress_bar.setValue(0)
                 self.status_label.setText("Download cancelled by user.")
 
-    def start_parallel_downloads(self):
-        # Start as many downloads as allowed by the concurrency limit
-        started_threads = []
-        while len(started_threads) < self.download_manager.max_concurrent:
-            thread = self.download_manager.start_next_download()
-            if thread:
-                thread.progress_signal.connect(self.update_progress)
-                thread.finished_signal.connect(self.parallel_download_finished)
-                thread.error_signal.connect(self.parallel_download_error)
-                started_threads.append(thread)
-            else:
-                break
-                
-        # Update status to show which downloads are in progress
-        if started_threads:
-            in_progress_count = len(started_threads)
-            if self.current_download_index < self.total_downloads:
-                self.status_label.setText(f"Downloading {in_progress_count} item(s)... Completed {self.current_download_index}/{self.total_downloads}")
-                
-        if not started_threads and not self.download_manager.has_pending_downloads():
-            # All downloads completed
-            self.status_label.setText("All downloads completed successfully!")
-            self.progress_bar.setValue(100)
-            self._reset_ui_state()
-            QMessageBox.information(self, "Batch Download Complete", 
-                                  f"Excellent! All {len(self.download_queue)} files have been downloaded successfully.\n\n"
-                                  f"Files are saved in: {self.downloader.output_path}\n\n"
-                                  "Enjoy your media collection!")
+    def open_queue(self):
+        dialog = QueueDialog(self.download_manager, self)
+        dialog.exec()
 
-    def parallel_download_finished(self, message):
-        # Update progress for completed download
-        completed = self.current_download_index + 1
-        progress_percent = int((completed / self.total_downloads) * 100)
-        self.progress_bar.setValue(progress_percent)
-        
-        # Add to history
-        if self.current_download_index < len(self.download_queue):
-            url, _ = self.download_queue[self.current_download_index]
-            
-            # Try to extract filename from message
-            title = "Unknown Title"
-            if "complete" in message.lower():
-                title = message.replace("Download complete!", "").strip() or f"Batch Item {self.current_download_index + 1}"
-                # Remove file extension for cleaner display
-                if '.' in title:
-                    title = '.'.join(title.split('.')[:-1])
-            
-            self.add_to_history(title, url, "Success")
-        
-        # Move to next download
-        self.current_download_index += 1
-        
-        # Update status label to show progress
-        if self.current_download_index < self.total_downloads:
-            self.status_label.setText(f"Completed {completed}/{self.total_downloads} downloads")
-        
-        # Start next download if available
-        self.start_parallel_downloads()
+    def open_subscriptions(self):
+        dialog = SubscriptionsDialog(self.subscriptions, self)
+        dialog.exec()
 
-    def parallel_download_error(self, message):
-        # Update progress for completed download (even if it failed)
-        completed = self.current_download_index + 1
-        progress_percent = int((completed / self.total_downloads) * 100)
-        self.progress_bar.setValue(progress_percent)
-        
-        # Add to history
-        if self.current_download_index < len(self.download_queue):
-            url, _ = self.download_queue[self.current_download_index]
-            
-            # Classify and format the error for better user experience
-            classified_error = ErrorClassifier.classify_error(message)
-            formatted_error = ErrorClassifier.format_error_message(message, classified_error)
-            
-            # Use a generic title for batch items
-            title = f"Batch Item {self.current_download_index + 1}"
-            self.add_to_history(title, url, "Error: " + classified_error['category'])
-            
-            # Show error message for the first error in batch
-            if self.current_download_index == 0:
-                QMessageBox.critical(self, f"Download Issue - {classified_error['category']}", formatted_error)
-        
-        # Move to next download
-        self.current_download_index += 1
-        
-        # Update status label to show progress
-        if self.current_download_index < self.total_downloads:
-            self.status_label.setText(f"Completed {completed}/{self.total_downloads} downloads")
-        
-        # Start next download if available
-        self.start_parallel_downloads()
+    def open_dead_letters(self):
+        dialog = DeadLetterDialog(self.dead_letters, self.retry_dead_letters, self)
+        dialog.exec()
 
     def check_for_updates(self):
         """Check for updates automatically (called on startup) - Now realtime"""
@@ -1632,23 +7657,7 @@ class DownloaderApp(QWidget):
         self.last_update_check = time.time()
         
         # Check for media engine updates
-        try:
-            update_info = UpdateChecker.check_yt_dlp_update()
-            if update_info['status'] == 'update_available':
-                reply = QMessageBox.question(
-                    self, 
-                    'Update Available', 
-                    f'A new version of the media engine is available!\n\n'
-                    f'Current: {update_info["current_version"]}\n'
-                    f'Latest: {update_info["latest_version"]}\n\n'
-                    f'Would you like to update now?',
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.Yes
-                )
-                if reply == QMessageBox.StandardButton.Yes:
-                    self.update_yt_dlp()
-        except Exception as e:
-            print(f"Error checking for media engine updates: {e}")
+        self.run_in_background(UpdateChecker.check_yt_dlp_update, on_result=self._startup_update_checked)
         
         # Check for app updates (optional)
         # You can uncomment this if you want to check for app updates
@@ -1661,67 +7670,92 @@ class DownloaderApp(QWidget):
         #             import webbrowser
         #             webbrowser.open(app_update['download_url'])
         # except Exception as e:
-        #     print(f"Error checking for app updates: {e}")
+        #     log.warning("Error checking for app updates: %s", e)
+
+    def _startup_update_checked(self, update_info):
+        if update_info['status'] == 'update_available':
+            reply = QMessageBox.question(
+                self, 
+                'Update Available', 
+                f'A new version of the media engine is available!\n\n'
+                f'Current: {update_info["current_version"]}\n'
+                f'Latest: {update_info["latest_version"]}\n\n'
+                f'Would you like to update now?',
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                self.update_yt_dlp()
 
     def manual_update_check(self):
         """Manually check for updates (called when user clicks update button)"""
         self.status_label.setText("Checking for updates - please wait...")
-        
-        try:
-            # Check for media engine updates
-            update_info = UpdateChecker.check_yt_dlp_update()
-            
-            if update_info['status'] == 'error':
-                QMessageBox.warning(self, "Update Check Failed", update_info['message'])
-            elif update_info['status'] == 'update_available':
-                reply = QMessageBox.question(
-                    self, 
-                    'Update Available', 
-                    f'Good news! A newer version of the media engine is available.\n\n'
-                    f'Your version: {update_info["current_version"]}\n'
-                    f'Latest version: {update_info["latest_version"]}\n\n'
-                    f'Release Notes:\n{update_info.get("release_notes", "No release notes available")[:300]}...\n\n'
-                    f'Would you like to update now for the latest features and improvements?',
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                    QMessageBox.StandardButton.Yes
-                )
-                if reply == QMessageBox.StandardButton.Yes:
-                    self.update_yt_dlp()
-                else:
-                    self.status_label.setText("Update check completed - update available but skipped.")
+        self.update_button.setEnabled(False)
+        self.run_in_background(UpdateChecker.check_yt_dlp_update, on_result=self._manual_update_checked,
+                               on_error=self._manual_update_check_failed)
+
+    def _manual_update_checked(self, update_info):
+        self.update_button.setEnabled(True)
+        if update_info['status'] == 'error':
+            QMessageBox.warning(self, "Update Check Failed", update_info['message'])
+        elif update_info['status'] == 'update_available':
+            reply = QMessageBox.question(
+                self, 
+                'Update Available', 
+                f'Good news! A newer version of the media engine is available.\n\n'
+                f'Your version: {update_info["current_version"]}\n'
+                f'Latest version: {update_info["latest_version"]}\n\n'
+                f'Release Notes:\n{update_info.get("release_notes", "No release notes available")[:300]}...\n\n'
+                f'Would you like to update now for the latest features and improvements?',
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                self.update_yt_dlp()
             else:
-                QMessageBox.information(self, "Up to Date", 
-                                      f"Great! Your media engine version ({update_info['current_version']}) is already up to date.\n\n"
-                                      "You're enjoying the latest features and improvements.")
-                self.status_label.setText("Media engine is up to date.")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Update Check Failed", 
-                               f"We encountered an unexpected issue while checking for updates:\n\n"
-                               f"• {str(e)}\n\n"
-                               "Please try again later or check your network connection.")
-            self.status_label.setText("Update check failed.")
+                self.status_label.setText("Update check completed - update available but skipped.")
+        else:
+            QMessageBox.information(self, "Up to Date", 
+                                  f"Great! Your media engine version ({update_info['current_version']}) is already up to date.\n\n"
+                                  "You're enjoying the latest features and improvements.")
+            self.status_label.setText("Media engine is up to date.")
+
+    def _manual_update_check_failed(self, error):
+        self.update_button.setEnabled(True)
+        QMessageBox.critical(self, "Update Check Failed", 
+                           f"We encountered an unexpected issue while checking for updates:\n\n"
+                           f"• {str(error)}\n\n"
+                           "Please try again later or check your network connection.")
+        self.status_label.setText("Update check failed.")
 
     def update_yt_dlp(self):
-        """Update the media engine"""
+        """Update the media engine; pip runs on a background task"""
         self.status_label.setText("Updating media engine - please wait...")
-        
-        try:
-            result = UpdateChecker.update_yt_dlp()
-            if result['status'] == 'success':
-                QMessageBox.information(self, "Update Successful", result['message'])
-                self.status_label.setText("Media engine updated successfully!")
-            else:
-                QMessageBox.critical(self, "Update Failed", result['message'])
-                self.status_label.setText("Media engine update failed.")
-        except Exception as e:
-            QMessageBox.critical(self, "Update Failed", 
-                               f"We encountered an unexpected issue while updating the media engine:\n\n"
-                               f"• {str(e)}\n\n"
-                               "Please try again or manually update using pip.")
+        self.update_button.setEnabled(False)
+        self.run_in_background(UpdateChecker.update_yt_dlp, on_result=self._yt_dlp_updated,
+                               on_error=self._yt_dlp_update_failed)
+
+    def _yt_dlp_updated(self, result):
+        self.update_button.setEnabled(True)
+        if result['status'] == 'success':
+            QMessageBox.information(self, "Update Successful", result['message'])
+            self.status_label.setText("Media engine updated successfully!")
+        else:
+            QMessageBox.critical(self, "Update Failed", result['message'])
             self.status_label.setText("Media engine update failed.")
+
+    def _yt_dlp_update_failed(self, error):
+        self.update_button.setEnabled(True)
+        QMessageBox.critical(self, "Update Failed", 
+                           f"We encountered an unexpected issue while updating the media engine:\n\n"
+                           f"• {str(error)}\n\n"
+                           "Please try again or manually update using pip.")
+        self.status_label.setText("Media engine update failed.")
         
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Lets a frozen build start worker processes
+    launch_dir = os.getcwd()  # Relative paths on the command line are from here
+
     # Ensure sys.argv is correctly handled for PyInstaller bundles
     if getattr(sys, 'frozen', False):
         # If the application is run as a bundle, the PyInstaller bootloader
@@ -1741,7 +7775,23 @@ if __name__ == '__main__':
     # This helps when looking for ffmpeg.exe or icon.ico
     os.chdir(application_path)
 
+    fixtures = FixtureBundle.from_env()
+    if fixtures is not None:
+        fixtures.install()  # Record or replay network traffic for performance tests
+
+    LogPipeline.instance().start(get_data_path('mediadl.log'), os.environ.get('MEDIADL_LOG_LEVEL', 'INFO'))
+
+    if '--headless' in sys.argv:
+        sys.exit(run_headless(sys.argv[1:], launch_dir))
+
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(ConnectionPool.instance().close)  # Close pooled connections on exit
     ex = DownloaderApp()
+    app.aboutToQuit.connect(ex.download_manager.size_estimator.shutdown)
+    app.aboutToQuit.connect(ex.shutdown_background_work)  # Finishes update tasks and the history write
+    if ex.metrics_server is not None:
+        app.aboutToQuit.connect(ex.metrics_server.stop)
+    app.aboutToQuit.connect(Profiler.instance().stop)  # Writes the GUI profile and summary
+    app.aboutToQuit.connect(LogPipeline.instance().stop)  # Last, so shutdown messages are flushed
     ex.show()
     sys.exit(app.exec())
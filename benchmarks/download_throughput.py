@@ -0,0 +1,233 @@
+# Benchmark: end-to-end download throughput, CPU and memory against a local media server
+#
+# Starts benchmarks/media_server.py in-process and downloads its synthetic
+# progressive, HLS and DASH media through the real download path:
+#
+#   downloader - Downloader.download_media called once per job, one after another
+#   manager    - DownloadManager running the batch with max_concurrent = each --concurrency,
+#                extracting the next --lookahead jobs ahead of their download
+#
+# Every combination of delivery kind, file size and throttle profile is one scenario.
+# Results (throughput, CPU time, peak RSS) go to a JSON file; pass an earlier file
+# to --compare to print the change per scenario.
+#
+#   python benchmarks/download_throughput.py [--jobs 8] [--concurrency 1,2,4,8]
+#       [--sizes-mb 5,50] [--kinds progressive,hls,dash] [--profiles unlimited,broadband]
+#       [--lookahead 0,4] [--json results.json] [--compare before.json]
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import itertools
+import tempfile
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QCoreApplication
+
+import yt_dlp
+from app import Downloader, DownloadManager, SizeEstimator
+from media_server import MediaServer, PROFILES, KINDS
+
+MB = 1024 * 1024
+
+
+def rss_bytes():
+    """Resident set size of this process, or None when it can't be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ResourceSampler:
+    """Peak RSS sampled on a background thread, plus process CPU time over the run"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_rss = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = rss_bytes()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def __enter__(self):
+        self.cpu_start = time.process_time()
+        self.wall_start = time.monotonic()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.monotonic() - self.wall_start
+        self.cpu = time.process_time() - self.cpu_start
+        self._stop.set()
+        self._thread.join()
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(folder, name))
+               for folder, _, names in os.walk(path) for name in names)
+
+
+def run_downloader(urls, output_path):
+    """download_media once per URL, sequentially"""
+    downloader = Downloader(output_path)
+    failed = 0
+    for url in urls:
+        if not downloader.download_media(url, 'video', {'max_retries': 5}).startswith("Download complete"):
+            failed += 1
+    return failed
+
+
+def run_manager(app, urls, output_path, concurrency, lookahead=0):
+    """The whole batch through DownloadManager with a fixed concurrency"""
+    estimator = SizeEstimator() if lookahead else None
+    manager = DownloadManager(max_concurrent=concurrency, policy='fifo', size_estimator=estimator, lookahead=lookahead)
+    failed = []
+    manager.job_failed.connect(lambda job_id, message: failed.append(job_id))
+    manager.queue_drained.connect(app.quit)
+    downloader = Downloader(output_path)
+    for url in urls:
+        manager.add_download(downloader, url, 'video', {'max_retries': 5})
+    manager.pump()
+    app.exec()
+    if estimator is not None:
+        estimator.shutdown()
+    return len(failed)
+
+
+def run_scenario(app, server, mode, kind, size, profile, jobs, concurrency, lookahead=0):
+    output_path = tempfile.mkdtemp(prefix='mediadl-bench-')
+    # A fresh name per run so yt-dlp never finds a finished file to skip
+    stamp = int(time.time() * 1000)
+    urls = [server.url(kind, size, f'{kind}_{stamp}_{index}', profile) for index in range(jobs)]
+    sent_before = server.stats()['bytes_sent']
+    try:
+        with ResourceSampler() as sample:
+            if mode == 'downloader':
+                failed = run_downloader(urls, output_path)
+            else:
+                failed = run_manager(app, urls, output_path, concurrency, lookahead)
+        downloaded = directory_bytes(output_path)
+    finally:
+        shutil.rmtree(output_path, ignore_errors=True)
+    return {
+        'mode': mode,
+        'kind': kind,
+        'size_mb': size / MB,
+        'profile': profile,
+        'concurrency': concurrency,
+        'lookahead': lookahead,
+        'jobs': jobs,
+        'failed': failed,
+        'wall_s': sample.wall,
+        'bytes': downloaded,
+        'bytes_sent': server.stats()['bytes_sent'] - sent_before,
+        'throughput_mbps': downloaded / MB / sample.wall if sample.wall else 0.0,
+        'cpu_s': sample.cpu,
+        'cpu_per_gb_s': sample.cpu / (downloaded / 1024 / MB) if downloaded else None,
+        'peak_rss_mb': sample.peak_rss / MB if sample.peak_rss else None,
+    }
+
+
+def scenario_key(result):
+    return (result['mode'], result['kind'], result['size_mb'], result['profile'], result['concurrency'],
+            result.get('lookahead', 0))
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'yt_dlp': yt_dlp.version.__version__,
+    }
+
+
+def print_comparison(results, path):
+    with open(path) as f:
+        before = {scenario_key(result): result for result in json.load(f)['results']}
+    print(f"\nCompared with {path}:")
+    print(f"{'scenario':<46}{'MiB/s':>16}{'CPU s':>16}{'peak RSS MiB':>20}")
+    for result in results:
+        old = before.get(scenario_key(result))
+        if old is None:
+            continue
+        mode, kind, size_mb, profile, concurrency, lookahead = scenario_key(result)
+        name = f"{mode} {kind} {size_mb:g}MiB {profile} x{concurrency}" + (f" +{lookahead}" if lookahead else "")
+
+        def change(key):
+            if not old.get(key) or result.get(key) is None:
+                return 'n/a'
+            return f"{old[key]:.1f}->{result[key]:.1f}"
+        print(f"{name:<46}{change('throughput_mbps'):>16}{change('cpu_s'):>16}{change('peak_rss_mb'):>20}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download throughput against a local synthetic media server")
+    parser.add_argument('--jobs', type=int, default=8, help='Downloads per scenario')
+    parser.add_argument('--concurrency', default='1,2,4,8', help='DownloadManager concurrency levels')
+    parser.add_argument('--sizes-mb', default='5,50', help='File sizes in MiB')
+    parser.add_argument('--kinds', default=','.join(KINDS))
+    parser.add_argument('--profiles', default='unlimited,broadband', help=f"Any of: {', '.join(PROFILES)}")
+    parser.add_argument('--modes', default='downloader,manager')
+    parser.add_argument('--lookahead', default='0', help='Look-ahead depths for the manager, e.g. 0,4')
+    parser.add_argument('--json', default='download_throughput.json', help='Write results to this file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    server = MediaServer().start()
+    results = []
+    print(f"{'mode':<11}{'kind':<12}{'MiB':>6}{'profile':>11}{'conc':>6}{'ahead':>6}{'MiB/s':>9}{'CPU s':>8}"
+          f"{'RSS MiB':>9}{'failed':>8}")
+    try:
+        for kind in args.kinds.split(','):
+            for size_mb in [float(size) for size in args.sizes_mb.split(',')]:
+                for profile in args.profiles.split(','):
+                    for mode in args.modes.split(','):
+                        levels = [1] if mode == 'downloader' else [int(level) for level in args.concurrency.split(',')]
+                        depths = [0] if mode == 'downloader' else [int(depth) for depth in args.lookahead.split(',')]
+                        for concurrency, lookahead in itertools.product(levels, depths):
+                            result = run_scenario(app, server, mode, kind, int(size_mb * MB), profile,
+                                                  args.jobs, concurrency, lookahead)
+                            results.append(result)
+                            rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] else 'n/a'
+                            print(f"{mode:<11}{kind:<12}{size_mb:>6g}{profile:>11}{concurrency:>6}{lookahead:>6}"
+                                  f"{result['throughput_mbps']:>9.1f}{result['cpu_s']:>8.2f}{rss:>9}{result['failed']:>8}",
+                                  flush=True)
+    finally:
+        server.stop()
+
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.json}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
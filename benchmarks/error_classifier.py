@@ -0,0 +1,155 @@
+# Benchmark: ErrorClassifier cost per error over a corpus of real yt-dlp error messages
+#
+# Compares the keyword scans the classifier used to run (one any() pass per
+# category, kept here as the baseline) with the precompiled single-pass matcher,
+# the per-message cache, and classification of the exception objects yt-dlp
+# actually raises (type and HTTP status, memoized on the exception).
+# Also reports messages where the two classifiers disagree.
+#
+#   python benchmarks/error_classifier.py [--iterations 20000] [--json results.json]
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, ExtractorError, GeoRestrictedError, PostProcessingError, UnsupportedError
+
+from app import ErrorClassifier
+
+CORPUS = [
+    "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video is private",
+    "ERROR: [youtube] dQw4w9WgXcQ: Private video. Sign in if you've been granted access to this video",
+    "ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm your age. This video may be inappropriate for some users.",
+    "ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm you're not a bot. Use --cookies-from-browser or --cookies for the authentication.",
+    "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video has been removed by the uploader",
+    "ERROR: [youtube] dQw4w9WgXcQ: Requested format is not available. Use --list-formats for a list of available formats",
+    "ERROR: [youtube] dQw4w9WgXcQ: The uploader has not made this video available in your country",
+    "ERROR: [youtube] dQw4w9WgXcQ: This live event will begin in 3 hours.",
+    "ERROR: [youtube:tab] PLx0sYbCqOb8TBPRdmBHs5Iftvv9TPboYG: The playlist does not exist.",
+    "ERROR: [youtube] dQw4w9WgXcQ: Unable to download API page: HTTP Error 429: Too Many Requests (caused by <HTTPError 429: Too Many Requests>)",
+    "ERROR: Unsupported URL: https://example.com/about",
+    "ERROR: [generic] 'notaurl' is not a valid URL. Set --default-search \"ytsearch\" (or run  yt-dlp \"ytsearch:notaurl\" ) to search YouTube",
+    "ERROR: [generic] clip: Unable to download webpage: HTTP Error 404: Not Found (caused by <HTTPError 404: Not Found>)",
+    "ERROR: [generic] clip: Unable to download webpage: HTTP Error 503: Service Unavailable (caused by <HTTPError 503: Service Unavailable>)",
+    "ERROR: unable to download video data: HTTP Error 403: Forbidden",
+    "ERROR: unable to download video data: HTTP Error 502: Bad Gateway",
+    "ERROR: [vimeo] 76979871: Unable to download JSON metadata: HTTP Error 500: Internal Server Error",
+    "ERROR: [soundcloud] 123456: Unable to download JSON metadata: HTTP Error 401: Unauthorized",
+    "ERROR: [vimeo] 76979871: This video is only available for registered users",
+    "ERROR: [twitter] 1234567890: No video could be found in this tweet",
+    "ERROR: [instagram] Cx1a2b3c4d: Requested content is not available, rate-limit reached or login required. Use --cookies",
+    "ERROR: [TikTok] 7234567890123456789: Unable to extract universal data for rehydration; please report this issue on  https://github.com/yt-dlp/yt-dlp/issues",
+    "ERROR: [generic] Unable to download webpage: <urlopen error [Errno -3] Temporary failure in name resolution> (caused by TransportError('<urlopen error [Errno -3] Temporary failure in name resolution>'))",
+    "ERROR: [download] Got error: The read operation timed out",
+    "ERROR: [download] Got error: ('Connection broken: IncompleteRead(1024 bytes read, 2048 more expected)', IncompleteRead(1024 bytes read, 2048 more expected))",
+    "ERROR: [Errno 104] Connection reset by peer",
+    "ERROR: [download] Got error: <urlopen error [SSL: CERTIFICATE_VERIFY_FAILED] certificate verify failed: unable to get local issuer certificate (_ssl.c:1006)>",
+    "ERROR: [generic] Unable to download webpage: Unable to connect to proxy (caused by ProxyError('Unable to connect to proxy'))",
+    "ERROR: fragment 3 not found, unable to continue",
+    "ERROR: Did not get any data blocks",
+    "ERROR: [Errno 28] No space left on device",
+    "ERROR: unable to open for writing: [Errno 13] Permission denied: '/downloads/clip.mp4.part'",
+    "ERROR: unable to rename file: [WinError 32] The process cannot access the file because it is being used by another process",
+    "ERROR: [Errno 2] No such file or directory: 'C:\\Users\\me\\Downloads\\clip.f137.mp4.part'",
+    "ERROR: Postprocessing: ffprobe and ffmpeg not found. Please install or provide the path using --ffmpeg-location",
+    "ERROR: Postprocessing: Conversion failed!",
+    "ERROR: Postprocessing: Error opening output files: Invalid argument",
+    "ERROR: ffmpeg exited with code 1",
+]
+
+
+def legacy_classify(error_message):
+    """The sequential keyword scans ErrorClassifier ran before it was precompiled"""
+    error_message = str(error_message).lower()
+    if any(keyword in error_message for keyword in ['permission', 'access denied', 'disk', 'space', 'read-only', 'no space', 'cannot create', 'directory not found']):
+        return 'File System Access Issue'
+    if any(keyword in error_message for keyword in ['no suitable extractor', 'unable to extract', 'this video is unavailable', 'infoextractor']):
+        return 'Invalid or Unsupported Link'
+    if any(keyword in error_message for keyword in ['ffmpeg', 'codec', 'format', 'unsupported format']) and 'extractor' not in error_message:
+        return 'Media Processing Issue'
+    if any(keyword in error_message for keyword in ['invalid url', 'unsupported url', 'not found', '404', 'not a valid url']):
+        return 'Invalid or Unsupported Link'
+    if any(keyword in error_message for keyword in ['login', 'authentication', 'signin', 'forbidden', '403', 'private', 'age-restricted']):
+        return 'Access Restricted Content'
+    if any(keyword in error_message for keyword in ['timeout', 'network', 'connection', 'unreachable', 'dns', 'resolve', 'internet', 'getaddrinfo failed']):
+        return 'Network Connection Issue'
+    if any(keyword in error_message for keyword in ['server', '500', '502', '503', '504', 'unavailable', 'service unavailable']):
+        return 'Server Temporarily Unavailable'
+    return 'Unexpected Issue'
+
+
+def http_error(status):
+    return HTTPError(Response(None, 'https://example.com/video', {}, status=status))
+
+
+def make_exceptions():
+    """Exceptions shaped the way yt-dlp raises them: a DownloadError around the cause"""
+    causes = [
+        ExtractorError('Unable to download webpage', cause=http_error(404)),
+        ExtractorError('Unable to download webpage', cause=http_error(503)),
+        ExtractorError('Unable to download API page', cause=http_error(429)),
+        ExtractorError('Unable to download JSON metadata', cause=http_error(403)),
+        UnsupportedError('https://example.com/about'),
+        GeoRestrictedError('The uploader has not made this video available in your country'),
+        PostProcessingError('Conversion failed!'),
+        TransportError('Temporary failure in name resolution'),
+        OSError(28, 'No space left on device'),
+        ExtractorError('Video unavailable. This video is private', expected=True),
+    ]
+    return [DownloadError(f'ERROR: {cause}', (type(cause), cause, None)) for cause in causes]
+
+
+def per_call_us(function, items, iterations):
+    started = time.perf_counter()
+    for index in range(iterations):
+        function(items[index % len(items)])
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Error classification cost per call")
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    ErrorClassifier.configure()
+    results = {
+        'legacy_scan_us': per_call_us(legacy_classify, CORPUS, args.iterations),
+        'single_pass_us': per_call_us(ErrorClassifier.match, CORPUS, args.iterations),
+        'cached_message_us': per_call_us(ErrorClassifier.classify_error, CORPUS, args.iterations),
+    }
+    # Fresh exceptions, so every call goes through the type and status checks; then the same ones again
+    exceptions = [error for _ in range(max(1, args.iterations // 10)) for error in make_exceptions()]
+    results['exception_us'] = per_call_us(ErrorClassifier.classify_error, exceptions, len(exceptions))
+    results['memoized_exception_us'] = per_call_us(ErrorClassifier.classify_error, exceptions, len(exceptions))
+    exceptions = make_exceptions()
+
+    for name, value in results.items():
+        print(f"{name:<24}{value:>10.2f} us")
+
+    disagreements = []
+    for message in CORPUS:
+        old, new = legacy_classify(message), ErrorClassifier.match(message)['category']
+        if old != new:
+            disagreements.append({'message': message, 'legacy': old, 'single_pass': new})
+    print(f"\n{len(CORPUS) - len(disagreements)}/{len(CORPUS)} messages classified the same as the legacy scans")
+    for entry in disagreements:
+        print(f"  {entry['legacy']} -> {entry['single_pass']}: {entry['message'][:90]}")
+
+    print("\nExceptions:")
+    for error in exceptions:
+        print(f"  {ErrorClassifier.classify_error(error)['category']:<32}{str(error)[:70]}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'iterations': args.iterations, 'corpus_size': len(CORPUS), 'results': results,
+                       'disagreements': disagreements}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
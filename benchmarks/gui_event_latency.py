@@ -0,0 +1,187 @@
+# Benchmark: GUI event-loop latency while concurrent jobs report progress
+#
+#   legacy  - every chunk callback emits yt-dlp's whole hook dict (info_dict included)
+#             and the GUI slot string-parses _percent_str, as DownloadThread used to
+#   compact - the real DownloadThread coalesces chunks into ProgressEvent records
+#             and the real DownloaderApp.update_progress renders them
+#
+# A 10 ms QTimer on the GUI thread measures how late the event loop runs.
+#
+#   python benchmarks/gui_event_latency.py [--jobs 10] [--seconds 5] [--json results.json]
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QThread, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication, QLabel, QProgressBar
+
+from app import Downloader, DownloadThread, DownloaderApp
+
+PROBE_INTERVAL_MS = 10
+
+
+def make_hook_dict(downloaded, total):
+    """A progress dict shaped like yt-dlp's, including a realistic info_dict"""
+    formats = [{'format_id': str(i), 'url': f'https://cdn.example.com/{i}/' + 'x' * 200,
+                'height': 144 * (i % 8 + 1), 'tbr': 100.0 * i, 'ext': 'mp4',
+                'http_headers': {'User-Agent': 'Mozilla/5.0', 'Accept': '*/*'}} for i in range(150)]
+    percent = downloaded * 100.0 / total
+    return {
+        'status': 'downloading',
+        'downloaded_bytes': downloaded,
+        'total_bytes': total,
+        'speed': 4.2 * 1024 * 1024,
+        'eta': 12,
+        'filename': '/downloads/Some fairly long video title [abc123].f137.mp4',
+        'info_dict': {'id': 'abc123', 'title': 'Some fairly long video title', 'formats': formats},
+        '_percent_str': f'{percent:5.1f}%',
+        '_speed_str': '4.20MiB/s',
+        '_eta_str': '00:12',
+    }
+
+
+class SyntheticDownloader(Downloader):
+    """Calls the progress hook at yt-dlp-like chunk rates instead of downloading"""
+
+    def __init__(self, seconds, chunk_interval):
+        super().__init__()
+        self.seconds = seconds
+        self.chunk_interval = chunk_interval
+
+    def download_media(self, url, download_type, settings=None, selected_videos=None):
+        total = 500 * 1024 * 1024
+        hook_dict = make_hook_dict(0, total)
+        end = time.monotonic() + self.seconds
+        downloaded = 0
+        while time.monotonic() < end:
+            downloaded = min(total, downloaded + 64 * 1024)
+            d = dict(hook_dict, downloaded_bytes=downloaded, _percent_str=f'{downloaded * 100.0 / total:5.1f}%')
+            self._yt_dlp_progress_hook(d)
+            time.sleep(self.chunk_interval)
+        return "Download complete!"
+
+
+class LegacyThread(QThread):
+    progress_signal = pyqtSignal(dict)
+
+    def __init__(self, downloader):
+        super().__init__()
+        self.downloader = downloader
+        self.downloader.set_progress_hook(self.progress_signal.emit)
+
+    def run(self):
+        self.downloader.download_media('', 'video')
+
+
+class ProgressView:
+    """Just the widgets update_progress touches"""
+
+    def __init__(self):
+        self.status_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.total_downloads = 1
+        self.events = 0
+
+
+def legacy_update_progress(view, d):
+    view.events += 1
+    if d['status'] == 'downloading':
+        try:
+            percent = float(d.get('_percent_str', '0%').strip().replace('%', ''))
+            view.progress_bar.setValue(int(percent))
+            filename = os.path.basename(d.get('filename', 'Unknown File'))
+            if len(filename) > 50:
+                filename = filename[:25] + "..." + filename[-25:]
+            view.status_label.setText(
+                f"Downloading: {filename} - {d['_percent_str']} ({d.get('_speed_str', 'N/A')}) - ETA: {d.get('_eta_str', 'N/A')}")
+        except ValueError:
+            pass
+
+
+def compact_update_progress(view, event):
+    view.events += 1
+    DownloaderApp.update_progress(view, event)
+
+
+def run_mode(app, mode, jobs, seconds, chunk_interval):
+    view = ProgressView()
+    threads = []
+    for job_id in range(jobs):
+        downloader = SyntheticDownloader(seconds, chunk_interval)
+        if mode == 'legacy':
+            thread = LegacyThread(downloader)
+            thread.progress_signal.connect(lambda d: legacy_update_progress(view, d))
+        else:
+            thread = DownloadThread(downloader, '', 'video', {}, job_id=job_id)
+            thread.progress_signal.connect(lambda event: compact_update_progress(view, event))
+        threads.append(thread)
+
+    lateness = []
+    last = [time.monotonic()]
+
+    def probe():
+        now = time.monotonic()
+        lateness.append(max(0.0, (now - last[0]) * 1000 - PROBE_INTERVAL_MS))
+        last[0] = now
+
+    timer = QTimer()
+    timer.timeout.connect(probe)
+    timer.start(PROBE_INTERVAL_MS)
+
+    remaining = [len(threads)]
+
+    def thread_done():
+        remaining[0] -= 1
+        if not remaining[0]:
+            # Let queued progress events drain before stopping
+            QTimer.singleShot(50, app.quit)
+
+    for thread in threads:
+        thread.finished.connect(thread_done)
+        thread.start()
+
+    started = time.monotonic()
+    app.exec()
+    elapsed = time.monotonic() - started
+    timer.stop()
+
+    lateness.sort()
+    return {
+        'events_delivered': view.events,
+        'events_per_sec': view.events / elapsed,
+        'mean_lateness_ms': sum(lateness) / len(lateness) if lateness else 0.0,
+        'p95_lateness_ms': lateness[int(0.95 * (len(lateness) - 1))] if lateness else 0.0,
+        'max_lateness_ms': lateness[-1] if lateness else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GUI event-loop latency under concurrent progress updates")
+    parser.add_argument('--jobs', type=int, default=10)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--chunk-ms', type=float, default=2.0, help='Interval between chunk callbacks per job')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    results = {}
+    print(f"{args.jobs} jobs, one chunk callback every {args.chunk_ms} ms per job, {args.seconds}s")
+    print(f"{'mode':<9}{'events/s':>10}{'mean (ms)':>12}{'p95 (ms)':>12}{'max (ms)':>12}")
+    for mode in ('legacy', 'compact'):
+        stats = run_mode(app, mode, args.jobs, args.seconds, args.chunk_ms / 1000.0)
+        results[mode] = stats
+        print(f"{mode:<9}{stats['events_per_sec']:>10.0f}{stats['mean_lateness_ms']:>12.2f}"
+              f"{stats['p95_lateness_ms']:>12.2f}{stats['max_lateness_ms']:>12.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Benchmark: cost of submitting and tracking jobs through the local job API
+#
+# Runs a JobApi over a DownloadManager with no free slots (max_concurrent 0),
+# so nothing downloads and only the API and scheduler are measured. A client
+# thread posts --urls URLs in batches of each --batch-sizes, then times
+# GET /status and GET /jobs against the full queue, and measures how long an
+# event takes to reach an /events client.
+#
+#   python benchmarks/job_api.py [--urls 5000] [--batch-sizes 1,100,1000] [--json job_api.json]
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from PyQt6.QtCore import QCoreApplication
+
+from app import Downloader, DownloadManager, JobApi
+
+
+def submit_all(base, urls, batch_size):
+    session = requests.Session()
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(urls), batch_size):
+        request_started = time.perf_counter()
+        response = session.post(base + '/jobs', json={'urls': urls[start:start + batch_size]})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - request_started)
+    wall = time.perf_counter() - started
+    return {'batch_size': batch_size, 'urls_per_s': len(urls) / wall,
+            'request_ms_median': statistics.median(latencies) * 1000}
+
+
+def time_get(base, path, repeat=20):
+    session = requests.Session()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        session.get(base + path).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return statistics.median(latencies) * 1000
+
+
+def event_latency(base, repeat=20):
+    """Time from a POST to its 'cancelled' event arriving on /events"""
+    received = {}
+    ready = threading.Event()
+
+    def listen():
+        with requests.get(base + '/events', stream=True) as response:
+            ready.set()
+            for line in response.iter_lines(chunk_size=1):
+                if line.startswith(b'data:'):
+                    data = json.loads(line[5:])
+                    if 'id' in data:
+                        received.setdefault(data['id'], time.perf_counter())
+                    if len(received) >= repeat:
+                        return
+
+    listener = threading.Thread(target=listen, daemon=True)
+    listener.start()
+    ready.wait()
+    time.sleep(0.2)
+    session = requests.Session()
+    sent = {}
+    for index in range(repeat):
+        job_id = session.post(base + '/jobs', json={'urls': [f'https://example.com/event/{index}']}).json()['job_ids'][0]
+        sent[job_id] = time.perf_counter()
+        session.post(base + f'/jobs/{job_id}/cancel', json={})
+    listener.join(timeout=10)
+    return statistics.median(received[job_id] - sent[job_id] for job_id in sent if job_id in received) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job API submission and query cost")
+    parser.add_argument('--urls', type=int, default=5000)
+    parser.add_argument('--batch-sizes', default='1,100,1000')
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    manager = DownloadManager(max_concurrent=0, policy='fifo')
+    api = JobApi(manager, Downloader(), port=0)
+    api.start()
+    base = f'http://127.0.0.1:{api.port}'
+    results = {'submit': []}
+
+    def client():
+        try:
+            for batch_size in [int(size) for size in args.batch_sizes.split(',')]:
+                urls = [f'https://example.com/b{batch_size}/{index}' for index in range(args.urls)]
+                results['submit'].append(submit_all(base, urls, batch_size))
+            results['queued_jobs'] = len(manager.registry)
+            results['status_ms'] = time_get(base, '/status')
+            results['list_jobs_ms'] = time_get(base, '/jobs', repeat=5)
+            results['event_latency_ms'] = event_latency(base)
+        finally:
+            app.quit()
+
+    threading.Thread(target=client, daemon=True).start()
+    app.exec()
+    api.stop()
+
+    print(f"{'batch size':>11}{'URLs/s':>10}{'ms/request':>12}")
+    for row in results['submit']:
+        print(f"{row['batch_size']:>11}{row['urls_per_s']:>10.0f}{row['request_ms_median']:>12.2f}")
+    print(f"\nWith {results['queued_jobs']} jobs queued: GET /status {results['status_ms']:.2f} ms, "
+          f"GET /jobs {results['list_jobs_ms']:.1f} ms; event delivery {results['event_latency_ms']:.2f} ms")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
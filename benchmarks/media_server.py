@@ -0,0 +1,303 @@
+# Local media server for download benchmarks
+#
+# Serves synthetic media over HTTP in three delivery styles, so yt-dlp's generic
+# extractor takes the same code paths it does for real sites:
+#
+#   /<profile>/progressive/<bytes>/<name>.mp4         one file, Range requests supported
+#   /<profile>/hls/<bytes>/<name>.m3u8                HLS media playlist of <name>/segN.ts
+#   /<profile>/dash/<bytes>/<name>.mpd                DASH manifest of <name>/segN.m4s
+#   /<profile>/channel/<name>/page<N>.json            one page of a channel's videos, newest first
+#
+# Payloads are deterministic pseudo-random bytes, not decodable media: the download
+# path never decodes, and skipping an ffmpeg encode step keeps runs reproducible on
+# machines without ffmpeg. The throttle profile limits every connection's rate and
+# adds first-byte latency; "flaky" also fails a share of requests with 503.
+#
+# Channels are lists of short progressive clips that grow when publish() is
+# called; there is no generic extractor for their pages, so benchmarks install
+# their own (see subscription_sync.py).
+#
+#   python benchmarks/media_server.py [--port 8000]
+import sys
+import json
+import time
+import random
+import datetime
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+BLOCK_SIZE = 1024 * 1024
+SEGMENT_SECONDS = 2
+SEGMENT_BYTES = 512 * 1024  # Segment size for HLS/DASH; the last one is shorter
+
+# name -> (bytes per second per connection or None, first-byte latency in seconds, error rate)
+PROFILES = {
+    'unlimited': (None, 0.0, 0.0),
+    'broadband': (8 * 1024 * 1024, 0.02, 0.0),
+    'mobile': (1024 * 1024, 0.1, 0.0),
+    'flaky': (4 * 1024 * 1024, 0.05, 0.05),
+}
+
+KINDS = ('progressive', 'hls', 'dash')
+
+CHANNEL_PAGE_SIZE = 30  # Videos per channel page, like a channel's Videos tab
+CHANNEL_CLIP_BYTES = 64 * 1024
+
+_BLOCK = random.Random(1234).randbytes(BLOCK_SIZE)
+
+
+def payload(start, end):
+    """Bytes [start, end) of the synthetic stream"""
+    chunks = []
+    position = start
+    while position < end:
+        offset = position % BLOCK_SIZE
+        length = min(BLOCK_SIZE - offset, end - position)
+        chunks.append(_BLOCK[offset:offset + length])
+        position += length
+    return b''.join(chunks)
+
+
+def segment_count(size):
+    return max(1, -(-size // SEGMENT_BYTES))
+
+
+def segment_range(size, index):
+    start = index * SEGMENT_BYTES
+    return start, min(size, start + SEGMENT_BYTES)
+
+
+def hls_playlist(size, name):
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', f'#EXT-X-TARGETDURATION:{SEGMENT_SECONDS}',
+             '#EXT-X-MEDIA-SEQUENCE:0', '#EXT-X-PLAYLIST-TYPE:VOD']
+    for index in range(segment_count(size)):
+        lines.append(f'#EXTINF:{SEGMENT_SECONDS}.0,')
+        lines.append(f'{name}/seg{index}.ts')
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def dash_manifest(size, name):
+    count = segment_count(size)
+    duration = count * SEGMENT_SECONDS
+    segments = '\n'.join(f'          <SegmentURL media="{name}/seg{index}.m4s"/>' for index in range(count))
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" profiles="urn:mpeg:dash:profile:isoff-main:2011"
+     mediaPresentationDuration="PT{duration}S" minBufferTime="PT2S">
+  <Period id="0" start="PT0S">
+    <AdaptationSet mimeType="video/mp4" segmentAlignment="true">
+      <Representation id="main" codecs="avc1.4d401f,mp4a.40.2" bandwidth="{size * 8 // duration}" width="1280" height="720">
+        <SegmentList timescale="1" duration="{SEGMENT_SECONDS}">
+          <Initialization sourceURL="{name}/init.mp4"/>
+{segments}
+        </SegmentList>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+'''
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like a real CDN
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if len(parts) == 4 and parts[0] in PROFILES and parts[1] == 'channel':
+            self.send_channel_page(parts[0], parts[2], parts[3], send_body)
+            return
+        if len(parts) < 4 or parts[0] not in PROFILES or parts[1] not in KINDS or not parts[2].isdigit():
+            self.send_error(404)
+            return
+        rate, latency, error_rate = PROFILES[parts[0]]
+        kind, size, rest = parts[1], int(parts[2]), parts[3:]
+
+        if latency:
+            time.sleep(latency)
+        with self.server.lock:
+            self.server.requests += 1
+            fail = error_rate and self.server.rng.random() < error_rate
+        if fail:
+            self.send_error(503)
+            return
+
+        if kind == 'progressive':
+            self.send_range(size, 'video/mp4', rate, send_body)
+        elif len(rest) == 1 and rest[0].endswith('.m3u8'):
+            self.send_text(hls_playlist(size, rest[0][:-5]), 'application/vnd.apple.mpegurl', send_body)
+        elif len(rest) == 1 and rest[0].endswith('.mpd'):
+            self.send_text(dash_manifest(size, rest[0][:-4]), 'application/dash+xml', send_body)
+        elif rest[-1] == 'init.mp4':
+            self.send_bytes(payload(0, 1024), 'video/mp4', rate, send_body)
+        elif rest[-1].startswith('seg'):
+            index = rest[-1][3:].split('.')[0]
+            if not index.isdigit() or int(index) >= segment_count(size):
+                self.send_error(404)
+                return
+            start, end = segment_range(size, int(index))
+            content_type = 'video/mp2t' if rest[-1].endswith('.ts') else 'video/iso.segment'
+            self.send_bytes(payload(start, end), content_type, rate, send_body)
+        else:
+            self.send_error(404)
+
+    def send_channel_page(self, profile, name, page, send_body):
+        with self.server.lock:
+            self.server.requests += 1
+            count = self.server.channels.get(name)
+        number = page[4:-5] if page.startswith('page') and page.endswith('.json') else ''
+        if count is None or not number.isdigit():
+            self.send_error(404)
+            return
+        latency = PROFILES[profile][1]
+        if latency:
+            time.sleep(latency)
+        newest = count - int(number) * CHANNEL_PAGE_SIZE  # Video numbers count up from 1, oldest first
+        entries = []
+        for index in range(newest, max(0, newest - CHANNEL_PAGE_SIZE), -1):
+            video = f'{name}-v{index}'
+            day = datetime.date(2020, 1, 1) + datetime.timedelta(days=index)
+            entries.append({'id': video, 'title': f'{name} video {index}', 'upload_date': day.strftime('%Y%m%d'),
+                            'url': f'{self.server.base_url}/{profile}/progressive/{CHANNEL_CLIP_BYTES}/{video}.mp4'})
+        self.send_text(json.dumps({'entries': entries, 'more': newest - CHANNEL_PAGE_SIZE > 0}),
+                       'application/json', send_body)
+
+    def send_text(self, text, content_type, send_body):
+        self.send_bytes(text.encode('utf-8'), content_type, None, send_body)
+
+    def send_range(self, size, content_type, rate, send_body):
+        start, end = 0, size
+        header = self.headers.get('Range', '')
+        if header.startswith('bytes='):
+            first, _, last = header[6:].split(',')[0].partition('-')
+            start = int(first) if first else max(0, size - int(last))
+            end = min(size, int(last) + 1) if first and last else size
+            if start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        if send_body:
+            self.write_throttled(start, end, rate)
+
+    def send_bytes(self, data, content_type, rate, send_body):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if send_body:
+            self.write_throttled(0, len(data), rate, data)
+
+    def write_throttled(self, start, end, rate, data=None):
+        chunk = 64 * 1024
+        began = time.monotonic()
+        sent = 0
+        try:
+            for position in range(start, end, chunk):
+                stop = min(end, position + chunk)
+                block = data[position:stop] if data is not None else payload(position, stop)
+                self.wfile.write(block)
+                sent += len(block)
+                if rate:
+                    ahead = sent / rate - (time.monotonic() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (cancel or retry); nothing to clean up
+        with self.server.lock:
+            self.server.bytes_sent += sent
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)  # Clients dropping keep-alive sockets is normal
+
+
+class MediaServer:
+    """The media server on a background thread; port 0 picks a free port"""
+
+    def __init__(self, host='127.0.0.1', port=0, seed=0):
+        self.httpd = _QuietHTTPServer((host, port), MediaRequestHandler)
+        self.httpd.lock = threading.Lock()
+        self.httpd.rng = random.Random(seed)
+        self.httpd.requests = 0
+        self.httpd.bytes_sent = 0
+        self.httpd.channels = {}  # name -> number of videos
+        self.httpd.base_url = self.base_url
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, kind, size, name, profile='unlimited'):
+        if kind == 'progressive':
+            return f'{self.base_url}/{profile}/progressive/{size}/{name}.mp4'
+        if kind == 'hls':
+            return f'{self.base_url}/{profile}/hls/{size}/{name}.m3u8'
+        return f'{self.base_url}/{profile}/dash/{size}/{name}.mpd'
+
+    def channel_url(self, name, profile='unlimited'):
+        return f'{self.base_url}/{profile}/channel/{name}'
+
+    def publish(self, name, count=1):
+        """Add count new videos to the top of a channel, creating it if needed"""
+        with self.httpd.lock:
+            self.httpd.channels[name] = self.httpd.channels.get(name, 0) + count
+
+    def stats(self):
+        with self.httpd.lock:
+            return {'requests': self.httpd.requests, 'bytes_sent': self.httpd.bytes_sent}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='media-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic progressive, HLS and DASH media")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = MediaServer(args.host, args.port).start()
+    print(f"Serving on {server.base_url} (profiles: {', '.join(PROFILES)})")
+    for kind in KINDS:
+        print(f"  {server.url(kind, 20 * 1024 * 1024, 'sample', 'broadband')}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
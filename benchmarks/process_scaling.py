@@ -0,0 +1,148 @@
+# Benchmark: how download throughput scales with workers, as threads and as worker processes
+#
+# Runs the same batch through DownloadManager at 1, 2, 4 ... --max-workers parallel
+# jobs, once with download threads in this process and once with a WorkerPool of
+# that many processes. The batch is many short HLS clips from the local media
+# server with no throttling, so the time goes to extraction, fragment handling and
+# progress hooks - the pure-Python work that threads serialize on the GIL.
+# Each run is preceded by a warm-up batch so process start-up and first imports
+# aren't counted.
+#
+#   python benchmarks/process_scaling.py [--jobs 24] [--max-workers 8] [--size-mb 2]
+#       [--kind hls] [--modes threads,processes] [--json process_scaling.json]
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QCoreApplication
+
+from app import Downloader, DownloadManager, WorkerPool
+from media_server import MediaServer, KINDS
+from download_throughput import environment
+
+MB = 1024 * 1024
+
+
+def cpu_seconds(pid):
+    """User plus system CPU time of a process, or None when it can't be read"""
+    try:
+        import psutil
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def total_cpu(pids):
+    times = [cpu_seconds(pid) for pid in pids]
+    return None if None in times else sum(times)
+
+
+def worker_counts(maximum):
+    counts = []
+    count = 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    return counts + [maximum]
+
+
+def run_batch(app, manager, urls, output_path):
+    failed = []
+    manager.job_failed.connect(lambda job_id, message: failed.append(job_id))
+    manager.queue_drained.connect(app.quit)
+    downloader = Downloader(output_path)
+    for url in urls:
+        manager.add_download(downloader, url, 'video', {'max_retries': 5})
+    started = time.monotonic()
+    manager.pump()
+    app.exec()
+    manager.queue_drained.disconnect()
+    manager.job_failed.disconnect()
+    return time.monotonic() - started, len(failed)
+
+
+def run_scenario(app, server, mode, workers, args):
+    manager = DownloadManager(max_concurrent=workers, policy='fifo')
+    if mode == 'processes':
+        manager.worker_pool = WorkerPool(workers)
+    output_path = tempfile.mkdtemp(prefix='mediadl-scaling-')
+    stamp = int(time.time() * 1000)
+    size = int(args.size_mb * MB)
+    try:
+        run_batch(app, manager, [server.url(args.kind, size, f'warm_{stamp}_{index}') for index in range(workers)],
+                  output_path)
+        # This process plus the workers, which all started during the warm-up
+        pids = [os.getpid()] + (manager.worker_pool.pids() if manager.worker_pool is not None else [])
+        cpu_started = total_cpu(pids)
+        wall, failed = run_batch(app, manager, [server.url(args.kind, size, f'job_{stamp}_{index}')
+                                                for index in range(args.jobs)], output_path)
+        cpu_finished = total_cpu(pids)
+    finally:
+        if manager.worker_pool is not None:
+            manager.worker_pool.shutdown()
+        shutil.rmtree(output_path, ignore_errors=True)
+    cpu = cpu_finished - cpu_started if cpu_started is not None and cpu_finished is not None else None
+    return {
+        'mode': mode,
+        'workers': workers,
+        'jobs': args.jobs,
+        'failed': failed,
+        'wall_s': wall,
+        'jobs_per_s': args.jobs / wall if wall else 0.0,
+        'cpu_s': cpu,
+        'cores_busy': cpu / wall if cpu is not None and wall else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput scaling of thread and worker-process modes")
+    parser.add_argument('--jobs', type=int, default=24, help='Downloads per run')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--size-mb', type=float, default=2.0, help='Size of each clip in MiB')
+    parser.add_argument('--kind', default='hls', choices=KINDS)
+    parser.add_argument('--modes', default='threads,processes')
+    parser.add_argument('--json', default='process_scaling.json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    server = MediaServer().start()
+    results = []
+    print(f"{args.jobs} x {args.size_mb:g} MiB {args.kind} clips, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<11}{'workers':>8}{'jobs/s':>9}{'speedup':>9}{'wall s':>9}{'cores busy':>12}{'failed':>8}")
+    try:
+        for mode in args.modes.split(','):
+            baseline = None
+            for workers in worker_counts(args.max_workers):
+                result = run_scenario(app, server, mode, workers, args)
+                baseline = baseline or result['jobs_per_s']
+                result['speedup'] = result['jobs_per_s'] / baseline if baseline else None
+                results.append(result)
+                busy = f"{result['cores_busy']:.2f}" if result['cores_busy'] is not None else 'n/a'
+                print(f"{mode:<11}{workers:>8}{result['jobs_per_s']:>9.2f}{result['speedup']:>9.2f}"
+                      f"{result['wall_s']:>9.1f}{busy:>12}{result['failed']:>8}", flush=True)
+    finally:
+        server.stop()
+
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# Benchmark: end-to-end download_media and playlist handling replayed from a fixture bundle
+#
+# Record once against real sites (or the local media server), then replay the same
+# run offline as often as needed. Replay is deterministic: extraction runs for real
+# against the recorded responses, so extractor overhead regressions show up, while
+# network timing is reproduced from the recording (or skipped with --speed 0).
+#
+#   python benchmarks/replay_downloads.py record --bundle fixtures/run1 URL [URL ...]
+#   python benchmarks/replay_downloads.py replay --bundle fixtures/run1 [--speed 0] [--repeat 5]
+#   python benchmarks/replay_downloads.py demo      # record from the local media server, then replay it
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Downloader, FixtureBundle
+
+MB = 1024 * 1024
+
+
+def download_all(urls, download_type):
+    """download_media for each URL into a scratch folder"""
+    output_path = tempfile.mkdtemp(prefix='mediadl-replay-')
+    downloader = Downloader(output_path)
+    failed = 0
+    started = time.monotonic()
+    cpu_started = time.process_time()
+    try:
+        for url in urls:
+            if not downloader.download_media(url, download_type).startswith("Download complete"):
+                failed += 1
+        size = sum(os.path.getsize(os.path.join(folder, name))
+                   for folder, _, names in os.walk(output_path) for name in names)
+    finally:
+        shutil.rmtree(output_path, ignore_errors=True)
+    return {
+        'urls': len(urls),
+        'failed': failed,
+        'wall_s': time.monotonic() - started,
+        'cpu_s': time.process_time() - cpu_started,
+        'bytes': size,
+    }
+
+
+def list_playlists(bundle):
+    """Replay the flat playlist listing for every recorded playlist"""
+    downloader = Downloader()
+    started = time.monotonic()
+    playlists = [url for url in bundle.urls() if (bundle.info(url) or {}).get('_type') == 'playlist']
+    for url in playlists:
+        downloader.extract_playlist_info(url)
+    return {'playlists': len(playlists), 'wall_s': time.monotonic() - started}
+
+
+def record(args):
+    bundle = FixtureBundle(args.bundle, 'record')
+    bundle.install()
+    stats = download_all(args.urls, args.type)
+    with open(os.path.join(args.bundle, 'run.json'), 'w') as f:
+        json.dump({'type': args.type, 'urls': args.urls}, f, indent=2)
+    print(f"Recorded {stats['urls']} URL(s), {stats['bytes'] / MB:.1f} MiB in {stats['wall_s']:.1f}s to {args.bundle}")
+    return stats
+
+
+def replay(args):
+    bundle = FixtureBundle(args.bundle, 'replay', speed=args.speed)
+    bundle.install()
+    with open(os.path.join(args.bundle, 'run.json')) as f:
+        run = json.load(f)
+    results = []
+    print(f"{'run':>4}{'wall s':>10}{'CPU s':>10}{'MiB':>10}{'failed':>8}")
+    for index in range(args.repeat):
+        bundle.rewind()  # Each repetition replays the recording from the start
+        stats = download_all(run['urls'], run['type'])
+        stats['playlist_listing'] = list_playlists(bundle)
+        results.append(stats)
+        print(f"{index + 1:>4}{stats['wall_s']:>10.2f}{stats['cpu_s']:>10.2f}{stats['bytes'] / MB:>10.1f}{stats['failed']:>8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'bundle': args.bundle, 'speed': args.speed, 'runs': results}, f, indent=2)
+    return results
+
+
+def demo(args):
+    from media_server import MediaServer
+    server = MediaServer().start()
+    args.urls = [server.url(kind, 4 * MB, f'demo_{kind}', 'broadband') for kind in ('progressive', 'hls', 'dash')]
+    args.bundle = args.bundle or tempfile.mkdtemp(prefix='mediadl-fixtures-')
+    record(args)
+    server.stop()  # Replay must not need it
+    print(f"\nReplaying with the server stopped, speed {args.speed}")
+    replay(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay downloads for offline performance tests")
+    parser.add_argument('mode', choices=['record', 'replay', 'demo'])
+    parser.add_argument('urls', nargs='*')
+    parser.add_argument('--bundle', help='Fixture bundle directory')
+    parser.add_argument('--type', default='video', choices=['video', 'audio', 'playlist'])
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='Replay speed: 1 keeps the recorded timing, 10 is ten times faster, 0 skips delays')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='Write replay results to this file')
+    args = parser.parse_args()
+
+    if args.mode == 'demo':
+        demo(args)
+    elif not args.bundle:
+        parser.error('--bundle is required')
+    elif args.mode == 'record':
+        if not args.urls:
+            parser.error('record needs at least one URL')
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+# Benchmark: interactive downloads while a bulk archive is queued, with and without a daytime window
+#
+# Queues --bulk large clips at bulk priority, then adds --interactive small
+# clips one every --interval seconds, the way someone grabbing a video during
+# the working day would, and runs that three ways:
+#
+#   none     - no schedule: bulk jobs hold every slot and take all the bandwidth
+#   capped   - a window with a --cap-kib bandwidth cap but every job class allowed
+#   daytime  - the same cap, and bulk jobs held until the window closes
+#
+# Reports how long each interactive download took from being added to
+# finishing, the average and peak bandwidth (what other users of the network
+# would feel) over any two-second span, and how much of the archive moved
+# meanwhile.
+#
+#   python benchmarks/schedule_windows.py [--bulk 12] [--bulk-mib 32] [--interactive 5] [--interval 1]
+#       [--concurrency 4] [--cap-kib 8192] [--profile broadband] [--json schedule_windows.json]
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+from app import Downloader, DownloadManager, MetricsRegistry, ScheduleProfiles
+from media_server import MediaServer, PROFILES
+from download_throughput import environment
+
+MB = 1024 * 1024
+BULK_PRIORITY = -1  # Below normal, so the schedule treats these as bulk jobs
+INTERACTIVE_BYTES = MB
+PEAK_SPAN = 2.0  # Seconds
+
+
+def bytes_downloaded():
+    samples = MetricsRegistry.instance().snapshot()['mediadl_bytes_downloaded_total']['samples']
+    return sum(sample['value'] for sample in samples)
+
+
+def run_mode(app, mode, server, args):
+    output_path = tempfile.mkdtemp(prefix='mediadl-schedule-')
+    manager = DownloadManager(max_concurrent=args.concurrency, policy='fifo')
+    schedule = ScheduleProfiles(manager)
+    if mode != 'none':
+        window = {'name': 'daytime', 'bandwidth_kib': args.cap_kib}
+        if mode == 'daytime':
+            window['classes'] = ['interactive']
+        schedule.configure([window])
+    downloader = Downloader(output_path)
+    settings = {'max_retries': 1}
+    for index in range(args.bulk):
+        manager.add_download(downloader, server.url('progressive', args.bulk_mib * MB, f'{mode}-bulk{index}', args.profile),
+                             'video', settings, priority=BULK_PRIORITY)
+    manager.pump()
+
+    submitted, latencies, samples = {}, [], []
+    started = time.perf_counter()
+    bytes_before = bytes_downloaded()
+
+    def submit(index):
+        url = server.url('progressive', INTERACTIVE_BYTES, f'{mode}-clip{index}', args.profile)
+        job_id = manager.add_download(downloader, url, 'video', settings)
+        submitted[job_id] = time.perf_counter()
+        manager.pump()
+
+    def finished(job_id, message):
+        if job_id in submitted:
+            latencies.append(time.perf_counter() - submitted[job_id])
+            if len(latencies) == args.interactive:
+                QTimer.singleShot(500, app.quit)
+
+    def sample():
+        samples.append((time.perf_counter(), bytes_downloaded()))
+
+    manager.job_finished.connect(finished)
+    manager.job_failed.connect(finished)
+    for index in range(args.interactive):
+        QTimer.singleShot(int((0.5 + index * args.interval) * 1000), partial(submit, index))
+    sampler = QTimer()
+    sampler.timeout.connect(sample)
+    sampler.start(100)
+    QTimer.singleShot(120000, app.quit)
+    app.exec()
+    sampler.stop()
+
+    wall = time.perf_counter() - started
+    peak = 0.0
+    for index, (when, total) in enumerate(samples):
+        later = [(t, b) for t, b in samples[index:] if t - when <= PEAK_SPAN]
+        if later[-1][0] - when >= PEAK_SPAN - 0.2:
+            peak = max(peak, (later[-1][1] - total) / (later[-1][0] - when))
+    received = bytes_downloaded() - bytes_before
+    moved = received - len(latencies) * INTERACTIVE_BYTES
+    threads = [download['thread'] for download in manager.active_downloads]
+    schedule.stop()
+    manager.cancel_all()
+    for thread in threads:
+        thread.wait(10000)
+    shutil.rmtree(output_path, ignore_errors=True)
+    return {
+        'mode': mode,
+        'interactive_median_s': statistics.median(latencies) if latencies else None,
+        'interactive_max_s': max(latencies) if latencies else None,
+        'average_mib_s': received / wall / MB,
+        'peak_mib_s': peak / MB,
+        'bulk_mib_moved': max(0, moved) / MB,
+        'wall_s': wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interactive downloads next to a bulk archive, with and without schedule windows")
+    parser.add_argument('--bulk', type=int, default=12, help='Bulk jobs queued first')
+    parser.add_argument('--bulk-mib', type=int, default=32, help='Size of each bulk job')
+    parser.add_argument('--interactive', type=int, default=5, help='1 MiB jobs added while the archive runs')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between interactive jobs')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--cap-kib', type=int, default=8192, help="The daytime window's bandwidth cap")
+    parser.add_argument('--profile', default='broadband', choices=list(PROFILES))
+    parser.add_argument('--modes', default='none,capped,daytime')
+    parser.add_argument('--json', default='schedule_windows.json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    server = MediaServer().start()
+    results = []
+    print(f"{args.bulk} bulk jobs of {args.bulk_mib} MiB, {args.interactive} interactive jobs of 1 MiB every "
+          f"{args.interval:g}s, {args.concurrency} slots, {args.profile} profile, cap {args.cap_kib} KiB/s")
+    print(f"{'mode':<9}{'interactive median s':>22}{'max s':>8}{'avg MiB/s':>11}{'peak MiB/s':>12}"
+          f"{'bulk MiB moved':>16}")
+    try:
+        for mode in args.modes.split(','):
+            result = run_mode(app, mode, server, args)
+            results.append(result)
+            median = result['interactive_median_s']
+            print(f"{mode:<9}{median if median is not None else float('nan'):>22.2f}"
+                  f"{result['interactive_max_s'] or float('nan'):>8.2f}{result['average_mib_s']:>11.1f}"
+                  f"{result['peak_mib_s']:>12.1f}"
+                  f"{result['bulk_mib_moved']:>16.0f}", flush=True)
+    finally:
+        server.stop()
+
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'args': vars(args), 'results': results}, f, indent=2)
+    print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
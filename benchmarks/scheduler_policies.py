@@ -0,0 +1,112 @@
+# Benchmark: mean and p95 job completion time for each DownloadManager policy
+#
+# Replays a synthetic batch (mostly short clips plus a few multi-GB lectures)
+# through DownloadManager's real job selection with a simulated clock, so the
+# numbers reflect the scheduler alone and not the network.
+#
+#   python benchmarks/scheduler_policies.py [--jobs 300] [--slots 3] [--json results.json]
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import DownloadManager
+
+MB = 1024 * 1024
+
+
+def make_workload(count, seed, arrival_rate=None):
+    """Jobs as (arrival_time, actual_size, estimated_size, group)"""
+    rng = random.Random(seed)
+    jobs = []
+    arrival = 0.0
+    for _ in range(count):
+        if rng.random() < 0.05:
+            size = rng.uniform(1024, 4096) * MB  # Long lecture
+        else:
+            size = rng.uniform(2, 20) * MB  # Short clip
+        if rng.random() < 0.1:
+            estimate = None  # Pre-extraction failed or hasn't finished
+        else:
+            estimate = size * rng.lognormvariate(0, 0.3)  # filesize_approx is only approximate
+        if arrival_rate:
+            arrival += rng.expovariate(arrival_rate)
+        jobs.append((arrival, size, estimate, rng.choice(['cdn-a', 'cdn-b', 'cdn-c'])))
+    return jobs
+
+
+def simulate(policy, workload, slots, rate, overhead):
+    manager = DownloadManager(max_concurrent=slots, policy=policy)
+    pending = sorted(workload, key=lambda job: job[0])
+    running = []  # (finish_time, job)
+    completion_times = []
+    now = 0.0
+
+    while pending or manager.has_pending_downloads():
+        while pending and pending[0][0] <= now:
+            arrival, size, estimate, group = pending.pop(0)
+            job = manager.get_job(manager.add_download(None, '', 'video', group=group))
+            job.update(enqueued_at=arrival, estimated_size=estimate, actual_size=size)
+
+        while len(manager.active_downloads) < slots and manager.has_pending_downloads():
+            job = manager.pop_next_job(now=now)
+            if job is None:
+                break
+            entry = {'thread': None, 'info': job}
+            manager.active_downloads.append(entry)
+            running.append((now + overhead + job['actual_size'] / rate, entry))
+
+        next_events = [finish for finish, _ in running]
+        if pending:
+            next_events.append(pending[0][0])
+        now = min(next_events)
+
+        for finish, entry in [item for item in running if item[0] <= now]:
+            running.remove((finish, entry))
+            manager.active_downloads.remove(entry)
+            completion_times.append(finish - entry['info']['enqueued_at'])
+
+    completion_times.sort()
+    p95 = completion_times[min(len(completion_times) - 1, int(0.95 * len(completion_times)))]
+    return {
+        'mean_s': sum(completion_times) / len(completion_times),
+        'p95_s': p95,
+        'max_s': completion_times[-1],
+        'makespan_s': now,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DownloadManager scheduling policies")
+    parser.add_argument('--jobs', type=int, default=300)
+    parser.add_argument('--slots', type=int, default=3)
+    parser.add_argument('--rate-mb', type=float, default=5.0, help='Per-job download speed in MB/s')
+    parser.add_argument('--overhead', type=float, default=2.0, help='Per-job extraction overhead in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    scenarios = {
+        'pasted batch': make_workload(args.jobs, args.seed),
+        'steady arrivals': make_workload(args.jobs, args.seed, arrival_rate=0.05),
+    }
+    results = {}
+    for name, workload in scenarios.items():
+        print(f"\n{name} ({len(workload)} jobs, {args.slots} slots)")
+        print(f"{'policy':<8}{'mean (s)':>12}{'p95 (s)':>12}{'max (s)':>12}{'makespan (s)':>15}")
+        results[name] = {}
+        for policy in DownloadManager.POLICIES:
+            stats = simulate(policy, workload, args.slots, args.rate_mb * MB, args.overhead)
+            results[name][policy] = stats
+            print(f"{policy:<8}{stats['mean_s']:>12.1f}{stats['p95_s']:>12.1f}{stats['max_s']:>12.1f}{stats['makespan_s']:>15.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+# Benchmark: throughput of several download nodes sharing one SharedJobQueue
+#
+# Starts 1, 2, 4 ... --max-nodes node processes, each running its own
+# DownloadManager (--concurrency slots) fed from one SQLite queue file, then
+# submits a batch of clips from the local media server and times until every
+# job is archived. The mobile profile caps each connection, so throughput
+# should grow with the number of nodes. After each run the downloaded files
+# are counted per URL to check that no job was downloaded twice.
+#
+# --kill-after N kills one node N seconds into each multi-node run, to show
+# its leases running out and the other nodes taking the jobs over.
+#
+#   python benchmarks/shared_queue.py [--jobs 24] [--max-nodes 4] [--concurrency 2]
+#       [--size-mb 2] [--profile mobile] [--lease 10] [--kill-after 3] [--json shared_queue.json]
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from media_server import MediaServer, PROFILES, KINDS
+from download_throughput import environment
+
+MB = 1024 * 1024
+
+
+def run_node(args):
+    """One node: a DownloadManager fed from the shared queue until the batch is done"""
+    from PyQt6.QtCore import QCoreApplication, QTimer
+    from app import Downloader, DownloadManager, MetricsRegistry, SharedJobQueue, SharedQueueFeeder
+
+    app = QCoreApplication(sys.argv)
+    manager = DownloadManager(max_concurrent=args.concurrency, policy='fifo')
+    shared_queue = SharedJobQueue(args.db, args.name, args.lease)
+    feeder = SharedQueueFeeder(shared_queue, manager, Downloader(args.output), {'max_retries': 5},
+                               poll_interval=0.5)
+    probe = SharedJobQueue(args.db, args.name)  # Separate connection; the feeder's belongs to its thread
+
+    def check_done():
+        counts = probe.counts()
+        if counts['archived'] + counts.get('failed', 0) >= args.expect and not manager.has_pending_downloads():
+            app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(check_done)
+    timer.start(250)
+    feeder.start()
+    print('ready', flush=True)
+    app.exec()
+    feeder.stop()
+    samples = MetricsRegistry.instance().snapshot()['mediadl_shared_jobs_total']['samples']
+    events = {sample['labels']['event']: sample['value'] for sample in samples}
+    print(json.dumps({'node': args.name, 'events': events}), flush=True)
+
+
+def count_files(folders):
+    """Finished media files per name across the node output folders"""
+    counts = {}
+    for folder in folders:
+        for name in os.listdir(folder):
+            if name.endswith(('.part', '.ytdl')) or '.part-' in name:
+                continue
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def run_scenario(server, nodes, args):
+    workdir = tempfile.mkdtemp(prefix='mediadl-shared-')
+    db = os.path.join(workdir, 'queue.sqlite')
+    outputs = [os.path.join(workdir, f'node{index}') for index in range(nodes)]
+    stamp = int(time.time() * 1000)
+    urls = [server.url(args.kind, int(args.size_mb * MB), f'job_{stamp}_{index}', args.profile)
+            for index in range(args.jobs)]
+    processes = []
+    try:
+        for index, output in enumerate(outputs):
+            os.makedirs(output)
+            processes.append(subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), 'node', '--db', db, '--name', f'node{index}',
+                 '--output', output, '--concurrency', str(args.concurrency), '--lease', str(args.lease),
+                 '--expect', str(args.jobs)],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd=ROOT))
+        for process in processes:
+            process.stdout.readline()  # 'ready': start-up isn't part of the timing
+
+        from app import SharedJobQueue
+        shared_queue = SharedJobQueue(db, 'submitter')
+        started = time.monotonic()
+        shared_queue.submit(urls, 'video', {'max_retries': 5})
+        killed = None
+        if args.kill_after and nodes > 1:
+            time.sleep(args.kill_after)
+            killed = processes[0]
+            killed.send_signal(signal.SIGKILL)
+        summaries = []
+        for process in processes:
+            output, _ = process.communicate()
+            summaries += [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+        wall = time.monotonic() - started
+        counts = shared_queue.counts()
+        shared_queue.close()
+        files = count_files(outputs)
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    events = {}
+    for summary in summaries:
+        for event, value in summary['events'].items():
+            events[event] = events.get(event, 0) + value
+    return {
+        'nodes': nodes,
+        'concurrency': args.concurrency,
+        'jobs': args.jobs,
+        'archived': counts['archived'],
+        'failed': counts.get('failed', 0),
+        'wall_s': wall,
+        'jobs_per_s': args.jobs / wall if wall else 0.0,
+        'duplicates': sum(count - 1 for count in files.values()),
+        'killed_node': killed is not None,
+        'events': events,
+    }
+
+
+def node_counts(maximum):
+    counts = []
+    count = 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    return counts + [maximum]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'node':
+        parser = argparse.ArgumentParser()
+        parser.add_argument('mode')
+        parser.add_argument('--db', required=True)
+        parser.add_argument('--name', required=True)
+        parser.add_argument('--output', required=True)
+        parser.add_argument('--concurrency', type=int, default=2)
+        parser.add_argument('--lease', type=float, default=10.0)
+        parser.add_argument('--expect', type=int, required=True)
+        run_node(parser.parse_args())
+        return
+
+    parser = argparse.ArgumentParser(description="Throughput of download nodes sharing one job queue")
+    parser.add_argument('--jobs', type=int, default=24)
+    parser.add_argument('--max-nodes', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=2, help='Download slots per node')
+    parser.add_argument('--size-mb', type=float, default=2.0, help='Size of each clip in MiB')
+    parser.add_argument('--kind', default='progressive', choices=KINDS)
+    parser.add_argument('--profile', default='mobile', choices=list(PROFILES))
+    parser.add_argument('--lease', type=float, default=10.0, help='Lease length in seconds')
+    parser.add_argument('--kill-after', type=float, default=0.0,
+                        help='Kill one node this many seconds into each multi-node run')
+    parser.add_argument('--json', default='shared_queue.json', help='Write results to this file')
+    args = parser.parse_args()
+
+    server = MediaServer().start()
+    results = []
+    print(f"{args.jobs} x {args.size_mb:g} MiB {args.kind} clips, {args.profile} profile, "
+          f"{args.concurrency} slot(s) per node")
+    print(f"{'nodes':>6}{'jobs/s':>9}{'speedup':>9}{'wall s':>9}{'archived':>10}{'failed':>8}"
+          f"{'reassigned':>12}{'duplicates':>12}")
+    try:
+        baseline = None
+        for nodes in node_counts(args.max_nodes):
+            result = run_scenario(server, nodes, args)
+            baseline = baseline or result['jobs_per_s']
+            result['speedup'] = result['jobs_per_s'] / baseline if baseline else None
+            results.append(result)
+            reassigned = result['events'].get('reassigned', 0)
+            print(f"{nodes:>6}{result['jobs_per_s']:>9.2f}{result['speedup']:>9.2f}{result['wall_s']:>9.1f}"
+                  f"{result['archived']:>10}{result['failed']:>8}{reassigned:>12}{result['duplicates']:>12}",
+                  flush=True)
+    finally:
+        server.stop()
+
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+    print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
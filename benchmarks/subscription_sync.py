@@ -0,0 +1,159 @@
+# Benchmark: refreshing many channel subscriptions, full re-listing versus incremental sync
+#
+# Creates --channels channels of --videos clips each on the local media server,
+# subscribes to all of them and syncs once, then publishes --new videos on
+# every channel and times two ways of finding them:
+#
+#   full         - Downloader.extract_playlist_info on every channel, which flat
+#                  extracts the whole list (the old way of keeping a mirror current)
+#   incremental  - Subscriptions.sync_now(), which stops at the first known entries
+#
+# Both use --syncs channels at a time. Each channel page has the profile's
+# first-byte latency, standing in for a real site's page load. Reports wall
+# time, page requests and entries read; nothing is downloaded.
+#
+#   python benchmarks/subscription_sync.py [--channels 200] [--videos 300] [--new 2]
+#       [--syncs 4] [--profile mobile] [--json subscription_sync.json]
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+from PyQt6.QtCore import QCoreApplication
+
+from app import ConnectionPool, Downloader, DownloadManager, MetricsRegistry, Subscriptions
+from media_server import MediaServer, PROFILES
+from download_throughput import environment
+
+
+class ChannelIE(InfoExtractor):
+    """The media server's channels, read a page at a time like a channel's Videos tab"""
+    _VALID_URL = r'https?://127\.0\.0\.1:\d+/\w+/channel/(?P<id>[^/?#]+)$'
+
+    def _entries(self, url, name):
+        page = 0
+        while True:
+            data = self._download_json(f'{url}/page{page}.json', name, note=False)
+            for entry in data['entries']:
+                yield self.url_result(entry['url'], 'Generic', entry['id'], entry['title'],
+                                      upload_date=entry['upload_date'])
+            if not data['more']:
+                return
+            page += 1
+
+    def _real_extract(self, url):
+        name = self._match_id(url)
+        return self.playlist_result(self._entries(url, name), name, name)
+
+
+class ChannelYoutubeDL(yt_dlp.YoutubeDL):
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        self.add_info_extractor(ChannelIE())
+        self._ies = {'Channel': self._ies.pop('Channel'), **self._ies}  # Ahead of the generic extractor
+
+
+def entries_read():
+    samples = MetricsRegistry.instance().snapshot()['mediadl_subscription_entries_total']['samples']
+    return sum(sample['value'] for sample in samples if sample['labels'].get('outcome') == 'read')
+
+
+def sync_all(app, subscriptions):
+    """Sync every subscription and wait; returns (seconds, failed syncs)"""
+    waiting = {entry['id'] for entry in subscriptions.entries}
+    failed = []
+
+    def finished(subscription_id, new):
+        waiting.discard(subscription_id)
+        if new < 0:
+            failed.append(subscription_id)
+        if not waiting:
+            app.quit()
+    subscriptions.sync_finished.connect(finished)
+    started = time.perf_counter()
+    subscriptions.sync_now()
+    app.exec()
+    subscriptions.sync_finished.disconnect(finished)
+    return time.perf_counter() - started, len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full re-listing versus incremental sync of many channels")
+    parser.add_argument('--channels', type=int, default=200)
+    parser.add_argument('--videos', type=int, default=300, help='Videos per channel before the new ones')
+    parser.add_argument('--new', type=int, default=2, help='Videos published on each channel between syncs')
+    parser.add_argument('--syncs', type=int, default=4, help='Channels read at a time')
+    parser.add_argument('--profile', default='mobile', choices=list(PROFILES))
+    parser.add_argument('--json', default='subscription_sync.json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    ConnectionPool.instance().ydl_class = ChannelYoutubeDL
+    server = MediaServer().start()
+    names = [f'ch{index}' for index in range(args.channels)]
+    for name in names:
+        server.publish(name, args.videos)
+    urls = [server.channel_url(name, args.profile) for name in names]
+
+    manager = DownloadManager(max_concurrent=0, policy='fifo')  # Queue only; nothing downloads
+    downloader = Downloader(tempfile.mkdtemp(prefix='mediadl-subs-'))
+    subscriptions = Subscriptions(manager, downloader)
+    subscriptions.backfill = 0  # The first sync only learns what is there
+    subscriptions.set_concurrency(args.syncs)
+    for url in urls:
+        subscriptions.add(url)
+    results = []
+    print(f"{args.channels} channels x {args.videos} videos, {args.new} new each, "
+          f"{args.syncs} at a time, {args.profile} profile")
+    print(f"{'method':<13}{'wall s':>9}{'pages':>8}{'entries read':>14}{'new found':>11}{'failed':>8}")
+    try:
+        requests_before = server.stats()['requests']
+        first_s, failed = sync_all(app, subscriptions)
+        print(f"{'first sync':<13}{first_s:>9.1f}{server.stats()['requests'] - requests_before:>8}"
+              f"{entries_read():>14}{len(manager.registry):>11}{failed:>8}", flush=True)
+        for name in names:
+            server.publish(name, args.new)
+
+        # The old way: list every channel in full
+        requests_before = server.stats()['requests']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.syncs) as pool:
+            listed = list(pool.map(downloader.extract_playlist_info, urls))
+        wall = time.perf_counter() - started
+        entries = sum(len(info.get('entries') or []) for info in listed)
+        results.append({'method': 'full', 'wall_s': wall, 'pages': server.stats()['requests'] - requests_before,
+                        'entries_read': entries, 'new_found': args.channels * args.new, 'failed': 0})
+
+        requests_before, read_before = server.stats()['requests'], entries_read()
+        wall, failed = sync_all(app, subscriptions)
+        results.append({'method': 'incremental', 'wall_s': wall,
+                        'pages': server.stats()['requests'] - requests_before,
+                        'entries_read': entries_read() - read_before,
+                        'new_found': len(manager.registry), 'failed': failed})
+        for result in results:
+            print(f"{result['method']:<13}{result['wall_s']:>9.1f}{result['pages']:>8}{result['entries_read']:>14}"
+                  f"{result['new_found']:>11}{result['failed']:>8}")
+    finally:
+        subscriptions.stop()
+        server.stop()
+
+    full, incremental = results
+    if incremental['wall_s']:
+        print(f"\nIncremental sync is {full['wall_s'] / incremental['wall_s']:.1f}x faster, "
+              f"{full['pages'] / max(1, incremental['pages']):.1f}x fewer page requests")
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'args': vars(args), 'first_sync_s': first_s, 'results': results},
+                  f, indent=2)
+    print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# Benchmark: queuing a very large URL list all at once versus streaming it in
+#
+# Writes a list of --lines media-server URLs (with some duplicates and junk
+# lines) and hands it to a DownloadManager two ways:
+#
+#   bulk   - read and split the whole file, then add_download every URL, the
+#            way pasting into the window used to
+#   stream - UrlIngestor.add_file, which reads slices while the queue is short
+#
+# For each it reports the time until the first download starts, the longest
+# the event loop went without running a 10 ms timer, how many jobs were
+# queued, and the memory added. Both runs stop once downloads have run for
+# --run-seconds, after a short warm-up run so neither pays for first imports.
+# Also reports how fast read_url_records parses the file.
+#
+#   python benchmarks/url_ingestion.py [--lines 50000] [--run-seconds 3] [--json url_ingestion.json]
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+from app import Downloader, DownloadManager, UrlIngestor, read_url_records
+from media_server import MediaServer
+from download_throughput import environment, rss_bytes
+
+MB = 1024 * 1024
+
+
+def write_list(path, server, lines):
+    rng = random.Random(7)
+    with open(path, 'w') as f:
+        for index in range(lines):
+            roll = rng.random()
+            if roll < 0.05 and index:
+                index = rng.randrange(index)  # Duplicate of an earlier line
+            elif roll < 0.06:
+                f.write("not a url\n")
+                continue
+            f.write(server.url('progressive', 256 * 1024, f'item{index}') + "\n")
+
+
+class LoopLag:
+    """Longest gap between runs of a 10 ms timer, i.e. how long the event loop was blocked"""
+
+    def __init__(self):
+        self.worst = 0.0
+        self.last = time.perf_counter()
+        self.timer = QTimer()
+        self.timer.timeout.connect(self._tick)
+        self.timer.start(10)
+
+    def _tick(self):
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self.last)
+        self.last = now
+
+
+def run_mode(app, mode, path, args):
+    output_path = tempfile.mkdtemp(prefix='mediadl-ingest-')
+    manager = DownloadManager(max_concurrent=args.concurrency, policy='fifo')
+    downloader = Downloader(output_path)
+    rss_before = rss_bytes()
+    result = {'mode': mode}
+    started = time.perf_counter()
+
+    def first_start(job_id):
+        if 'first_start_s' not in result:
+            result['first_start_s'] = time.perf_counter() - started
+            QTimer.singleShot(int(args.run_seconds * 1000), app.quit)
+    manager.job_started.connect(first_start)
+    lag = LoopLag()
+
+    def begin():
+        lag.last = time.perf_counter()
+        if mode == 'bulk':
+            with open(path) as f:
+                urls = [url.strip() for url in f.read().split('\n') if url.strip()]
+            for url in urls:
+                manager.add_download(downloader, url, 'video', {'max_retries': 1})
+            manager.pump()
+        else:
+            ingestor.add_file(path)
+
+    ingestor = UrlIngestor(manager, downloader, {'max_retries': 1}, queue_depth=args.queue_depth) \
+        if mode == 'stream' else None
+    QTimer.singleShot(0, begin)
+    app.exec()
+
+    result['loop_blocked_ms'] = lag.worst * 1000
+    result['queued_jobs'] = len(manager.registry)
+    result['rss_added_mb'] = (rss_bytes() - rss_before) / MB if rss_before else None
+    if ingestor is not None:
+        ingestor.cancel()
+    threads = [download['thread'] for download in manager.active_downloads]
+    manager.cancel_all()
+    for thread in threads:
+        thread.wait(10000)
+    return result
+
+
+def parse_rate(path):
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        count = sum(1 for _ in read_url_records(f))
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queuing a large URL list at once versus streaming it")
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--queue-depth', type=int, default=100, help='UrlIngestor queue depth')
+    parser.add_argument('--run-seconds', type=float, default=3.0, help='Let downloads run this long after the first starts')
+    parser.add_argument('--modes', default='stream,bulk')
+    parser.add_argument('--json', default='url_ingestion.json', help='Write results to this file')
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)
+    server = MediaServer().start()
+    path = os.path.join(tempfile.mkdtemp(prefix='mediadl-list-'), 'urls.txt')
+    write_list(path, server, args.lines)
+    warm_path = os.path.join(os.path.dirname(path), 'warm.txt')
+    write_list(warm_path, server, 20)
+    results = []
+    print(f"{args.lines} lines, {os.path.getsize(path) / MB:.1f} MiB")
+    print(f"{'mode':<8}{'first start s':>15}{'loop blocked ms':>17}{'jobs queued':>13}{'RSS added MiB':>15}")
+    try:
+        run_mode(app, 'bulk', warm_path, args)  # First downloads and imports aren't part of either result
+        for mode in args.modes.split(','):
+            result = run_mode(app, mode, path, args)
+            results.append(result)
+            rss = f"{result['rss_added_mb']:.1f}" if result['rss_added_mb'] is not None else 'n/a'
+            print(f"{mode:<8}{result.get('first_start_s', float('nan')):>15.2f}{result['loop_blocked_ms']:>17.0f}"
+                  f"{result['queued_jobs']:>13}{rss:>15}", flush=True)
+    finally:
+        server.stop()
+    rate = parse_rate(path)
+    print(f"\nread_url_records: {rate:,.0f} lines/s")
+
+    with open(args.json, 'w') as f:
+        json.dump({'environment': environment(), 'lines': args.lines, 'results': results,
+                   'parse_lines_per_s': rate}, f, indent=2)
+    print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from app import Downloader, DownloadManager, WorkerPool
+
+
+class SlowExitDownloader(Downloader):
+    """Downloads in progress-hook steps and takes a while to stop, like a job in post-processing"""
+
+    def __init__(self, output_path, running):
+        super().__init__(output_path)
+        self.running = running
+
+    def spawn(self):
+        return SlowExitDownloader(self.output_path, self.running)
+
+    def download_media(self, url, download_type, settings=None, selected_videos=None):
+        self.reset_state()
+        with self.running['lock']:
+            self.running['now'] += 1
+            self.running['peak'] = max(self.running['peak'], self.running['now'])
+        try:
+            for step in range(int(url.rsplit('/', 1)[1])):
+                try:
+                    self._yt_dlp_progress_hook({'status': 'downloading', 'filename': url, 'downloaded_bytes': step})
+                except Exception:
+                    time.sleep(0.3)
+                    return "Download cancelled by user"
+                time.sleep(0.02)
+            self._yt_dlp_progress_hook({'status': 'finished', 'filename': url + '.mp4'})
+            return "Download complete!"
+        finally:
+            with self.running['lock']:
+                self.running['now'] -= 1
+
+
+def run_until(qapp, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_preempted_job_holds_its_slot_until_it_stops(qapp, tmp_path):
+    running = {'lock': threading.Lock(), 'now': 0, 'peak': 0}
+    downloader = SlowExitDownloader(str(tmp_path), running)
+    manager = DownloadManager(max_concurrent=1)
+    finished = []
+    manager.job_finished.connect(lambda job_id, message: finished.append(job_id))
+    bulk = manager.add_download(downloader, 'https://example.com/bulk/200', 'video',
+                                priority=DownloadManager.PRIORITY_LOW)
+    manager.pump()
+    run_until(qapp, lambda: running['now'] == 1)
+
+    urgent = manager.add_download(downloader, 'https://example.com/urgent/5', 'video',
+                                  priority=DownloadManager.PRIORITY_URGENT, preempt=True)
+    manager.pump()
+    assert manager.running_count() == 1
+    assert manager.get_job(urgent)['status'] == 'queued'  # Waits for the bulk job to stop
+
+    run_until(qapp, lambda: urgent in finished)
+    assert running['peak'] == 1
+    assert manager.get_job(bulk)['status'] in ('queued', 'active')
+    manager.cancel_all()
+    for download in list(manager.active_downloads):
+        download['thread'].wait(5000)
+
+
+def test_worker_processes_cap_the_concurrency_limit(qapp):
+    manager = DownloadManager(max_concurrent=16)
+    manager.worker_pool = WorkerPool(size=4)
+    assert manager.concurrency_limit() == 4
+    manager.set_schedule(concurrency_cap=2)
+    assert manager.concurrency_limit() == 2
@@ -0,0 +1,69 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from app import Downloader, DownloadManager, JobApi
+
+
+@pytest.fixture
+def api(qapp, tmp_path):
+    api = JobApi(DownloadManager(max_concurrent=0), Downloader(str(tmp_path)), port=0, token='secret')
+    api.start()
+    yield api
+    api.stop()
+
+
+def request(qapp, api, method, path, body=b'', headers=None):
+    """Send one request from a client thread while the event loop runs here"""
+    result = {}
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=10)
+        connection.putrequest(method, path)
+        for name, value in dict({'Content-Type': 'application/json', 'Authorization': 'Bearer secret',
+                                 'Content-Length': str(len(body))}, **(headers or {})).items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        result['status'], result['body'] = response.status, json.loads(response.read())
+        connection.close()
+    thread = threading.Thread(target=client)
+    thread.start()
+    while thread.is_alive():
+        qapp.processEvents()
+        thread.join(0.01)
+    return result['status'], result['body']
+
+
+def test_bearer_token(qapp, api):
+    assert request(qapp, api, 'GET', '/status')[0] == 200
+    assert request(qapp, api, 'GET', '/status', headers={'Authorization': 'Bearer wrong'})[0] == 401
+
+
+def test_bad_content_length_is_a_client_error(qapp, api):
+    status, body = request(qapp, api, 'POST', '/jobs', headers={'Content-Length': 'zz'})
+    assert status == 400 and 'Content-Length' in body['error']
+
+
+def test_unexpected_errors_are_answered(qapp, api, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(api, '_route', broken)
+    assert request(qapp, api, 'GET', '/status')[0] == 500
+
+
+def test_busy_event_loop_answers_503(qapp, api, monkeypatch):
+    monkeypatch.setattr(api, 'CALL_TIMEOUT', 0.1)
+    status = {}
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', api.port, timeout=10)
+        connection.request('GET', '/status', headers={'Authorization': 'Bearer secret'})
+        status['code'] = connection.getresponse().status
+        connection.close()
+    thread = threading.Thread(target=client)
+    thread.start()
+    thread.join(10)  # The event loop isn't running, so the call times out
+    assert status['code'] == 503
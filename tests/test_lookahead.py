@@ -0,0 +1,29 @@
+from app import DownloadManager, SizeEstimator
+
+
+def generator_playlist(consumed):
+    def entries():
+        for index in range(3):
+            consumed.append(index)
+            yield {'_type': 'url', 'url': f'https://example.com/v/{index}'}
+    return {'_type': 'playlist', 'id': 'list', 'title': 'list', 'entries': entries()}
+
+
+def test_prefetch_leaves_lazy_playlist_entries_alone(monkeypatch):
+    consumed = []
+    estimator = SizeEstimator()
+    monkeypatch.setattr(estimator, '_extract', lambda url: generator_playlist(consumed))
+    job = {'url': 'https://example.com/list', 'download_type': 'video', 'settings': {}}
+    try:
+        assert estimator._prefetch_job(job) is None  # The download lists the entries itself
+    finally:
+        estimator.shutdown()
+    assert consumed == []
+    assert 'estimated_size' not in job
+
+
+def test_playlist_jobs_are_not_extracted_ahead(qapp):
+    manager = DownloadManager()
+    job = {'download_type': 'playlist', 'downloader': object(), 'settings': {}}
+    assert not manager._can_prefetch(job)
+    assert manager._can_prefetch(dict(job, download_type='video'))
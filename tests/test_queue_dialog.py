@@ -0,0 +1,24 @@
+from app import Downloader, DownloadManager, QueueDialog
+
+
+def test_selection_follows_the_job_when_rows_move(qapp, tmp_path):
+    manager = DownloadManager(max_concurrent=0)
+    downloader = Downloader(str(tmp_path))
+    first, second, third = (manager.add_download(downloader, f'https://example.com/{name}', 'video')
+                            for name in ('queued-A', 'queued-B', 'queued-C'))
+    dialog = QueueDialog(manager)
+    try:
+        dialog.queue_table.selectRow(1)
+        assert dialog.selected_job_ids() == [second]
+
+        manager.cancel_job(first)  # Every row below moves up one
+        dialog.populate_queue()
+        assert dialog.selected_job_ids() == [second]
+        assert dialog.queue_table.item(0, 1).text().endswith('queued-B')
+
+        dialog.change_priority(DownloadManager.PRIORITY_HIGH)
+        assert manager.get_job(second)['priority'] == DownloadManager.PRIORITY_HIGH
+        assert manager.get_job(third)['priority'] == DownloadManager.PRIORITY_NORMAL
+    finally:
+        dialog.refresh_timer.stop()
+        dialog.deleteLater()
@@ -0,0 +1,60 @@
+import time
+
+from app import Downloader, DownloadManager, SharedJobQueue, SharedQueueFeeder
+
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def make_node(qapp, path, name, tmp_path):
+    manager = DownloadManager(max_concurrent=0)  # Queue only; nothing downloads
+    feeder = SharedQueueFeeder(SharedJobQueue(path, node=name), manager, Downloader(str(tmp_path)), buffer=1)
+    return manager, feeder
+
+
+def on_db(feeder, function, *args):
+    """Run function on the feeder's database thread, after the work already queued there"""
+    results = []
+    feeder._run(function, *args, on_result=results.append).result(5)
+    return results[0]
+
+
+def settle(qapp, feeder):
+    on_db(feeder, lambda: None)
+    qapp.processEvents()
+
+
+def test_cancelling_a_leased_queued_job_releases_it(qapp, tmp_path):
+    path = str(tmp_path / 'queue.db')
+    manager_a, feeder_a = make_node(qapp, path, 'a', tmp_path)
+    manager_b, feeder_b = make_node(qapp, path, 'b', tmp_path)
+    try:
+        on_db(feeder_a, feeder_a.queue.submit, ['https://example.com/v/1'], 'video')
+        feeder_a.poll()
+        wait_until(qapp, lambda: feeder_a._leases)
+        (job_id, (shared_id, token)), = feeder_a._leases.items()
+        assert feeder_a.has_work()
+
+        feeder_b.poll()
+        settle(qapp, feeder_b)
+        assert len(manager_b.registry) == 0  # Leased to node a
+
+        assert on_db(feeder_a, feeder_a.queue.heartbeat, [(shared_id, token)]) == []
+
+        assert manager_a.cancel_job(job_id)
+        assert not feeder_a._leases
+        assert not feeder_a.has_work()
+        assert on_db(feeder_a, feeder_a.queue.counts).get('leased') is None
+        assert on_db(feeder_a, feeder_a.queue.heartbeat, [(shared_id, token)]) == [shared_id]
+
+        feeder_b.poll()
+        wait_until(qapp, lambda: feeder_b._leases)
+        assert [lease[0] for lease in feeder_b._leases.values()] == [shared_id]
+    finally:
+        feeder_a.stop()
+        feeder_b.stop()
@@ -0,0 +1,52 @@
+import threading
+
+from app import Downloader, DownloadManager, SizeEstimator, WorkerPool
+
+
+def clip(size):
+    return {'formats': [{'vcodec': 'avc1', 'acodec': 'mp4a', 'height': 720, 'filesize': size}]}
+
+
+def test_lazy_playlist_is_not_paged_through():
+    consumed = []
+
+    def entries():
+        for size in (10, 20, 30):
+            consumed.append(size)
+            yield clip(size)
+    info = {'_type': 'playlist', 'entries': entries(), 'playlist_count': 3}
+    assert SizeEstimator.estimate(info, 'video') is None
+    assert consumed == []
+
+
+def test_listed_playlist_scales_the_median_entry():
+    info = {'_type': 'playlist', 'entries': [clip(10), clip(20), clip(90), {'_type': 'url'}], 'playlist_count': 10}
+    assert SizeEstimator.estimate(info, 'video') == 200
+    del info['playlist_count']
+    assert SizeEstimator.estimate(info, 'video') == 80
+
+
+def test_shutdown_cancels_pending_estimates():
+    estimator = SizeEstimator(max_workers=1)
+    release = threading.Event()
+    busy = estimator._submit(estimator._executor, lambda job: release.wait(5), None)
+    pending = estimator._submit(estimator._executor, lambda job: None, None)
+    estimator.shutdown()
+    release.set()
+    assert pending.cancelled()
+    busy.result(5)
+
+
+def test_proxied_and_worker_jobs_are_not_extracted_in_the_app(qapp, tmp_path, monkeypatch):
+    estimator = SizeEstimator()
+    extracted = []
+    monkeypatch.setattr(estimator, '_extract', lambda url: extracted.append(url) or clip(10))
+    manager = DownloadManager(max_concurrent=0, policy='sjf', size_estimator=estimator)
+    downloader = Downloader(str(tmp_path))
+    manager.add_download(downloader, 'https://example.com/proxied', 'video',
+                         {'use_proxy': True, 'proxy_url': 'http://proxy:8080'})
+    manager.add_download(downloader, 'https://example.com/direct', 'video', {})
+    manager.worker_pool = WorkerPool(size=1)  # Never started; only marks process mode
+    manager.add_download(downloader, 'https://example.com/worker', 'video', {})
+    estimator._executor.shutdown(wait=True)
+    assert extracted == ['https://example.com/direct']
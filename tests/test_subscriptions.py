@@ -0,0 +1,18 @@
+import threading
+
+from app import Downloader, DownloadManager, Subscriptions
+
+
+def test_stop_cancels_syncs_that_have_not_started(qapp, tmp_path):
+    subscriptions = Subscriptions(DownloadManager(max_concurrent=0), Downloader(str(tmp_path)),
+                                  path=str(tmp_path / 'subscriptions.json'))
+    subscriptions.set_concurrency(1)
+    release = threading.Event()
+    busy = subscriptions._executor.submit(release.wait, 5)
+    subscriptions.add('https://example.com/channel/a')
+    subscriptions.tick()
+    (pending,) = subscriptions._running.values()
+    subscriptions.stop()
+    release.set()
+    assert pending.cancelled()
+    busy.result(5)
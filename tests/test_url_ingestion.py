@@ -0,0 +1,23 @@
+import io
+
+from app import read_url_records
+
+
+def records(text, kind='csv', **options):
+    return [record for offset, record in read_url_records(io.BytesIO(text.encode('utf-8')), kind, **options)]
+
+
+def test_headerless_csv_reads_type_and_priority_by_position():
+    assert records("https://example.com/a, audio, 5\nhttps://example.com/b\nnot a url,video\n") == [
+        {'url': 'https://example.com/a', 'type': 'audio', 'priority': 5},
+        {'url': 'https://example.com/b', 'type': 'video', 'priority': 0},
+        None,
+    ]
+
+
+def test_csv_header_names_the_columns():
+    assert records("title,URL,priority,type\nA,https://example.com/a,-1,audio\nB,https://example.com/b,,\n",
+                   default_priority=3) == [
+        {'url': 'https://example.com/a', 'type': 'audio', 'priority': -1},
+        {'url': 'https://example.com/b', 'type': 'video', 'priority': 3},
+    ]
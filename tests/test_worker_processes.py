@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+from app import WorkerPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from media_server import MediaServer
+
+
+@pytest.fixture
+def server():
+    server = MediaServer().start()
+    yield server
+    server.stop()
+
+
+def run_job(pool, spec, *controls):
+    """Send a job and controls straight after it, the way a pause or preemption can race its start"""
+    worker = pool.acquire()
+    try:
+        worker.send(('run', spec))
+        for control in controls:
+            worker.send(control)
+        while True:
+            message = worker.recv()
+            if message[0] == 'done':
+                return message[1]
+    finally:
+        pool.release(worker)
+
+
+def test_cancel_sent_right_after_run_is_kept(server, tmp_path):
+    pool = WorkerPool(size=1)
+    spec = {'job_id': 1, 'url': server.url('progressive', 4 * 1024 * 1024, 'clip', 'mobile'),
+            'download_type': 'video', 'settings': {'max_retries': 0}, 'output_path': str(tmp_path),
+            'rate_limit': None, 'paused': False}
+    try:
+        assert run_job(pool, spec, ('cancel',)) == "Download cancelled by user"
+        assert run_job(pool, dict(spec, job_id=2, paused=True), ('cancel',)) == "Download cancelled by user"
+    finally:
+        pool.shutdown()